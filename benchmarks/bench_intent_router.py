@@ -0,0 +1,87 @@
+"""
+Per-message latency of the Slack bot's intent routing at 10, 100 and 1,000 rules:
+the former loop of re.search over pattern strings versus the compiled IntentRouter,
+with and without its response cache.
+
+Usage:
+    python benchmarks/bench_intent_router.py --rules 10 100 1000 --messages 20000
+"""
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'models' / 'ai_slack_bot'))
+from router import IntentRouter, Rule, keyword_pattern
+
+VOCABULARY = ["roster", "attendance", "class", "team", "region", "youth", "staff", "report", "phone",
+              "schedule", "meeting", "north", "south", "update", "network", "status", "count", "list"]
+
+def synthetic_rules(count, seed=0):
+    """Mix of keyword triggers and short regexes, like a grown RESPONSE_PATTERNS list."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        word = f"{rng.choice(VOCABULARY)}{i}"
+        if i % 3 == 0:
+            pattern = keyword_pattern([word, f"{word}s"])
+        elif i % 3 == 1:
+            pattern = rf"(?i){word}\s+(?:please|now)"
+        else:
+            pattern = rf"(?i)\b{word}\b.*\?"
+        rules.append(Rule(f"rule{i}", pattern, f"response {i}", 0))
+    return rules
+
+def synthetic_messages(count, rules, repeat_share=0.5, seed=1):
+    """Chat-like messages; about half repeat earlier ones, as in a busy channel."""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        if messages and rng.random() < repeat_share:
+            messages.append(rng.choice(messages))
+            continue
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 15))]
+        if rng.random() < 0.7:
+            words.insert(rng.randint(0, len(words)), rng.choice(rules).name.replace("rule", rng.choice(VOCABULARY)))
+        messages.append(" ".join(words) + rng.choice(["", "?", " please"]))
+    return messages
+
+def legacy_route(rules, text, default=None):
+    # The former get_response: re.search with each pattern string in order
+    for rule in rules:
+        if re.search(rule.pattern, text):
+            return rule.response
+    return default
+
+def per_message_us(func, messages):
+    """Mean latency per message in microseconds, and the responses."""
+    started = time.perf_counter()
+    responses = [func(text) for text in messages]
+    return (time.perf_counter() - started) / len(messages) * 1e6, responses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'rules':>6} {'legacy (us)':>12} {'router (us)':>12} {'cached (us)':>12} {'speedup':>8} {'hit rate':>9}")
+    for count in args.rules:
+        rules = synthetic_rules(count)
+        messages = synthetic_messages(args.messages, rules)
+        uncached = IntentRouter(rules, cache_size=0)
+        cached = IntentRouter(rules, cache_size=1024)
+        legacy, expected = per_message_us(lambda text: legacy_route(rules, text), messages)
+        routed, responses = per_message_us(uncached.route, messages)
+        hot, cached_responses = per_message_us(cached.route, messages)
+        # Every message, not a sample: the router must answer exactly as the legacy loop
+        for text, want, got, hot_got in zip(messages, expected, responses, cached_responses):
+            if not want == got == hot_got:
+                raise AssertionError(f"Router disagrees with the legacy loop on {text!r}")
+        hit_rate = cached.hits / max(1, cached.hits + cached.misses)
+        print(f"{count:>6} {legacy:>12.1f} {routed:>12.1f} {hot:>12.1f} {legacy / hot:>7.1f}x {hit_rate:>9.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the legacy row-by-row `get_country` (Series.apply) with the vectorized
+sdm_common.phone classifier on synthetic phone numbers.
+
+Usage:
+    python benchmarks/bench_phone_country.py --rows 1000000 2000000 5000000
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdm_common.phone import classify_countries, normalize_phones
+
+def legacy_get_country(phone):
+    # Copy of the per-row function previously used in notebooks/students/main.py
+    if pd.isna(phone) or phone is None or phone == "":
+        return None
+    if len(str(phone)) == 10:
+        return "India"
+    elif len(str(phone)) == 9 and str(phone).startswith("7"):
+        return "Sri Lanka"
+    elif str(phone).startswith("94") and len(str(phone)) == 11:
+        return "Sri Lanka"
+    else:
+        return "Others"
+
+def synthetic_phones(rows, seed=0):
+    """Mixed-format numbers: Indian, Sri Lankan local/international, other and blanks."""
+    rng = np.random.default_rng(seed)
+    digits = rng.integers(10**9, 10**10, size=rows).astype(str)
+    formats = [
+        lambda d: f"+91 {d[:5]}-{d[5:]}",      # India with country code (12 digits -> Others)
+        lambda d: f"{d[:5]} {d[5:]}",          # India, 10 digits
+        lambda d: f"7{d[:8]}",                 # Sri Lanka local, 9 digits
+        lambda d: f"+94 (7{d[:2]}) {d[2:9]}",  # Sri Lanka international, 11 digits
+        lambda d: d[:6],                       # Too short
+        lambda d: "",                          # Blank cell
+    ]
+    choices = rng.integers(0, len(formats), size=rows)
+    return pd.Series([formats[c](d) for c, d in zip(choices, digits)], dtype=object)
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 2_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'apply (s)':>10} {'vectorized (s)':>15} {'speedup':>8} {'rows/s (vectorized)':>20}")
+    for rows in args.rows:
+        phones = normalize_phones(synthetic_phones(rows))
+        legacy_time, legacy = best_of(lambda: phones.apply(legacy_get_country), args.repeat)
+        vector_time, vectorized = best_of(lambda: classify_countries(phones), args.repeat)
+        if not (legacy.fillna('').to_numpy(dtype=object) == vectorized.fillna('').to_numpy(dtype=object)).all():
+            raise AssertionError("Vectorized classification differs from the legacy function")
+        print(f"{rows:>10} {legacy_time:>10.3f} {vector_time:>15.3f} "
+              f"{legacy_time / vector_time:>7.1f}x {rows / vector_time:>20,.0f}")
+
+if __name__ == '__main__':
+    main()
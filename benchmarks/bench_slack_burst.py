@@ -0,0 +1,112 @@
+"""
+Burst load on the Slack bot against the local stub Slack API, fully offline.
+
+A burst of message events spread over a number of channels is answered two ways:
+  sequential - one blocking chat.postMessage per event, as the sync handlers do;
+               a 429 loses the reply
+  queued     - events dispatched through the async app, replies sent by its
+               ReplyQueue with per-channel pacing and Retry-After handling
+
+Usage:
+    python benchmarks/bench_slack_burst.py --messages 500 --channels 20 --rate 5 --burst 3
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'models' / 'ai_slack_bot'))
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_bolt.request.async_request import AsyncBoltRequest
+
+from async_main import build_app
+from responses import get_response
+from stub_slack_api import StubSlackApi
+
+TEXTS = ["hello", "thanks a lot", "can you help me", "what's up?"]
+
+def message_event(i, channels):
+    ts = f"{1700000000 + i}.000100"
+    return {
+        "type": "event_callback",
+        "team_id": "T0STUB",
+        "api_app_id": "A0STUB",
+        "event_id": f"Ev{i:08d}",
+        "event_time": 1700000000 + i,
+        "event": {"type": "message", "channel": f"C{i % channels:05d}", "user": f"U{i % 50:05d}",
+                  "text": TEXTS[i % len(TEXTS)], "ts": ts, "channel_type": "channel"},
+    }
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) >= 2 else (values[0] if values else 0.0)
+
+async def run_sequential(base_url, events):
+    client = AsyncWebClient(token="xoxb-stub", base_url=base_url)
+    started = time.perf_counter()
+    sent, lost, latencies = 0, 0, []
+    for body in events:
+        event = body["event"]
+        try:
+            await client.chat_postMessage(channel=event["channel"], thread_ts=event["ts"],
+                                          text=get_response(event["text"]))
+            sent += 1
+            latencies.append(time.perf_counter() - started)
+        except SlackApiError:
+            lost += 1
+    return {'seconds': time.perf_counter() - started, 'ack_seconds': time.perf_counter() - started,
+            'sent': sent, 'lost': lost, 'latencies': latencies}
+
+async def run_queued(base_url, events, workers, channel_interval):
+    client = AsyncWebClient(token="xoxb-stub", base_url=base_url)
+    app, replies = build_app(client=client, workers=workers, max_queue=len(events),
+                             channel_interval=channel_interval, max_retries=20)
+    replies.start()
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[app.async_dispatch(AsyncBoltRequest(body=body, mode="socket_mode"))
+                                       for body in events])
+    ack_seconds = time.perf_counter() - started
+    await replies.close()
+    if any(response.status != 200 for response in responses):
+        raise RuntimeError("Some events were not acknowledged")
+    return {'seconds': time.perf_counter() - started, 'ack_seconds': ack_seconds,
+            'sent': replies.stats['sent'], 'lost': replies.stats['failed'] + replies.stats['dropped'],
+            'latencies': replies.latencies, 'retried': replies.stats['retried']}
+
+async def run(args):
+    events = [message_event(i, args.channels) for i in range(args.messages)]
+    print(f"{args.messages} messages over {args.channels} channels; stub allows {args.rate}/s per channel, "
+          f"burst {args.burst}, {args.latency * 1000:.0f} ms per call\n")
+    print(f"{'mode':<11} {'seconds':>8} {'ack (s)':>8} {'sent':>6} {'lost':>6} {'429s':>6} "
+          f"{'p50 (s)':>8} {'p95 (s)':>8} {'replies/s':>10}")
+    for mode in args.modes:
+        stub = StubSlackApi(args.rate, args.burst, args.latency)
+        base_url = await stub.start()
+        try:
+            if mode == 'sequential':
+                result = await run_sequential(base_url, events)
+            else:
+                result = await run_queued(base_url, events, args.workers, 1.0 / args.rate)
+        finally:
+            await stub.stop()
+        latencies = result['latencies']
+        print(f"{mode:<11} {result['seconds']:>8.2f} {result['ack_seconds']:>8.3f} {result['sent']:>6} "
+              f"{result['lost']:>6} {stub.rejected:>6} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 95):>8.2f} {result['sent'] / result['seconds']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--channels', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=8, help="ReplyQueue workers")
+    parser.add_argument('--rate', type=float, default=5.0, help="Stub limit: posts per second per channel")
+    parser.add_argument('--burst', type=int, default=3, help="Stub limit: burst per channel")
+    parser.add_argument('--latency', type=float, default=0.02, help="Stub seconds per call (network round trip)")
+    parser.add_argument('--modes', nargs='+', choices=['sequential', 'queued'], default=['sequential', 'queued'])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Synthetic inputs for the loader benchmarks.
+
+Saints sheets carry Korean headers (as in the real exports), cell-group codes
+decodable by the cell_group_* seeds and extra columns the loader should prune.
+Student rosters have title rows above the header, mixed-format phone numbers,
+numbered staff names and a footer row.
+
+Usage:
+    python benchmarks/synthetic.py saints 100000 data/bench_saints.csv
+    python benchmarks/synthetic.py roster 100000 data/bench_roster.csv
+"""
+import time
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from bench_phone_country import synthetic_phones
+
+# Korean source header -> English translation returned by the stub translator
+SAINTS_HEADERS = {
+    '고유번호': 'SCJ Number',
+    '이름': 'Name',
+    '생년월일': 'Birth',
+    '전화번호': 'Phone',
+    '부서': 'Department',
+    '팀': 'Team',
+    '새 구역': 'New Cell Grp',
+    '특이사항': 'Special Note',
+    '사무실': 'Office',
+}
+
+SAINTS_TARGETS = ["scj_number", "name", "birth", "phone", "department", "team",
+                  "new cell grp", "special note", "office"]
+
+# Letters decoded by seeds/cell_group_teams.csv, _regions.csv and _departments.csv
+CELL_TEAMS = list('ABCD')
+CELL_REGIONS = list('NS')
+CELL_DEPARTMENTS = list('YMW')
+RED_LIST = 'Ins.RED LIST'
+
+SURNAMES = ['Kim', 'Lee', 'Park', 'Choi', 'Jung', 'Kang', 'Cho', 'Yoon', 'Jang', 'Lim']
+GIVEN_NAMES = ['Minjun', 'Seoyeon', 'Jiho', 'Haeun', 'Dohyun', 'Jiwoo', 'Yejun', 'Sua', 'Eunwoo', 'Hayoon',
+               'Priya', 'Arjun', 'Nimal', 'Kavya', 'Ravi', 'Tharushi']
+DEPARTMENTS = ['청년회', '부녀회', '장년회', '자문회', '학생회']
+OFFICES = ['Seoul', 'Busan', 'Chennai', 'Colombo', 'Kandy', 'Hyderabad']
+
+def _choice(rng, values, rows):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size=rows)]
+
+def _names(rng, rows):
+    names = pd.Series(_choice(rng, SURNAMES, rows)) + ' ' + pd.Series(_choice(rng, GIVEN_NAMES, rows))
+    # A few merged records use '/' between names, which the loader rewrites to '.'
+    merged = rng.random(rows) < 0.02
+    names[merged] = names[merged] + '/' + pd.Series(_choice(rng, GIVEN_NAMES, int(merged.sum())), index=names[merged].index)
+    return names
+
+def saints_sheet(rows, extra_columns=20, seed=0):
+    """
+    A Saints export with `rows` members, Korean headers and `extra_columns` unused columns.
+
+    Returns:
+        pandas DataFrame in source layout (Korean headers, mixed date formats).
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1)
+    scj_numbers = pd.Series(ids).map(lambda i: f"{i // 100000:08d}-{i % 100000:05d}")
+
+    births = pd.to_datetime('1950-01-01') + pd.to_timedelta(rng.integers(0, 60 * 365, size=rows), unit='D')
+    birth_text = pd.Series(births.strftime('%Y.%m.%d'))
+    dashed = rng.random(rows) < 0.3
+    birth_text[dashed] = pd.Series(births[dashed].strftime('%Y-%m-%d'), index=birth_text[dashed].index)
+
+    phone_digits = rng.integers(10**7, 10**8, size=rows).astype(str)
+    phones = pd.Series(phone_digits).map(lambda d: f"010-{d[:4]}-{d[4:]}")
+
+    cell_codes = (pd.Series(_choice(rng, CELL_TEAMS, rows)) + pd.Series(_choice(rng, CELL_REGIONS, rows))
+                  + pd.Series(_choice(rng, CELL_DEPARTMENTS, rows)) + pd.Series(rng.integers(1, 40, size=rows)).astype(str))
+    red_list = rng.random(rows) < 0.01
+    cell_codes[red_list] = RED_LIST
+
+    teams = pd.Series(rng.integers(1, 13, size=rows)).astype(str)
+    teams[rng.random(rows) < 0.01] = 'RL'
+
+    notes = pd.Series([None] * rows, dtype=object)
+    noted = rng.random(rows) < 0.05
+    notes[noted] = _choice(rng, ['moved', 'new member', 'transfer pending', 'inactive'], int(noted.sum()))
+
+    df = pd.DataFrame({
+        '고유번호': scj_numbers,
+        '이름': _names(rng, rows),
+        '생년월일': birth_text,
+        '전화번호': phones,
+        '부서': _choice(rng, DEPARTMENTS, rows),
+        '팀': teams,
+        '새 구역': cell_codes,
+        '특이사항': notes,
+        '사무실': _choice(rng, OFFICES, rows),
+    })
+    for i in range(1, extra_columns + 1):
+        df[f'기타{i}'] = rng.integers(0, 1000, size=rows) if i % 2 else _choice(rng, ['x', 'y', 'z'], rows)
+    return df
+
+def modify_saints_rows(df, fraction=0.1, seed=1):
+    """Copy of a translated, loaded Saints frame with `fraction` of the rows given a new office."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    changed = rng.random(len(df)) < fraction
+    office = next(col for col in df.columns if col.startswith('office'))
+    df[office] = df[office].astype(object)
+    df.loc[changed, office] = 'Relocated'
+    return df, int(changed.sum())
+
+def roster(rows, extra_columns=5, seed=0):
+    """
+    A class roster with mixed-format phones, numbered staff names and duplicate phones.
+
+    Returns:
+        pandas DataFrame with the roster columns (title and footer rows are added by write_roster).
+    """
+    rng = np.random.default_rng(seed)
+    phones = synthetic_phones(rows, seed=seed)
+    # Some students appear twice (re-registrations); the last row wins in the diff
+    repeated = rng.random(rows) < 0.02
+    phones[repeated] = phones.sample(int(repeated.sum()), random_state=seed, replace=True).to_numpy()
+    staff_numbers = pd.Series(rng.integers(1, 30, size=rows)).astype(str)
+    df = pd.DataFrame({
+        'No.': np.arange(1, rows + 1),
+        'Name': _names(rng, rows),
+        'Mobile Number': phones,
+        'Staff Name': staff_numbers + '. ' + pd.Series(_choice(rng, SURNAMES, rows)),
+        'Networker': _choice(rng, GIVEN_NAMES + [None], rows),
+    })
+    for i in range(1, extra_columns + 1):
+        df[f'Week {i}'] = _choice(rng, ['P', 'A', None], rows)
+    return df
+
+def write_roster(df, path):
+    """Write a roster CSV with two title rows above the header and one footer row (header_row=3, ignore_rows=1)."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('Class roster (synthetic)\n')
+        f.write(f'Generated {time.strftime("%Y-%m-%d")}\n')
+        df.to_csv(f, index=False)
+        f.write('Total,' + str(len(df)) + '\n')
+    return path
+
+# Excel's row limit, header included
+XLSX_MAX_ROWS = 1_048_575
+
+def write_saints_sheet(df, path):
+    """Write a Saints sheet to .csv or .xlsx (by suffix)."""
+    path = Path(path)
+    if path.suffix.lower() == '.xlsx':
+        if len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"{len(df)} rows do not fit in an .xlsx sheet (max {XLSX_MAX_ROWS}); use .csv")
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+class StubTranslator:
+    """
+    Offline stand-in for googletrans: translates the synthetic Korean headers from
+    a fixed table, optionally sleeping `latency` seconds per request like a network call.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+
+    def translate(self, text, src='ko', dest='en'):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        texts = text if isinstance(text, list) else [text]
+        results = [SimpleNamespace(text=SAINTS_HEADERS.get(t) or (f"Misc {t[2:]}" if t.startswith('기타') else t))
+                   for t in texts]
+        return results if isinstance(text, list) else results[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Saints sheet or student roster.")
+    parser.add_argument('kind', choices=['saints', 'roster'])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output', type=Path, help=".csv (or .xlsx for saints)")
+    parser.add_argument('--extra-columns', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.kind == 'saints':
+        extra = 20 if args.extra_columns is None else args.extra_columns
+        write_saints_sheet(saints_sheet(args.rows, extra, args.seed), args.output)
+    else:
+        extra = 5 if args.extra_columns is None else args.extra_columns
+        write_roster(roster(args.rows, extra, args.seed), args.output)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+{% macro record_dbt_build() %}
+{# One row per invocation that successfully built a model, seed or snapshot; empty SQL (a skipped hook) otherwise #}
+{% set built = [] %}
+{% for result in results if result.status == 'success' and result.node.resource_type in ['model', 'seed', 'snapshot'] %}
+  {% do built.append(result.node.name) %}
+{% endfor %}
+{% if execute and built %}
+CREATE TABLE IF NOT EXISTS public.dbt_build_log (
+    invocation_id TEXT PRIMARY KEY,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ NOT NULL,
+    nodes_built INTEGER
+);
+INSERT INTO public.dbt_build_log (invocation_id, started_at, finished_at, nodes_built)
+VALUES ('{{ invocation_id }}', '{{ run_started_at }}', now(), {{ built | length }})
+ON CONFLICT (invocation_id) DO UPDATE SET finished_at = EXCLUDED.finished_at, nodes_built = EXCLUDED.nodes_built
+{% endif %}
+{% endmacro %}
@@ -1,7 +1,16 @@
-{% macro sdm_etl_columns()%}
+{% macro sdm_etl_columns(existing_alias=none)%}
+{# On incremental runs, pass the alias of the joined target table to keep the original insert audit and stamp the update audit #}
+{% if existing_alias is not none and is_incremental() %}
+  'DBT_'||'{{this.name}}' as etl_batch_id,
+  COALESCE({{existing_alias}}.etl_insert_user_id, '{{target.user}}') as etl_insert_user_id,
+  COALESCE({{existing_alias}}.etl_insert_rec_dttm, CURRENT_TIMESTAMP) as etl_insert_rec_dttm,
+  cast(CASE WHEN {{existing_alias}}.etl_insert_rec_dttm IS NOT NULL THEN '{{target.user}}' END as varchar(100)) as etl_update_user_id,
+  cast(CASE WHEN {{existing_alias}}.etl_insert_rec_dttm IS NOT NULL THEN CURRENT_TIMESTAMP END as timestamp) as etl_update_rec_dttm
+{% else %}
   'DBT_'||'{{this.name}}' as etl_batch_id,
   '{{target.user}}' as etl_insert_user_id,
   CURRENT_TIMESTAMP as etl_insert_rec_dttm,
   cast(null as varchar(100)) as etl_update_user_id,
   cast(null as timestamp) as etl_update_rec_dttm
-{% endmacro %}
\ No newline at end of file
+{% endif %}
+{% endmacro %}
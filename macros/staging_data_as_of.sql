@@ -0,0 +1,7 @@
+{% macro staging_data_as_of(as_of) %}
+{# Rows of staging_data as they were at `as_of` (a SQL timestamp expression), from the snapshot #}
+SELECT *
+FROM {{ ref('staging_data_snapshot') }}
+-- Same expression as staging_data_snapshot_validity_idx, so the GiST index is used
+WHERE tsrange(dbt_valid_from, dbt_valid_to) @> ({{ as_of }})::TIMESTAMP
+{% endmacro %}
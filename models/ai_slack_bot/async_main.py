@@ -0,0 +1,90 @@
+"""
+Async mode of the Slack bot, on Bolt's AsyncApp.
+
+Handlers only work out the reply and queue it; a ReplyQueue of worker tasks
+posts the replies, paced per channel and retried on rate limits, so a burst of
+messages no longer waits on one blocking HTTP call at a time.
+
+Usage:
+    SLACK_BOT_TOKEN=xoxb-... SLACK_APP_TOKEN=xapp-... python models/ai_slack_bot/async_main.py
+"""
+import os
+import asyncio
+
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+from lookups import answer_lookup, is_lookup
+from responses import get_response, strip_mention
+from reply_queue import DEFAULT_CHANNEL_INTERVAL, ReplyQueue
+
+SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN", "")
+SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN", "")
+
+REPLY_WORKERS = int(os.getenv("SLACK_REPLY_WORKERS", 8))
+REPLY_QUEUE_SIZE = int(os.getenv("SLACK_REPLY_QUEUE_SIZE", 1000))
+CHANNEL_INTERVAL = float(os.getenv("SLACK_CHANNEL_INTERVAL", DEFAULT_CHANNEL_INTERVAL))
+
+async def reply_for(text):
+    """Warehouse answer for a lookup question, else the pattern response."""
+    if is_lookup(text):
+        # Lookups may block on Postgres, so they run off the event loop
+        return await asyncio.to_thread(answer_lookup, text) or get_response(text)
+    return get_response(text)
+
+def build_app(token=SLACK_BOT_TOKEN, client=None, **queue_options):
+    """
+    Create the async app and its reply queue.
+
+    Parameters:
+        token: Bot token (ignored when `client` is given).
+        client: AsyncWebClient to use, e.g. one pointed at the local stub API.
+        queue_options: Passed to ReplyQueue (workers, max_queue, channel_interval, max_retries).
+
+    Returns:
+        (app, reply_queue); start the queue inside the event loop before handling events.
+    """
+    app = AsyncApp(token=token, client=client) if client is not None else AsyncApp(token=token)
+    options = {'workers': REPLY_WORKERS, 'max_queue': REPLY_QUEUE_SIZE, 'channel_interval': CHANNEL_INTERVAL}
+    replies = ReplyQueue(app.client, **{**options, **queue_options})
+
+    # Handle regular messages
+    @app.event("message")
+    async def handle_message_events(body, logger):
+        event = body.get("event", {})
+        # Ignore bot messages to prevent loops
+        if event.get("bot_id"):
+            return
+        response = await reply_for(event.get("text", ""))
+        if response:
+            # Reply in thread
+            replies.submit(event["channel"], response, event.get("thread_ts", event.get("ts")))
+
+    # Handle app mentions (@your-bot-name)
+    @app.event("app_mention")
+    async def handle_app_mention_events(body, logger):
+        event = body["event"]
+        clean_text = strip_mention(event.get("text", ""))
+        response = await reply_for(clean_text) if clean_text else "How can I help you?"
+        replies.submit(event["channel"], response, event.get("thread_ts", event.get("ts")))
+
+    # Error handling
+    @app.error
+    async def custom_error_handler(error, body, logger):
+        logger.error(f"Error: {error}")
+        logger.debug(f"Body: {body}")
+
+    return app, replies
+
+async def main():
+    app, replies = build_app()
+    replies.start()
+    handler = AsyncSocketModeHandler(app, SLACK_APP_TOKEN)
+    print(f"⚡️ Slack bot is running (async, {replies.workers} reply workers)!")
+    try:
+        await handler.start_async()
+    finally:
+        await replies.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
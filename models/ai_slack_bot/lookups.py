@@ -0,0 +1,238 @@
+"""
+Roster lookups for the Slack bot, answered from the warehouse.
+
+    how many saints in North/Youth        -> count from fds_ch.dim_saints
+    how many saints in South team B
+    which team is ID 00371234-00001       -> one saint's region, department and team
+    how many students in Class A          -> count from iba.raw_students
+
+Every question maps onto one of a few fixed, parameterized statements. Answers
+are cached per (statement, parameters) for LOOKUP_CACHE_TTL seconds, and the
+whole cache is dropped as soon as public.dbt_build_log shows a newer dbt build,
+so repeated questions in a busy channel are answered from memory.
+
+Queries go through a small pool of their own (LOOKUP_POOL_SIZE connections).
+Each one runs in a transaction opened with SET TRANSACTION READ ONLY and a
+local statement timeout: behind the transaction pooler a session-level setting
+would not stay with our next transaction.
+"""
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdm_common.db import create_pooled_engine
+
+CACHE_TTL_SECONDS = float(os.getenv("LOOKUP_CACHE_TTL", 300))
+CACHE_MAX_ENTRIES = int(os.getenv("LOOKUP_CACHE_SIZE", 2048))
+# How often the dbt build log is polled; between polls cached answers are served as is
+BUILD_CHECK_SECONDS = float(os.getenv("LOOKUP_BUILD_CHECK", 30))
+POOL_SIZE = int(os.getenv("LOOKUP_POOL_SIZE", 2))
+STATEMENT_TIMEOUT_MS = int(os.getenv("LOOKUP_STATEMENT_TIMEOUT_MS", 5000))
+# Locks shared out among cache keys, so concurrent askers of one question wait for one query
+LOCK_STRIPES = 64
+
+# The statements the bot may run; only their bound parameters come from Slack
+QUERIES = {
+    'latest_build': text("SELECT MAX(finished_at) FROM public.dbt_build_log"),
+    'saint_groups': text("SELECT DISTINCT region, department, team_name FROM fds_ch.cell_group_codes"),
+    'count_saints': text("""
+        SELECT COUNT(*)
+        FROM fds_ch.dim_saints
+        WHERE (CAST(:region AS TEXT) IS NULL OR region = :region)
+          AND (CAST(:department AS TEXT) IS NULL OR department = :department)
+          AND (CAST(:team AS TEXT) IS NULL OR team_name = :team)
+    """),
+    'saint_team': text("""
+        SELECT id, name, region, department, team_id, team_name
+        FROM fds_ch.dim_saints
+        WHERE id = :id
+    """),
+    'count_students': text("""
+        SELECT COUNT(*)
+        FROM iba.raw_students
+        WHERE CAST(:class AS TEXT) IS NULL OR LOWER(class) = LOWER(:class)
+    """),
+}
+
+SCOPE = r"(?:\s+(?:are\s+)?(?:there\s+)?(?:in|from|of)\b)?\s*"
+COUNT_SAINTS = re.compile(r"(?i)\bhow many (?:saints|members)\b" + SCOPE + r"(?P<filters>[^?]*)")
+# Saint IDs (e.g. 00371234-00001) always contain digits, so "what team is he on" is not a lookup
+SAINT_TEAM = re.compile(r"(?i)\b(?:which|what) team (?:is|for|does)\s+(?:id\s*)?(?P<id>(?=[\w-]*\d)[A-Za-z0-9][\w-]*)")
+COUNT_STUDENTS = re.compile(r"(?i)\bhow many students\b" + SCOPE + r"(?P<class>[^?]*)")
+TEAM_FILTER = re.compile(r"(?i)\bteam\s+(?P<team>\w+)")
+
+def _there_are(count, noun):
+    return f"There is 1 {noun}" if count == 1 else f"There are {count:,} {noun}s"
+
+class WarehouseLookups:
+    """Answer lookup questions with cached, read-only, parameterized queries."""
+
+    def __init__(self, engine=None, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                 build_check_interval=BUILD_CHECK_SECONDS, logger=None):
+        self._engine = engine
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.build_check_interval = build_check_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.cache = OrderedDict()
+        self.stats = {'hits': 0, 'queries': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._build = None
+        self._build_checked_at = float('-inf')
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = create_pooled_engine(pool_size=POOL_SIZE, max_overflow=0)
+        return self._engine
+
+    def _fetch(self, name, params):
+        with self.engine.begin() as conn:
+            # Must come first in the transaction; SET LOCAL ends with it
+            conn.execute(text("SET TRANSACTION READ ONLY"))
+            conn.execute(text(f"SET LOCAL statement_timeout = {STATEMENT_TIMEOUT_MS}"))
+            return [tuple(row) for row in conn.execute(QUERIES[name], params)]
+
+    def _execute(self, name, params):
+        with self._lock:
+            self.stats['queries'] += 1
+        return self._fetch(name, params)
+
+    def _check_build(self):
+        """Drop every cached answer if dbt has finished a build since the last check."""
+        now = time.monotonic()
+        if now - self._build_checked_at < self.build_check_interval:
+            return
+        self._build_checked_at = now
+        try:
+            build = self._execute('latest_build', {})[0][0]
+        except SQLAlchemyError as e:
+            # No build log yet (dbt has not run with the hook): rely on the TTL alone
+            self.logger.warning(f"Could not read the dbt build log: {e}")
+            return
+        if build != self._build:
+            with self._lock:
+                if self._build is not None:
+                    self.stats['invalidations'] += 1
+                    self.logger.info(f"New dbt build finished at {build}; clearing {len(self.cache)} cached answers")
+                self.cache.clear()
+                self._build = build
+
+    def query(self, name, **params):
+        """
+        Rows of the statement QUERIES[name], from the cache while fresh.
+
+        Concurrent callers asking the same thing wait for one query instead of each
+        running it. Keys share a fixed set of LOCK_STRIPES locks, so the locks do not
+        grow with the number of distinct questions; two different questions landing on
+        one stripe only run one after the other.
+        """
+        self._check_build()
+        key = (name, tuple(sorted(params.items())))
+        with self._key_locks[hash(key) % LOCK_STRIPES]:
+            with self._lock:
+                entry = self.cache.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self.cache.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+            rows = self._execute(name, params)
+            with self._lock:
+                self.cache[key] = (time.monotonic() + self.ttl, rows)
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+            return rows
+
+    def count_saints(self, filters):
+        groups = self.query('saint_groups')
+        regions = {row[0].lower(): row[0] for row in groups if row[0]}
+        departments = {row[1].lower(): row[1] for row in groups if row[1]}
+        teams = {row[2].lower(): row[2] for row in groups if row[2]}
+
+        params = {'region': None, 'department': None, 'team': None}
+        team = TEAM_FILTER.search(filters)
+        if team:
+            if team.group('team').lower() not in teams:
+                return f"I don't know team '{team.group('team')}'. Teams: {', '.join(sorted(teams.values()))}."
+            params['team'] = teams[team.group('team').lower()]
+            filters = filters[:team.start()] + filters[team.end():]
+        for word in re.split(r"[\s/,]+", filters.strip()):
+            key = word.strip(".!").lower()
+            if not key or key in ('are', 'there', 'in', 'and', 'the', 'total', 'all'):
+                continue
+            if key in regions:
+                params['region'] = regions[key]
+            elif key in departments:
+                params['department'] = departments[key]
+            else:
+                return (f"I don't know '{word}'. Regions: {', '.join(sorted(regions.values()))}; "
+                        f"departments: {', '.join(sorted(departments.values()))}.")
+
+        count = self.query('count_saints', **params)[0][0]
+        scope = " / ".join(value for value in (params['region'], params['department']) if value)
+        if params['team']:
+            scope = f"{scope} team {params['team']}".strip()
+        return _there_are(count, "saint") + (f" in {scope}." if scope else " in total.")
+
+    def saint_team(self, saint_id):
+        rows = self.query('saint_team', id=saint_id)
+        if not rows:
+            return f"I couldn't find a saint with ID {saint_id}."
+        _, name, region, department, team_id, team_name = rows[0]
+        team = f"team {team_name}" + (f" ({team_id})" if team_id is not None else "")
+        return f"{name} ({saint_id}) is in {region} / {department}, {team}."
+
+    def count_students(self, class_name):
+        class_name = class_name.strip().strip(".!") or None
+        count = self.query('count_students', **{'class': class_name})[0][0]
+        return _there_are(count, "student") + (f" in {class_name}." if class_name else " in total.")
+
+    def answer(self, text):
+        """
+        Answer `text` if it is a lookup question.
+
+        Returns:
+            The reply, or None if `text` is not a lookup (so the canned responses apply).
+        """
+        try:
+            match = SAINT_TEAM.search(text)
+            if match:
+                return self.saint_team(match.group('id'))
+            match = COUNT_STUDENTS.search(text)
+            if match:
+                return self.count_students(match.group('class'))
+            match = COUNT_SAINTS.search(text)
+            if match:
+                return self.count_saints(match.group('filters'))
+        except SQLAlchemyError as e:
+            self.logger.error(f"Lookup failed for {text!r}: {e}")
+            return "Sorry, I couldn't reach the warehouse just now. Please try again in a minute."
+        return None
+
+_lookups = None
+
+def get_lookups():
+    """Return the shared WarehouseLookups, created on first use."""
+    global _lookups
+    if _lookups is None:
+        _lookups = WarehouseLookups()
+    return _lookups
+
+def is_lookup(text):
+    """True if `text` is one of the lookup questions (no database access)."""
+    return any(pattern.search(text) for pattern in (SAINT_TEAM, COUNT_STUDENTS, COUNT_SAINTS))
+
+def answer_lookup(text):
+    """Warehouse answer for `text`, or None if it is not a lookup question."""
+    return get_lookups().answer(text)
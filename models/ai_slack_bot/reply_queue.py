@@ -0,0 +1,157 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque, namedtuple
+
+from slack_sdk.errors import SlackApiError
+
+# Slack allows about one chat.postMessage per second per channel (short bursts are tolerated)
+DEFAULT_CHANNEL_INTERVAL = 1.0
+# Reply latencies kept for reporting (the most recent ones)
+LATENCY_SAMPLES = 10000
+
+Reply = namedtuple('Reply', ['channel', 'text', 'thread_ts', 'queued_at'])
+
+def _retry_after(error, default):
+    """Seconds to wait from a 429's Retry-After header (header names are case-insensitive)."""
+    headers = getattr(error.response, 'headers', None) or {}
+    for name, value in headers.items():
+        if name.lower() == 'retry-after':
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                break
+    return default
+
+class ReplyQueue:
+    """
+    Send chat.postMessage replies from a bounded queue with a fixed pool of workers.
+
+    Event handlers only enqueue, so Bolt can acknowledge events immediately.
+    Each channel gets send slots at least `channel_interval` seconds apart. Slots
+    are reserved in dequeue order, so replies to one channel keep their order and a
+    busy channel does not hold up the others. A 429 retries the reply after the
+    Retry-After the API returned and pushes every slot already reserved on that
+    channel back behind it, including those workers are already waiting for.
+    Other failures are retried with exponential back-off and jitter, up to
+    `max_retries` times. `latencies` keeps the last `latency_samples` queue-to-sent times.
+    """
+
+    def __init__(self, client, workers=8, max_queue=1000, channel_interval=DEFAULT_CHANNEL_INTERVAL,
+                 max_retries=5, logger=None, latency_samples=LATENCY_SAMPLES):
+        self.client = client
+        self.workers = workers
+        self.channel_interval = channel_interval
+        self.max_retries = max_retries
+        self.logger = logger or logging.getLogger(__name__)
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.stats = {'sent': 0, 'failed': 0, 'dropped': 0, 'rate_limited': 0, 'retried': 0}
+        self.latencies = deque(maxlen=latency_samples)
+        self._next_slot = {}
+        # Seconds every slot reserved on a channel has been pushed back by 429s so far
+        self._shift = {}
+        self._tasks = []
+
+    def start(self):
+        """Start the worker tasks (call from inside the running event loop)."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    def submit(self, channel, text, thread_ts=None):
+        """
+        Queue a reply without waiting.
+
+        Returns:
+            False if the queue is full and the reply was dropped.
+        """
+        try:
+            self.queue.put_nowait(Reply(channel, text, thread_ts, time.perf_counter()))
+            return True
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            self.logger.warning(f"Reply queue full ({self.queue.maxsize}); dropped reply to {channel}")
+            return False
+
+    async def join(self):
+        """Wait until every queued reply has been sent or given up on."""
+        await self.queue.join()
+
+    async def close(self):
+        """Drain the queue, then stop the workers."""
+        await self.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _wait_for_slot(self, channel, slot=None):
+        now = time.monotonic()
+        if slot is None:
+            # Reserve the slot before awaiting so concurrent workers queue up behind it
+            slot = max(now, self._next_slot.get(channel, now))
+            self._next_slot[channel] = slot + self.channel_interval
+        shift = self._shift.get(channel, 0.0)
+        while True:
+            if slot > time.monotonic():
+                await asyncio.sleep(slot - time.monotonic())
+            # A 429 on this channel while we waited pushes our slot back as well
+            pushed = self._shift.get(channel, 0.0) - shift
+            if not pushed:
+                return
+            slot += pushed
+            shift += pushed
+
+    def _rate_limited(self, channel, delay):
+        """
+        Push every slot reserved on `channel` back behind a retry after `delay` seconds.
+
+        Returns:
+            The monotonic time the rate-limited reply is retried at.
+        """
+        retry_at = time.monotonic() + delay
+        push = delay + self.channel_interval
+        self._shift[channel] = self._shift.get(channel, 0.0) + push
+        self._next_slot[channel] = max(self._next_slot.get(channel, 0.0) + push, retry_at + self.channel_interval)
+        return retry_at
+
+    async def _send(self, reply):
+        retry_at = None
+        for attempt in range(self.max_retries + 1):
+            # A rate-limited reply keeps its place: it retries ahead of the slots pushed back behind it
+            await self._wait_for_slot(reply.channel, retry_at)
+            retry_at = None
+            try:
+                await self.client.chat_postMessage(channel=reply.channel, thread_ts=reply.thread_ts, text=reply.text)
+                return True
+            except SlackApiError as e:
+                if attempt == self.max_retries:
+                    raise
+                if e.response.status_code == 429:
+                    delay = _retry_after(e, self.channel_interval)
+                    self.stats['rate_limited'] += 1
+                    retry_at = self._rate_limited(reply.channel, delay)
+                    self.logger.info(f"Rate limited on {reply.channel}; retrying after {delay:.2f}s")
+                elif e.response.status_code >= 500:
+                    await asyncio.sleep(min(30, 2 ** attempt) * (0.5 + random.random() / 2))
+                else:
+                    raise
+            except (asyncio.TimeoutError, OSError):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(min(30, 2 ** attempt) * (0.5 + random.random() / 2))
+            self.stats['retried'] += 1
+
+    async def _worker(self):
+        while True:
+            reply = await self.queue.get()
+            try:
+                await self._send(reply)
+                self.stats['sent'] += 1
+                self.latencies.append(time.perf_counter() - reply.queued_at)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.logger.error(f"Failed to reply in {reply.channel}: {e}")
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,36 @@
+import re
+
+from router import IntentRouter, Rule, rule_files_from_env
+
+# Define patterns and responses
+# You can customize these patterns and responses as needed
+RESPONSE_PATTERNS = [
+    (r"(?i)hello|hi|hey", "Hello there! How can I help you today?"),
+    (r"(?i)thanks|thank you", "You're welcome!"),
+    (r"(?i)help", "I'm a bot that can help with various queries. What do you need assistance with?"),
+    # Add more patterns as needed
+]
+
+DEFAULT_RESPONSE = "I'm not sure how to respond to that. Could you provide more details?"
+
+_router = None
+
+def get_router():
+    """
+    Return the shared intent router: RESPONSE_PATTERNS (in list order) plus any JSON
+    rule files named in $SLACK_BOT_RULES, which are reloaded when they change.
+    """
+    global _router
+    if _router is None:
+        rules = [Rule(f"builtin_{i}", pattern, response, 0) for i, (pattern, response) in enumerate(RESPONSE_PATTERNS)]
+        _router = IntentRouter(rules, rule_files_from_env(), default_response=DEFAULT_RESPONSE)
+    return _router
+
+def get_response(text):
+    """Generate a response based on the input text using regex patterns"""
+    # Rules indexed by their literal text and ranked, memoized per text; the default response if none matches
+    return get_router().route(text)
+
+def strip_mention(text):
+    """Remove bot mentions (<@U123>) so only the command text is left."""
+    return re.sub(r'<@[A-Z0-9]+>', '', text).strip()
@@ -0,0 +1,374 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict, namedtuple
+
+Rule = namedtuple('Rule', ['name', 'pattern', 'response', 'priority'])
+
+def keyword_pattern(keywords):
+    """Case-insensitive whole-word pattern for a list of literal trigger words."""
+    return r"(?i)\b(?:" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")\b"
+
+def load_rule_file(path):
+    """
+    Read rules from a JSON file: a list of objects with 'response' and either
+    'pattern' (a regex) or 'keywords' (literal words), plus optional 'name' and
+    'priority' (higher wins, default 0).
+
+    Returns:
+        list of Rule.
+    """
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    rules = []
+    for i, entry in enumerate(entries):
+        pattern = entry.get('pattern') or (keyword_pattern(entry['keywords']) if entry.get('keywords') else None)
+        if not pattern or 'response' not in entry:
+            raise ValueError(f"{path}: rule {i} needs 'response' and 'pattern' or 'keywords'")
+        rules.append(Rule(entry.get('name', f"{Path(path).stem}_{i}"), pattern, entry['response'],
+                          int(entry.get('priority', 0))))
+    return rules
+
+class _Unsupported(Exception):
+    pass
+
+# Longest prefix of a literal used as an index key
+INDEX_KEY_LENGTH = 4
+_LEADING_FLAGS = re.compile(r'\(\?([aiLmsux]+)\)')
+_QUANTIFIER = re.compile(r'\{(\d*)(,?)(\d*)\}')
+_CHAR_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+_fold_table = None
+
+def _case_folding():
+    """
+    str.translate table mapping every cased character to one representative of
+    the characters re.IGNORECASE treats as equal to it (e.g. 'K', 'k' and the
+    Kelvin sign). The equalities are asked of re itself, so folded text contains
+    a folded literal wherever a case-insensitive pattern finds that literal.
+    """
+    global _fold_table
+    if _fold_table is None:
+        parent = {}
+
+        def find(c):
+            while parent.setdefault(c, c) != c:
+                c = parent[c]
+            return c
+
+        for code in range(0x20000):
+            c = chr(code)
+            if c.lower() == c and c.upper() == c:
+                continue
+            same = re.compile(re.escape(c), re.IGNORECASE).fullmatch
+            for other in {c.lower()[:1], c.upper()[:1], c.casefold()[:1], c.title()[:1]} - {c, ''}:
+                if same(other):
+                    parent[find(other)] = find(c)
+        _fold_table = {ord(c): ord(find(c)) for c in list(parent) if find(c) != c}
+    return _fold_table
+
+def _skip_class(pattern, i):
+    i += 1
+    if pattern[i] == '^':
+        i += 1
+    if pattern[i] == ']':
+        i += 1
+    while pattern[i] != ']':
+        i += 2 if pattern[i] == '\\' else 1
+    return i + 1
+
+def _alternation(pattern, i):
+    # Literals one of which every match of the branches from i contains, or None
+    branches = []
+    while True:
+        best, i = _sequence(pattern, i)
+        branches.append(best)
+        if i < len(pattern) and pattern[i] == '|':
+            i += 1
+            continue
+        if not all(branches):
+            return None, i
+        return tuple(sorted({literal for options in branches for literal in options})), i
+
+def _sequence(pattern, i):
+    best, run = None, []
+
+    def consider(options):
+        nonlocal best
+        if options and (best is None or min(map(len, options)) > min(map(len, best))):
+            best = options
+
+    def end_run():
+        consider((''.join(run),) if run else None)
+        run.clear()
+
+    while i < len(pattern) and pattern[i] not in '|)':
+        c = pattern[i]
+        char = options = None
+        zero_width = False
+        if c == '\\':
+            escape = pattern[i + 1]
+            i += 2
+            if escape in 'bBAZ':
+                zero_width = True
+            elif escape in _CHAR_ESCAPES:
+                char = _CHAR_ESCAPES[escape]
+            elif escape.isalnum():
+                if escape not in 'sSdDwW':
+                    raise _Unsupported(escape)  # backreferences, \x, \u, \N
+            else:
+                char = escape
+        elif c in '^$':
+            zero_width = True
+            i += 1
+        elif c == '.':
+            i += 1
+        elif c == '[':
+            i = _skip_class(pattern, i)
+        elif c == '(':
+            if pattern.startswith(('(?=', '(?!'), i):
+                _, i = _alternation(pattern, i + 3)
+                zero_width = True
+            elif pattern.startswith(('(?<=', '(?<!'), i):
+                _, i = _alternation(pattern, i + 4)
+                zero_width = True
+            elif pattern.startswith('(?:', i):
+                options, i = _alternation(pattern, i + 3)
+            elif pattern.startswith('(?P<', i):
+                options, i = _alternation(pattern, pattern.index('>', i) + 1)
+            elif pattern.startswith('(?', i):
+                raise _Unsupported(pattern[i:i + 3])  # scoped flags, comments, conditionals
+            else:
+                options, i = _alternation(pattern, i + 1)
+            if pattern[i] != ')':
+                raise _Unsupported(c)
+            i += 1
+        elif c in '*+?{':
+            raise _Unsupported(c)
+        else:
+            char = c
+            i += 1
+        if zero_width:
+            # Consumes nothing, so the characters around it stay adjacent
+            continue
+
+        minimum, quantified = 1, i < len(pattern) and pattern[i] in '*+?{'
+        if quantified:
+            if pattern[i] == '{':
+                m = _QUANTIFIER.match(pattern, i)
+                if not m:
+                    raise _Unsupported(pattern[i])
+                minimum, i = int(m.group(1) or 0), m.end()
+            else:
+                minimum, i = (0 if pattern[i] in '*?' else 1), i + 1
+            if i < len(pattern) and pattern[i] in '?+':
+                i += 1  # lazy or possessive
+        if char is not None and minimum:
+            run.append(char)
+            if quantified:
+                end_run()
+        else:
+            end_run()
+            if options and minimum:
+                consider(options)
+    end_run()
+    return best, i
+
+def required_literals(pattern):
+    """
+    Literal strings one of which occurs in every match of `pattern`, found by
+    reading the pattern: plain characters, escapes, groups, alternations,
+    quantifiers and leading inline flags are understood, and the longest run of
+    literal characters every match must contain is chosen.
+
+    Returns:
+        (tuple of literals, ignorecase) or None when the pattern uses syntax
+        this does not read or no literal is required (e.g. r'\\d+').
+    """
+    flags, i = '', 0
+    while m := _LEADING_FLAGS.match(pattern, i):
+        flags, i = flags + m.group(1), m.end()
+    if 'x' in flags or 'L' in flags:
+        return None
+    try:
+        options, end = _alternation(pattern, i)
+    except (_Unsupported, IndexError, ValueError):
+        return None
+    if not options or end != len(pattern):
+        return None
+    return options, 'i' in flags
+
+class _LiteralIndex:
+    """
+    Rank positions of rules by their required literals, bucketed by the first
+    INDEX_KEY_LENGTH characters. One pass over a message's substrings of the key
+    lengths finds the buckets present, and each bucket then looks up the text at
+    that position once per distinct literal length it holds, so the work per
+    message does not depend on how many rules share a prefix.
+    """
+
+    def __init__(self, fold=None):
+        self.fold = fold
+        # key -> (literal -> rank positions, sorted literal lengths)
+        self.buckets = {}
+
+    def add(self, rank, literals):
+        for literal in literals:
+            if self.fold:
+                literal = literal.translate(self.fold)
+            ranks, lengths = self.buckets.setdefault(literal[:INDEX_KEY_LENGTH], ({}, []))
+            ranks.setdefault(literal, []).append(rank)
+            if len(literal) not in lengths:
+                lengths.append(len(literal))
+                lengths.sort()
+
+    def candidates(self, text, found):
+        if not self.buckets:
+            return
+        if self.fold:
+            text = text.translate(self.fold)
+        for key_length in sorted({len(key) for key in self.buckets}):
+            for i in range(len(text) - key_length + 1):
+                bucket = self.buckets.get(text[i:i + key_length])
+                if bucket:
+                    ranks, lengths = bucket
+                    for length in lengths:
+                        found.update(ranks.get(text[i:i + length], ()))
+
+class IntentRouter:
+    """
+    Match messages against prioritized rules.
+
+    Rules are ranked by priority (higher first, then definition order) and
+    compiled once. Each message is scanned once against an index of the literal
+    text the rules require (see required_literals); only the rules whose literals
+    occur, plus the few whose patterns yield no literal, are then searched with
+    their compiled pattern in rank order. The first one found anywhere in the
+    text wins, as with the former loop of re.search over pattern strings, while
+    the cost of a message no longer grows with the number of rules.
+
+    Responses are memoized per message text in a bounded LRU cache shared by the
+    threads handling messages. Rule files are re-read when their mtime changes
+    (checked at most every `reload_interval` seconds); a file that fails to load
+    keeps the previous rules.
+    """
+
+    def __init__(self, rules=(), rule_files=(), default_response=None, cache_size=1024,
+                 reload_interval=5.0, logger=None):
+        self.base_rules = list(rules)
+        self.rule_files = [Path(p) for p in rule_files]
+        self.default_response = default_response
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.cache = OrderedDict()
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._mtimes = {}
+        self._checked_at = 0.0
+        self._compile(self.base_rules + self._load_files())
+
+    def _load_files(self):
+        rules = []
+        for path in self.rule_files:
+            self._mtimes[path] = path.stat().st_mtime if path.exists() else None
+            if path.exists():
+                rules.extend(load_rule_file(path))
+        return rules
+
+    def _compile(self, rules):
+        # Stable sort keeps definition order within a priority
+        rules = sorted(rules, key=lambda rule: -rule.priority)
+        patterns = []
+        exact, folded, unindexed = _LiteralIndex(), _LiteralIndex(_case_folding()), []
+        for rank, rule in enumerate(rules):
+            try:
+                patterns.append(re.compile(rule.pattern))
+            except re.error as e:
+                raise ValueError(f"Rule {rule.name!r} has an invalid pattern: {e}") from e
+            literals = required_literals(rule.pattern)
+            if literals is None:
+                unindexed.append(rank)
+            else:
+                (folded if literals[1] else exact).add(rank, literals[0])
+        compiled = (patterns, exact, folded, unindexed)
+        with self._lock:
+            # Swapped together, so a concurrent match sees either the old or the new rules
+            self.rules, self._compiled = rules, compiled
+            self.cache.clear()
+
+    def _first_match(self, rules, compiled, text):
+        patterns, exact, folded, unindexed = compiled
+        found = set(unindexed)
+        exact.candidates(text, found)
+        folded.candidates(text, found)
+        for rank in sorted(found):
+            if patterns[rank].search(text):
+                return rules[rank]
+        return None
+
+    def maybe_reload(self):
+        """Recompile if a rule file changed since it was last loaded."""
+        now = time.monotonic()
+        if not self.rule_files or now - self._checked_at < self.reload_interval:
+            return False
+        # One thread checks and reloads; the others keep routing with the current rules
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._checked_at = now
+            changed = [path for path in self.rule_files
+                       if (path.stat().st_mtime if path.exists() else None) != self._mtimes.get(path)]
+            if not changed:
+                return False
+            try:
+                self._compile(self.base_rules + self._load_files())
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Keeping previous rules; could not reload {', '.join(map(str, changed))}: {e}")
+                return False
+            self.logger.info(f"Reloaded {len(self.rules)} rules after changes to {', '.join(map(str, changed))}")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def match(self, text):
+        """
+        Return the highest-ranked rule matching anywhere in `text`, or None.
+        """
+        with self._lock:
+            rules, compiled = self.rules, self._compiled
+        return self._first_match(rules, compiled, text)
+
+    def route(self, text):
+        """Response for `text`: cached, else from the best matching rule, else the default response."""
+        self.maybe_reload()
+        # Keyed and matched on the text as received: patterns may depend on
+        # newlines or repeated spaces, so normalizing could change the answer
+        key = str(text)
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            self.misses += 1
+            rules, compiled = self.rules, self._compiled
+        rule = self._first_match(rules, compiled, key)
+        response = rule.response if rule else self.default_response
+        if self.cache_size:
+            with self._lock:
+                if self._compiled is not compiled:
+                    # Rules were reloaded meanwhile; do not cache an answer from the old ones
+                    return response
+                self.cache[key] = response
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return response
+
+def rule_files_from_env(variable='SLACK_BOT_RULES'):
+    """Rule file paths from an os.pathsep-separated environment variable."""
+    return [path for path in os.getenv(variable, '').split(os.pathsep) if path]
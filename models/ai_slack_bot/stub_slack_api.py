@@ -0,0 +1,107 @@
+"""
+Local stand-in for the Slack Web API, for offline load tests of the bot.
+
+Serves auth.test and chat.postMessage under /api/. chat.postMessage is rate
+limited per channel with a token bucket (`rate` messages per second, bursts of
+`burst`). Over the limit it answers HTTP 429 with a Retry-After header, as Slack does.
+
+Usage:
+    python models/ai_slack_bot/stub_slack_api.py --port 8765 --rate 1 --burst 3
+    # then point a client at it: AsyncWebClient(token="xoxb-stub", base_url="http://127.0.0.1:8765/api/")
+"""
+import time
+import asyncio
+import argparse
+
+from aiohttp import web
+
+class StubSlackApi:
+    """In-process stub server; `messages` holds every accepted post, `rejected` counts 429s."""
+
+    def __init__(self, rate=1.0, burst=3, latency=0.0):
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency
+        self.messages = []
+        self.rejected = 0
+        self._buckets = {}
+        self._runner = None
+
+    def _take_token(self, channel):
+        """Return 0 if a message may be posted now, else the seconds until the next token."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(channel, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[channel] = (tokens - 1, now)
+            return 0.0
+        self._buckets[channel] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+    async def _params(self, request):
+        if request.content_type == 'application/json':
+            return await request.json()
+        return dict(await request.post())
+
+    async def auth_test(self, request):
+        return web.json_response({'ok': True, 'url': 'https://stub.slack.local/', 'team': 'stub',
+                                  'user': 'bot', 'team_id': 'T0STUB', 'user_id': 'U0BOT', 'bot_id': 'B0BOT'})
+
+    async def chat_post_message(self, request):
+        params = await self._params(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        channel = params.get('channel')
+        if not channel:
+            return web.json_response({'ok': False, 'error': 'channel_not_found'})
+        wait = self._take_token(channel)
+        if wait:
+            self.rejected += 1
+            # Slack sends whole seconds; the stub keeps the fraction so short benchmarks stay short
+            return web.json_response({'ok': False, 'error': 'ratelimited'}, status=429,
+                                     headers={'Retry-After': f"{wait:.3f}"})
+        ts = f"{time.time():.6f}"
+        self.messages.append({'channel': channel, 'text': params.get('text'),
+                              'thread_ts': params.get('thread_ts'), 'ts': ts, 'received_at': time.perf_counter()})
+        return web.json_response({'ok': True, 'channel': channel, 'ts': ts,
+                                  'message': {'text': params.get('text'), 'ts': ts}})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post('/api/auth.test', self.auth_test)
+        app.router.add_post('/api/chat.postMessage', self.chat_post_message)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Start serving in the running event loop.
+
+        Returns:
+            Base URL for AsyncWebClient(base_url=...).
+        """
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/api/"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub of the Slack Web API.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=1.0, help="chat.postMessage per second per channel")
+    parser.add_argument('--burst', type=int, default=3, help="Messages a channel may burst before 429s")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    stub = StubSlackApi(args.rate, args.burst, args.latency)
+    print(f"Stub Slack API on http://127.0.0.1:{args.port}/api/ "
+          f"({args.rate}/s per channel, burst {args.burst})")
+    web.run_app(stub.make_app(), host='127.0.0.1', port=args.port, print=None)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+{{
+  config({
+    'schema': 'fds_ch', 
+    "materialized": 'table',
+    "tags": 'dim_saints',
+    "indexes": [
+      {'columns': ['new_cell_grp'], 'unique': True}
+    ]
+  })
+}}
+-- One row per distinct cell-group code, decoded once against the code seeds
+WITH codes AS (
+    SELECT DISTINCT new_cell_grp
+    FROM {{ source('public', 'staging_data') }}
+    WHERE new_cell_grp IS NOT NULL
+)
+SELECT
+    C.new_cell_grp,
+    COALESCE(R.region, 'Unknown') AS region,
+    COALESCE(D.department, 'Unknown') AS department,
+    REGEXP_SUBSTR(C.new_cell_grp, '[0-9]+')::INT AS team_id,
+    COALESCE(T.team_name, 'Unknown') AS team_name
+FROM codes C
+LEFT JOIN {{ ref('cell_group_regions') }} R
+    ON R.code = SUBSTRING(C.new_cell_grp, 2, 1)
+LEFT JOIN {{ ref('cell_group_departments') }} D
+    ON D.code = SUBSTRING(C.new_cell_grp, 3, 1)
+LEFT JOIN {{ ref('cell_group_teams') }} T
+    ON T.code = SUBSTRING(C.new_cell_grp, 1, 1)
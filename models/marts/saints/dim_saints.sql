@@ -1,32 +1,27 @@
 {{
   config({
     'schema': 'fds_ch', 
-    "materialized": 'table',
-    "tags": 'dim_saints'
+    "materialized": 'incremental',
+    "unique_key": 'ID',
+    "incremental_strategy": 'delete+insert',
+    "on_schema_change": 'append_new_columns',
+    "tags": 'dim_saints',
+    "post_hook": [
+      "CREATE INDEX IF NOT EXISTS staging_data_updated_at_idx ON {{ source('public', 'staging_data') }} (updated_at)",
+      "CREATE INDEX IF NOT EXISTS staging_data_new_cell_grp_idx ON {{ source('public', 'staging_data') }} (new_cell_grp)",
+      "DELETE FROM {{ this }} D USING {{ source('public', 'staging_data') }} S
+       WHERE D.ID = S.scj_number
+         AND NOT COALESCE((S.TEAM::TEXT != 'RL') OR (S.new_cell_grp != 'Ins.RED LIST'), FALSE)"
+    ]
   })
 }}
 SELECT
-    scj_number AS ID,
-    INITCAP(TRIM(REGEXP_REPLACE(name, '[^a-zA-Z ]', '', 'g'))) AS name,
-    CASE 
-        WHEN SUBSTRING(new_cell_grp, 2, 1) IN ('N') THEN 'North'
-        WHEN SUBSTRING(new_cell_grp, 2, 1) IN ('S') THEN 'South'
-        ELSE 'Unknown'
-    END AS region,
-    CASE 
-        WHEN SUBSTRING(new_cell_grp, 3, 1) = 'Y' THEN 'Youth'
-        WHEN SUBSTRING(new_cell_grp, 3, 1) = 'M' THEN 'Men'
-        WHEN SUBSTRING(new_cell_grp, 3, 1) = 'W' THEN 'Women'
-        ELSE 'Unknown'
-    END AS department,
-    REGEXP_SUBSTR(new_cell_grp, '[0-9]+')::INT AS team_id,
-    CASE 
-        WHEN SUBSTRING(new_cell_grp, 1, 1) IN ('A') THEN 'A'
-        WHEN SUBSTRING(new_cell_grp, 1, 1) IN ('B') THEN 'B'
-        WHEN SUBSTRING(new_cell_grp, 1, 1) IN ('C') THEN 'C'
-        WHEN SUBSTRING(new_cell_grp, 1, 1) IN ('D') THEN 'D'
-        ELSE 'Unknown'
-    END AS team_name,
+    A.scj_number AS ID,
+    INITCAP(TRIM(REGEXP_REPLACE(A.name, '[^a-zA-Z ]', '', 'g'))) AS name,
+    COALESCE(G.region, 'Unknown') AS region,
+    COALESCE(G.department, 'Unknown') AS department,
+    G.team_id,
+    COALESCE(G.team_name, 'Unknown') AS team_name,
     NULL AS Date_of_birth,
     NULL AS Gender,
     NULL AS Phone_number,
@@ -34,9 +29,27 @@ SELECT
     NUll AS State,
     NULL AS Zip_code,
     NULL AS Country,
-    {{ sdm_etl_columns() }}
+    A.updated_at AS source_updated_at,
+    {{ sdm_etl_columns(existing_alias='T') }}
 FROM {{ source('public', 'staging_data') }} A
+-- Decoded cell-group attributes, computed once per distinct code
+LEFT JOIN {{ ref('cell_group_codes') }} G
+    ON G.new_cell_grp = A.new_cell_grp
+{% if is_incremental() %}
+-- Existing dimension rows, used by sdm_etl_columns to preserve the insert audit
+LEFT JOIN {{ this }} T
+    ON T.ID = A.scj_number
+{% endif %}
 WHERE
-(A.TEAM != 'RL')
+((A.TEAM::TEXT != 'RL')
 OR
-(new_cell_grp != 'Ins.RED LIST')
+(A.new_cell_grp != 'Ins.RED LIST'))
+{% if is_incremental() %}
+{%- set existing_columns = adapter.get_columns_in_relation(this) | map(attribute='name') | map('lower') | list %}
+{% if 'source_updated_at' in existing_columns %}
+-- Only rows the loader touched since the last build. All batches of a load share one
+-- updated_at and commit separately, so >= picks up batches committed after that build;
+-- delete+insert makes reprocessing the boundary rows harmless.
+AND A.updated_at >= (SELECT COALESCE(MAX(source_updated_at), '1900-01-01'::timestamp) FROM {{ this }})
+{% endif %}
+{% endif %}
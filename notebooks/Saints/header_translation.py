@@ -0,0 +1,176 @@
+import os
+import csv
+import json
+import asyncio
+import inspect
+from pathlib import Path
+
+# Translations are kept next to the notebooks unless SDM_CACHE_DIR points elsewhere
+CACHE_DIR = Path(os.getenv('SDM_CACHE_DIR', Path(__file__).resolve().parent.parent / '.cache'))
+DEFAULT_CACHE_PATH = CACHE_DIR / 'header_translations.json'
+
+def translate_sync(text, translator, src='ko', dest='en'):
+    """
+    Synchronously translate text using the asynchronous translator.
+    Accepts a single string or a list of strings (one batched round trip).
+    """
+    result = translator.translate(text, src=src, dest=dest)
+    if inspect.isawaitable(result):
+        loop = asyncio.get_event_loop()
+        result = loop.run_until_complete(result)
+    return result
+
+def contains_korean(text):
+    """Return True if the text contains any Hangul syllable."""
+    return any('\uac00' <= ch <= '\ud7a3' for ch in str(text))
+
+def normalize_header(text):
+    """Collapse whitespace so that '이름 ' and ' 이름' share one cache entry."""
+    return ' '.join(str(text).split())
+
+def _compact_key(text):
+    # Looser key used only as a fallback when the translator is unavailable
+    return ''.join(ch for ch in str(text) if ch.isalnum())
+
+class HeaderTranslationCache:
+    """
+    Translate Korean column headers through a persistent on-disk cache.
+
+    Lookups are resolved from the offline glossary first, then from the cache
+    of earlier translations. Only the remaining misses are sent to the
+    translator, all of them in a single batched request.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, glossary_path=None,
+                 translator_factory=None, src='ko', dest='en'):
+        self.cache_path = Path(cache_path)
+        self.translator_factory = translator_factory
+        self.src = src
+        self.dest = dest
+        self.glossary = {}
+        self.cache = self._load_cache()
+        self._translator = None
+        self._dirty = False
+        glossary_path = glossary_path or os.getenv('SDM_HEADER_GLOSSARY')
+        if glossary_path:
+            self.load_glossary(glossary_path)
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read translation cache {self.cache_path}: {e}. Starting empty.")
+            return {}
+
+    def load_glossary(self, glossary_path):
+        """
+        Preload fixed translations from a CSV (korean,english) or JSON object file.
+        Glossary entries take precedence over cached and online translations.
+        """
+        glossary_path = Path(glossary_path)
+        if glossary_path.suffix.lower() == '.json':
+            with open(glossary_path, encoding='utf-8') as f:
+                entries = json.load(f).items()
+        else:
+            with open(glossary_path, encoding='utf-8-sig', newline='') as f:
+                entries = [tuple(row[:2]) for row in csv.reader(f) if len(row) >= 2]
+        for korean, english in entries:
+            if contains_korean(korean) and english.strip():
+                self.glossary[normalize_header(korean)] = english.strip()
+        print(f"Loaded {len(self.glossary)} glossary translations from {glossary_path}")
+
+    def lookup(self, header):
+        """Return the known translation for a header, or None."""
+        key = normalize_header(header)
+        return self.glossary.get(key) or self.cache.get(key)
+
+    def _fallback_lookup(self, header):
+        compact = _compact_key(header)
+        for known in (self.glossary, self.cache):
+            for key, value in known.items():
+                if _compact_key(key) == compact:
+                    return value
+        return None
+
+    def translate_headers(self, headers):
+        """
+        Translate every Korean header in `headers`.
+
+        Returns:
+            dict mapping each original header to its translation (non-Korean
+            headers map to themselves).
+        """
+        translations = {}
+        misses = []
+        for header in headers:
+            if not contains_korean(header):
+                translations[header] = header
+                continue
+            known = self.lookup(header)
+            if known is not None:
+                translations[header] = known
+            elif normalize_header(header) not in misses:
+                misses.append(normalize_header(header))
+
+        if misses:
+            resolved = self._translate_batch(misses)
+            for header in headers:
+                if header in translations:
+                    continue
+                key = normalize_header(header)
+                if key in resolved:
+                    translations[header] = resolved[key]
+                else:
+                    fallback = self._fallback_lookup(header)
+                    if fallback is None:
+                        print(f"No translation available for column '{header}'. Keeping original.")
+                    translations[header] = fallback or header
+            self.save()
+
+        return translations
+
+    def _translate_batch(self, texts):
+        try:
+            # The translator is only built once a miss actually needs the network
+            if self._translator is None:
+                self._translator = (self.translator_factory or _default_translator)()
+            results = translate_sync(texts, self._translator, src=self.src, dest=self.dest)
+        except Exception as e:
+            print(f"Translator unavailable ({e}). Falling back to cached translations.")
+            return {}
+        if not isinstance(results, (list, tuple)):
+            results = [results]
+
+        resolved = {}
+        for text, result in zip(texts, results):
+            translated = getattr(result, 'text', None)
+            if translated and translated.strip():
+                resolved[text] = translated.strip()
+                self.cache[text] = resolved[text]
+                self._dirty = True
+                print(f"Translated '{text}' to '{resolved[text]}'")
+        return resolved
+
+    def save(self):
+        """
+        Write new translations back to disk (atomic replace).
+
+        Translations saved meanwhile by other processes (e.g. parallel sheet
+        workers) are merged in first, and each process writes its own temp file.
+        """
+        if not self._dirty:
+            return
+        self.cache = {**self._load_cache(), **self.cache}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+def _default_translator():
+    from googletrans import Translator
+    return Translator()
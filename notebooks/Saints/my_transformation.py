@@ -1,95 +1,355 @@
 import os
+import sys
+import time
+import hashlib
+import argparse
 import warnings
-from datetime import datetime
-import asyncio
+import importlib.util
+from datetime import date, datetime
 import nest_asyncio
 from pathlib import Path
+from contextlib import contextmanager
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 import pandas as pd
-from sqlalchemy import create_engine, MetaData, Table, Column, String, DateTime, or_
+from sqlalchemy import (MetaData, Table, Column, String, DateTime, Date, Boolean,
+                        SmallInteger, Integer, BigInteger, Float, or_, text)
 from sqlalchemy.dialects.postgresql import insert
-from fuzzywuzzy import process
-from googletrans import Translator
+
+from header_translation import HeaderTranslationCache
+
+# Make the shared sdm_common package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdm_common.columns import ColumnResolver
+from sdm_common.db import get_engine
+from sdm_common.dtypes import apply_dtypes, low_memory_dtypes, parse_dtypes
+from sdm_common.sheet_cache import SheetCache, stringify_mixed_columns
+from sdm_common.ledger import IngestionLedger
+from sdm_common.metrics import get_run_report, stage
+from sdm_common.postgres import copy_dataframe
 
 # Suppress warnings and enable nested asyncio
 warnings.filterwarnings('ignore')
 nest_asyncio.apply()
 
-def translate_sync(text, translator, src='ko', dest='en'):
+# Rows parsed per chunk when streaming source files (see read_until_first_empty_row)
+READ_CHUNK_SIZE = int(os.getenv('SDM_READ_CHUNK_SIZE', 10000))
+
+# Read-only engine for .xlsx sheets: 'calamine' (python-calamine) or 'openpyxl'; see excel_engine
+EXCEL_ENGINE = os.getenv('SDM_EXCEL_ENGINE', '').lower()
+
+# Targets parsed as categoricals / Arrow strings instead of object columns
+CATEGORY_TARGETS = ('department', 'team', 'new cell grp', 'office')
+STRING_TARGETS = ('name',)
+
+# Rows copied and merged per transaction by bulk_merge_data
+UPSERT_BATCH_SIZE = int(os.getenv('SDM_UPSERT_BATCH_SIZE', 50000))
+
+# Parsed sheets allowed to wait for the writer, beyond the ones being parsed (see read_workbook)
+SHEET_QUEUE_SIZE = int(os.getenv('SDM_SHEET_QUEUE_SIZE', 2))
+
+_translation_cache = None
+_column_resolver = None
+_sheet_cache = None
+
+def get_translation_cache():
     """
-    Synchronously translate text using the asynchronous translator.
+    Return the process-wide header translation cache, creating it on first use
+    so the on-disk store and glossary are loaded once per run.
     """
-    loop = asyncio.get_event_loop()
-    result = loop.run_until_complete(translator.translate(text, src=src, dest=dest))
-    return result
+    global _translation_cache
+    if _translation_cache is None:
+        _translation_cache = HeaderTranslationCache()
+    return _translation_cache
 
-def read_spreadsheet_with_fuzzy_matching(file_path, sheet_name=None, target_columns=None):
+def _unique_header(header):
     """
-    Read spreadsheet data with fuzzy column name matching, automatically translating
-    any Korean column names to English, and stopping at the first completely empty row.
+    Name blank and repeated header cells the way pandas does
+    ('Unnamed: 3', 'name.1') so streamed and eager reads agree.
+    """
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def excel_engine():
+    """
+    Engine streaming .xlsx rows: $SDM_EXCEL_ENGINE if set, else the faster
+    Rust-based 'calamine' when python-calamine is installed, else 'openpyxl'.
+    Asking for calamine without python-calamine falls back to openpyxl.
+    """
+    engine = EXCEL_ENGINE or 'calamine'
+    if engine not in ('calamine', 'openpyxl'):
+        raise ValueError(f"Unsupported SDM_EXCEL_ENGINE: {engine}")
+    if engine == 'calamine' and importlib.util.find_spec('python_calamine') is None:
+        return 'openpyxl'
+    return engine
+
+def _calamine_cell(value):
+    # Give calamine cells the values openpyxl returns: None for empty cells,
+    # int for whole numbers, datetime for dates
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+@contextmanager
+def _open_xlsx(file_path):
+    """
+    Open an .xlsx workbook read-only with excel_engine().
+
+    Yields:
+        (sheet names, rows): rows(sheet_name) iterates the value tuples of a
+        sheet (the first sheet when sheet_name is None), from its first row.
+    """
+    if excel_engine() == 'calamine':
+        from python_calamine import CalamineWorkbook
+
+        workbook = CalamineWorkbook.from_path(str(file_path))
+        names = workbook.sheet_names
+
+        def rows(sheet_name):
+            sheet = workbook.get_sheet_by_name(sheet_name) if sheet_name else workbook.get_sheet_by_index(0)
+            # Rows are padded from the top but start at the first used column
+            padding = (None,) * (sheet.start[1] if sheet.start else 0)
+            return (padding + tuple(map(_calamine_cell, row)) for row in sheet.iter_rows())
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        names = workbook.sheetnames
+
+        def rows(sheet_name):
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            return sheet.iter_rows(values_only=True)
+    try:
+        yield names, rows
+    finally:
+        workbook.close()
+
+def _iter_excel_chunks(file_path, sheet_name, chunk_size, usecols=None):
+    """
+    Yield DataFrame chunks of at most `chunk_size` rows from an .xlsx sheet
+    using a read-only engine (see excel_engine), so rows are parsed lazily.
+    `usecols` is a list of column positions to keep (all columns if None).
+    """
+    with _open_xlsx(file_path) as (_, sheet_rows):
+        rows = sheet_rows(sheet_name)
+        header = _unique_header(next(rows, ()))
+        if usecols is not None:
+            positions = sorted(usecols)
+            header = [header[i] for i in positions]
+        start, buffer = 0, []
+        for row in rows:
+            if usecols is None:
+                buffer.append(row[:len(header)])
+            else:
+                buffer.append(tuple(row[i] if i < len(row) else None for i in positions))
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer))).infer_objects()
+                start += len(buffer)
+                buffer = []
+        if buffer or start == 0:
+            yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer))).infer_objects()
+
+def get_column_resolver():
+    """Return the process-wide fuzzy column resolver (mappings cached by header layout)."""
+    global _column_resolver
+    if _column_resolver is None:
+        _column_resolver = ColumnResolver()
+    return _column_resolver
+
+def read_spreadsheet_header(file_path, sheet_name=None):
+    """
+    Read only the header row of a spreadsheet.
+    
+    Returns:
+        list of column names, with blank and repeated names disambiguated as pandas does.
+    """
+    file_ext = file_path.suffix.lower()
+    if file_ext == '.csv':
+        return pd.read_csv(file_path, nrows=0).columns.tolist()
+    if file_ext == '.xlsx':
+        with _open_xlsx(file_path) as (_, rows):
+            return _unique_header(next(rows(sheet_name), ()))
+    if file_ext == '.xls':
+        return pd.read_excel(file_path, sheet_name=sheet_name or 0, nrows=0).columns.tolist()
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+def get_sheet_cache():
+    """Return the process-wide Parquet sheet cache (see sdm_common.sheet_cache)."""
+    global _sheet_cache
+    if _sheet_cache is None:
+        _sheet_cache = SheetCache()
+    return _sheet_cache
+
+def read_until_first_empty_row(file_path, sheet_name=None, chunk_size=10000, usecols=None, dtype=None):
+    """
+    Stream a spreadsheet in chunks of `chunk_size` rows and stop reading at the
+    first completely empty row. Anything after it (scratch areas, trailing junk)
+    is never parsed, so peak memory is bounded by the chunk size plus the rows kept.
     
     Parameters:
         file_path: Path object for the spreadsheet file.
         sheet_name: Name of the sheet to read (for Excel files).
-        target_columns: List of target column names to match.
+        chunk_size: Number of rows parsed per chunk.
+        usecols: Column positions to parse (all columns if None). A row counts as
+            empty when all of these columns are empty.
+        dtype: dict of column name -> dtype for the CSV parser (see sdm_common.dtypes).
         
     Returns:
-        pandas DataFrame with selected data.
+        pandas DataFrame with the rows before the first empty row.
     """
     file_ext = file_path.suffix.lower()
-
-    # Read file with header (assumed to be in the first row)
-    if file_ext in ['.xlsx', '.xls']:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
-    elif file_ext == '.csv':
-        df = pd.read_csv(file_path)
+    if file_ext == '.csv':
+        chunks = pd.read_csv(file_path, chunksize=chunk_size, usecols=usecols, dtype=dtype)
+    elif file_ext == '.xlsx':
+        chunks = _iter_excel_chunks(file_path, sheet_name, chunk_size, usecols)
+    elif file_ext == '.xls':
+        # xlrd has no lazy row access; read eagerly and cut in memory
+        chunks = iter([pd.read_excel(file_path, sheet_name=sheet_name or 0, usecols=usecols)])
     else:
         raise ValueError(f"Unsupported file format: {file_ext}")
 
+    kept = []
+    first_empty_index = None
+    try:
+        for chunk in chunks:
+            empty_mask = chunk.isnull().all(axis=1)
+            if empty_mask.any():
+                first_empty_index = empty_mask.idxmax()
+                kept.append(chunk.iloc[:empty_mask.to_numpy().argmax()])
+                break
+            kept.append(chunk)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
+
+    if first_empty_index is not None:
+        print(f"First completely empty row detected at index {first_empty_index}")
+    else:
+        print("No empty rows detected, using all data")
+    if not kept:
+        return pd.DataFrame()
+    return pd.concat(kept) if len(kept) > 1 else kept[0]
+
+def _read_rows(file_path, sheet_name, chunk_size, usecols, dtypes):
+    """Parse the `usecols` columns of a sheet up to its first completely empty row."""
+    # .xlsx always goes through the streaming reader, which keeps text cells such as
+    # '0001' as text (pd.read_excel would turn them into numbers)
+    if chunk_size or file_path.suffix.lower() == '.xlsx':
+        return read_until_first_empty_row(file_path, sheet_name, chunk_size or READ_CHUNK_SIZE, usecols=usecols,
+                                          dtype=parse_dtypes(dtypes))
+    if file_path.suffix.lower() == '.xls':
+        df = pd.read_excel(file_path, sheet_name=sheet_name or 0, usecols=usecols)
+    else:
+        df = pd.read_csv(file_path, usecols=usecols, dtype=parse_dtypes(dtypes))
+
     # Stop at the first completely empty row
     empty_mask = df.isnull().all(axis=1)
     if empty_mask.any():
         first_empty_index = empty_mask.idxmax()
         print(f"First completely empty row detected at index {first_empty_index}")
-        df = df.iloc[:first_empty_index]
-    else:
-        print("No empty rows detected, using all data")
+        return df.iloc[:first_empty_index]
+    print("No empty rows detected, using all data")
+    return df
+
+def read_spreadsheet_with_fuzzy_matching(file_path, sheet_name=None, target_columns=None,
+                                         translation_cache=None, chunk_size=None, sheet_cache=None,
+                                         header=None):
+    """
+    Read spreadsheet data with fuzzy column name matching, automatically translating
+    any Korean column names to English, and stopping at the first completely empty row.
     
-    # Translate column names containing Korean characters
-    translator = Translator()
-    new_columns = {}
-    for col in df.columns:
-        if any('\uac00' <= ch <= '\ud7a3' for ch in str(col)):
-            try:
-                result = translate_sync(col, translator, src='ko', dest='en')
-                new_columns[col] = result.text
-                print(f"Translated '{col}' to '{result.text}'")
-            except Exception as e:
-                print(f"Error translating column '{col}': {e}. Keeping original.")
-                new_columns[col] = col
-        else:
-            new_columns[col] = col
-    df.rename(columns=new_columns, inplace=True)
+    The file is read in two phases: the header row alone is read, translated and
+    matched first, then only the matched columns are parsed, with categoricals for
+    repetitive fields (department, team, cell group, office) and Arrow-backed
+    strings for names. Without target_columns every column is read.
+    
+    When pyarrow is available, the columns read are cached in a local Parquet file
+    keyed by the file's content hash, sheet name and column selection, and the sheet's
+    header is kept with them; later reads of the same columns load that file instead of
+    parsing the source again (set SDM_SHEET_CACHE=0 to disable). The cache is filled by
+    the same streamed, pruned read, so cached and uncached reads return the same values.
+    .xlsx rows are streamed with python-calamine when it is installed, else openpyxl
+    (see excel_engine); both yield the same values.
     
-    # Normalize column names: lowercase, strip spaces, replace spaces with underscores
-    df.columns = df.columns.str.lower().str.strip().str.replace(" ", "_")
+    Parameters:
+        file_path: Path object for the spreadsheet file.
+        sheet_name: Name of the sheet to read (for Excel files).
+        target_columns: List of target column names to match.
+        translation_cache: HeaderTranslationCache to use (defaults to the shared cache).
+        chunk_size: If set, stream the file in chunks of this many rows and stop
+            reading at the first empty row instead of loading the whole file.
+        sheet_cache: SheetCache to use (defaults to the shared cache).
+        header: The sheet's header row when the caller has already read it
+            (see read_workbook_headers); otherwise it is read here.
+        
+    Returns:
+        pandas DataFrame with selected data.
+    """
+    file_ext = file_path.suffix.lower()
+    if file_ext not in ['.xlsx', '.xls', '.csv']:
+        raise ValueError(f"Unsupported file format: {file_ext}")
 
-    if not target_columns:
-        return df
+    # Phase 1: header only. Translate column names containing Korean characters
+    # (cached, misses batched), then lowercase, strip and replace spaces with underscores
+    with stage('read_header'):
+        sheet_cache = sheet_cache or get_sheet_cache()
+        if header is None and sheet_cache.enabled:
+            header = sheet_cache.cached_header(file_path, sheet_name)
+        if header is None:
+            header = read_spreadsheet_header(file_path, sheet_name)
+    with stage('translate_headers'):
+        translation_cache = translation_cache or get_translation_cache()
+        translated = translation_cache.translate_headers(header)
+        normalized = [str(translated.get(col, col)).lower().strip().replace(" ", "_") for col in header]
 
-    # Fuzzy match target columns with the actual DataFrame columns
     matched_columns = {}
-    actual_columns = df.columns.tolist()
-    for target in target_columns:
-        best_match, score = process.extractOne(target, actual_columns)
-        print(f"Matched target '{target}' to column '{best_match}' with score {score}")
-        matched_columns[target] = best_match
+    usecols = None
+    if target_columns:
+        with stage('match_columns'):
+            # Fuzzy match target columns with the header (memoized per header layout)
+            matched_columns = get_column_resolver().resolve(normalized, target_columns)
+        if len(matched_columns) < len(target_columns):
+            print("Warning: Could not find matches for all target columns")
+        usecols = sorted(normalized.index(col) for col in matched_columns.values())
+        print(f"Reading {len(usecols)} of {len(header)} columns")
 
-    selected_columns = list(matched_columns.values())
-    if len(selected_columns) < len(target_columns):
-        print("Warning: Could not find matches for all target columns")
-    
-    result_df = df.loc[:, selected_columns].copy()
+    dtypes = low_memory_dtypes({target: header[normalized.index(col)] for target, col in matched_columns.items()},
+                               CATEGORY_TARGETS, STRING_TARGETS)
+
+    # Phase 2: parse only the matched columns
+    with stage('read_rows') as read_stage:
+        read = lambda: _read_rows(file_path, sheet_name, chunk_size, usecols, dtypes)
+        if sheet_cache.enabled:
+            columns = None if usecols is None else [header[i] for i in usecols]
+            df = sheet_cache.load(file_path, sheet_name, header, columns, read,
+                                  variant=[parse_dtypes(dtypes) if file_ext == '.csv' else None, bool(chunk_size),
+                                           excel_engine() if file_ext == '.xlsx' else None])
+        else:
+            df = stringify_mixed_columns(read())
+        apply_dtypes(df, dtypes)
+        read_stage.rows_out = len(df)
+    df.columns = [normalized[header.index(col)] for col in df.columns]
+
+    if not target_columns:
+        return df
+
+    result_df = df.loc[:, list(matched_columns.values())]
+    # Keep the target -> column mapping so callers do not have to match again
+    result_df.attrs['matched_columns'] = matched_columns
 
     # Replace forward slashes with dots in the "name" column if it exists
     name_column = matched_columns.get("name")
@@ -98,61 +358,531 @@ def read_spreadsheet_with_fuzzy_matching(file_path, sheet_name=None, target_colu
     
     return result_df
 
-def create_table_if_not_exists(engine, schema_name, table_name, df):
+def read_workbook_headers(file_path, sheet_names=None):
+    """
+    Open a workbook once and read the header row of each of its sheets.
+    
+    Parameters:
+        file_path: Path of the .xlsx, .xls or .csv file.
+        sheet_names: Sheets to read (all, in workbook order, when None). A name the
+            workbook does not have maps to None.
+    Returns:
+        dict of sheet name -> header list ({None: header} for a CSV file).
+    """
+    file_ext = file_path.suffix.lower()
+    if file_ext == '.csv':
+        return {None: read_spreadsheet_header(file_path)}
+    if file_ext == '.xlsx':
+        with _open_xlsx(file_path) as (names, rows):
+            return {name: _unique_header(next(rows(name), ())) if name in names else None
+                    for name in (sheet_names or names)}
+    if file_ext == '.xls':
+        with pd.ExcelFile(file_path) as workbook:
+            return {name: pd.read_excel(workbook, sheet_name=name, nrows=0).columns.tolist()
+                    if name in workbook.sheet_names else None
+                    for name in (sheet_names or workbook.sheet_names)}
+    raise ValueError(f"Unsupported file format: {file_ext}")
+
+SheetResult = namedtuple('SheetResult', ['position', 'sheet_name', 'df', 'seconds', 'stages', 'error'])
+
+def target_column_name(target):
+    """Column name used for a target in multi-sheet loads ('new cell grp' -> 'new_cell_grp')."""
+    return target.lower().strip().replace(" ", "_")
+
+def read_sheet(file_path, sheet_name, target_columns, chunk_size=None, position=0, header=None):
+    """
+    Worker: read, translate and column-match one sheet.
+
+    Matched columns are renamed to target_column_name(target), so sheets whose
+    headers are spelled differently line up when merged. The stages measured
+    while reading are returned with the result, for a parent process to add to
+    its run report; when called in-process they are already in the current one.
+
+    Returns:
+        SheetResult; `error` is set (and `df` None) if the sheet could not be used.
+    """
+    started = time.perf_counter()
+    report = get_run_report('saints')
+    # A forked worker inherits the parent's stages; only the ones recorded here are returned
+    first_stage = len(report.stages)
+    df, error = None, None
+    try:
+        df = read_spreadsheet_with_fuzzy_matching(file_path, sheet_name, target_columns, chunk_size=chunk_size,
+                                                  header=header)
+        matched_columns = df.attrs.get('matched_columns', {})
+        if KEY_COLUMN not in matched_columns:
+            raise KeyError(f"'{KEY_COLUMN}' column not found")
+        df = df.rename(columns={column: target_column_name(target) for target, column in matched_columns.items()})
+    except (ValueError, KeyError, OSError) as e:
+        df, error = None, str(e)
+    return SheetResult(position, sheet_name, df, time.perf_counter() - started, report.stages[first_stage:], error)
+
+def read_workbook(file_path, target_columns, sheet_names=None, workers=None, queue_size=SHEET_QUEUE_SIZE,
+                  chunk_size=None):
+    """
+    Read the sheets of one workbook in parallel worker processes.
+
+    The workbook is opened once here to discover its sheets and read every
+    header row, and hashed once for the sheet cache; forked workers inherit that
+    checksum and receive their sheet's header. Each worker still opens the file
+    itself to stream its own sheet's rows: an openpyxl workbook cannot be shared
+    across processes, and parsing the sheet XML is the work being spread out.
+    At most `workers + queue_size` sheets are submitted and not yet consumed, so
+    a slow consumer holds back parsing instead of letting parsed sheets pile up
+    in memory.
+
+    Yields:
+        SheetResult for each sheet, in completion order.
+    """
+    headers = read_workbook_headers(file_path, list(sheet_names) if sheet_names else None)
+    workers = min(workers or os.cpu_count() or 1, len(headers))
+    sheet_cache = get_sheet_cache()
+    if sheet_cache.enabled:
+        sheet_cache.cache_path(file_path)
+    print(f"Reading {len(headers)} sheets of {file_path.name} with {workers} workers")
+
+    queued = iter(enumerate(headers.items()))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def submit_next():
+            for position, (sheet_name, header) in queued:
+                pending.add(executor.submit(read_sheet, file_path, sheet_name, target_columns, chunk_size,
+                                            position, header))
+                return
+
+        for _ in range(workers + queue_size):
+            submit_next()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                submit_next()
+
+def merge_sheets(results):
+    """
+    Combine per-sheet frames into one batch in workbook order.
+
+    Rows are deduplicated on scj_number; when a key appears on several sheets the
+    row from the later sheet wins, and keys whose rows differ are reported.
+
+    Returns:
+        pandas DataFrame.
+    """
+    frames = [result.df for result in sorted(results, key=lambda result: result.position)]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    keyed = df[KEY_COLUMN].notna()
+    repeated = keyed & df.duplicated(KEY_COLUMN, keep=False)
+    if repeated.any():
+        distinct = df[repeated].astype(str).drop_duplicates()
+        conflicting = distinct.loc[distinct[KEY_COLUMN].duplicated(), KEY_COLUMN].nunique()
+        print(f"{df[repeated][KEY_COLUMN].nunique()} scj_numbers appear on several sheets "
+              f"({conflicting} with differing rows; the last sheet's row is kept)")
+    return df[~(keyed & df.duplicated(KEY_COLUMN, keep='last'))].reset_index(drop=True)
+
+def read_workbook_batch(engine, schema_name, table_name, file_path, target_columns, sheet_names=None, workers=None):
+    """
+    Read the sheets of a workbook concurrently and merge them into one batch for upsert_data.
+
+    Each sheet gets the ETL columns as it arrives, and the target table is
+    created or extended for its columns right away, while later sheets are
+    still being parsed.
+
+    Returns:
+        (df, failed): the merged, deduplicated batch and a dict of sheet name -> error.
     """
-    Create the target table if it doesn't exist.
-    For simplicity, all columns are mapped as String except our ETL columns (inserted_at, updated_at) which are DateTime.
-    The 'scj_number' column is used as the primary key.
+    report = get_run_report('saints')
+    results, failed = [], {}
+    current_ts = datetime.now()
+    for result in read_workbook(file_path, target_columns, sheet_names, workers, chunk_size=READ_CHUNK_SIZE):
+        report.stages.extend(result.stages)
+        if result.error:
+            print(f"Skipping sheet {result.sheet_name}: {result.error}")
+            failed[result.sheet_name] = result.error
+            continue
+        df = result.df.assign(inserted_at=current_ts, updated_at=current_ts)
+        print(f"Read sheet {result.sheet_name}: {len(df)} rows in {result.seconds:.1f}s")
+        with stage('create_table'):
+            create_table_if_not_exists(engine, schema_name, table_name, df)
+        results.append(result._replace(df=df))
+    with stage('merge_sheets', rows_in=sum(len(result.df) for result in results)) as merge_stage:
+        df = merge_sheets(results)
+        merge_stage.rows_out = len(df)
+    return df, failed
+
+# Columns that never take part in change detection
+KEY_COLUMN = 'scj_number'
+ETL_COLUMNS = ('inserted_at', 'updated_at')
+ROW_HASH_COLUMN = 'row_hash'
+
+def compute_row_hash(df):
+    """
+    Compute an MD5 content hash per row over the non-key, non-ETL columns.
+    
+    Columns are hashed in sorted order as 'name=value' pairs, with nulls encoded
+    distinctly from empty strings, so the hash only changes when the content does.
+    
+    Returns:
+        pandas Series of 32-character hex digests aligned with df.index.
     """
-    metadata = MetaData(schema=schema_name)
-    columns = []
+    hash_columns = sorted(col for col in df.columns
+                          if col not in (KEY_COLUMN, ROW_HASH_COLUMN) + ETL_COLUMNS)
+    joined = pd.Series('', index=df.index, dtype=object)
+    for col in hash_columns:
+        values = df[col].astype(object).where(df[col].notna(), None)
+        joined = joined + f"\x1e{col}=" + values.map(lambda v: '\x00' if v is None else str(v))
+    return joined.map(lambda row: hashlib.md5(row.encode('utf-8')).hexdigest())
+
+def drop_unchanged_rows(engine, schema_name, table_name, df, batch_size=10000):
+    """
+    Drop rows whose row_hash matches the hash already stored for their scj_number,
+    so unchanged rows are never sent to the database.
+    """
+    keys = df[KEY_COLUMN].astype(str)
+    stored = {}
+    query = text(
+        f'SELECT {KEY_COLUMN}, {ROW_HASH_COLUMN} FROM "{schema_name}"."{table_name}" '
+        f'WHERE {KEY_COLUMN} = ANY(:keys)'
+    )
+    unique_keys = keys.unique().tolist()
+    with engine.connect() as conn:
+        for start in range(0, len(unique_keys), batch_size):
+            result = conn.execute(query, {'keys': unique_keys[start:start + batch_size]})
+            stored.update((str(key), row_hash) for key, row_hash in result)
+
+    unchanged = keys.map(stored).eq(df[ROW_HASH_COLUMN])
+    print(f"Skipping {int(unchanged.sum())} unchanged rows (row hash matches stored value).")
+    return df.loc[~unchanged]
+
+# Reflected target tables, keyed by (engine url, schema, table); refreshed only after DDL
+_table_cache = {}
+
+# Text columns with at most this many distinct values are typed as bounded VARCHARs
+ENUM_MAX_DISTINCT = 64
+
+_ISO_DATE_PATTERN = r'^\d{4}[-./]\d{1,2}[-./]\d{1,2}$'
+
+def get_table(engine, schema_name, table_name, refresh=False):
+    """
+    Return the reflected Table, reflecting it once per process instead of on every upsert.
+    
+    Returns:
+        sqlalchemy Table, or None if the table does not exist.
+    """
+    key = (str(engine.url), schema_name, table_name)
+    if refresh or key not in _table_cache:
+        with engine.connect() as conn:
+            if not engine.dialect.has_table(conn, table_name, schema=schema_name):
+                _table_cache.pop(key, None)
+                return None
+        _table_cache[key] = Table(table_name, MetaData(), autoload_with=engine, schema=schema_name)
+    return _table_cache[key]
+
+# Value ranges of the integer types, narrowest first
+_INTEGER_RANGES = {
+    SmallInteger: (-32768, 32767),
+    Integer: (-2147483648, 2147483647),
+    BigInteger: (-9223372036854775808, 9223372036854775807),
+}
+
+def _integer_range(sql_type):
+    # BigInteger and SmallInteger subclass Integer, so test them first
+    for type_class in (BigInteger, SmallInteger, Integer):
+        if isinstance(sql_type, type_class):
+            return _INTEGER_RANGES[type_class]
+
+def _integer_type(values):
+    low, high = values.min(), values.max()
+    for type_class, (type_low, type_high) in _INTEGER_RANGES.items():
+        if type_low <= low and high <= type_high:
+            return type_class()
+    return BigInteger()
+
+def infer_sql_type(series):
+    """
+    Pick a compact SQL type for a DataFrame column.
+    
+    - datetimes become Date (midnight-only values) or DateTime
+    - ISO-formatted date strings (YYYY-MM-DD, YYYY.MM.DD, YYYY/MM/DD) become Date
+    - whole numbers become SmallInteger/Integer/BigInteger; digit strings with a
+      leading zero (phone numbers, codes) stay text
+    - low-cardinality text becomes VARCHAR(n), other text stays unbounded String
+    """
+    values = series.dropna()
+    if values.empty:
+        return String()
+    if pd.api.types.is_bool_dtype(values):
+        return Boolean()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return Date() if (values.dt.normalize() == values).all() else DateTime()
+    if pd.api.types.is_numeric_dtype(values):
+        if (values % 1 == 0).all():
+            return _integer_type(values)
+        return Float()
+
+    text_values = values.astype(str).str.strip()
+    if text_values.str.match(_ISO_DATE_PATTERN).all():
+        if _parse_iso_dates(text_values).notna().all():
+            return Date()
+    digits = text_values.str.fullmatch(r'-?\d{1,18}')
+    if digits.all() and not text_values.str.match(r'^-?0\d').any():
+        return _integer_type(text_values.astype('int64'))
+    if text_values.nunique() <= ENUM_MAX_DISTINCT:
+        # Round up so that a slightly longer value later does not force a widening
+        return String(max(16, 1 << int(text_values.str.len().max() - 1).bit_length()))
+    return String()
+
+def _parse_iso_dates(values):
+    return pd.to_datetime(values.astype(str).str.strip().str.replace(r'[./]', '-', regex=True),
+                          format='%Y-%m-%d', errors='coerce')
+
+def coerce_to_table_types(df, table):
+    """
+    Convert DataFrame columns to the Python values the table's column types expect.
+    
+    Returns:
+        (coerced DataFrame, list of columns whose values no longer fit their SQL type
+        and must be widened to text before loading).
+    """
+    df = df.copy()
+    needs_text = []
     for col in df.columns:
-        if col in ('inserted_at', 'updated_at'):
-            columns.append(Column(col, DateTime))
-        else:
-            columns.append(Column(col, String))
-    # Set primary key on 'scj_number'
-    for col in columns:
-        if col.name == 'scj_number':
-            col.primary_key = True
-    table = Table(table_name, metadata, *columns)
-    metadata.create_all(engine, checkfirst=True)
+        if col not in table.columns or col in ETL_COLUMNS:
+            continue
+        sql_type = table.c[col].type
+        values = df[col]
+        present = values.notna()
+        if isinstance(sql_type, (SmallInteger, Integer, BigInteger)):
+            numbers = pd.to_numeric(values, errors='coerce')
+            low, high = _integer_range(sql_type)
+            # The type was sized from earlier files, so a larger number no longer fits it
+            if (numbers[present].isna() | (numbers[present] % 1 != 0)
+                    | (numbers[present] < low) | (numbers[present] > high)).any():
+                needs_text.append(col)
+            else:
+                df[col] = numbers.astype('Int64')
+        elif isinstance(sql_type, Float):
+            numbers = pd.to_numeric(values, errors='coerce')
+            if numbers[present].isna().any():
+                needs_text.append(col)
+            else:
+                df[col] = numbers
+        elif isinstance(sql_type, Date):
+            dates = (_parse_iso_dates(values) if not pd.api.types.is_datetime64_any_dtype(values)
+                     else values)
+            if dates[present].isna().any():
+                needs_text.append(col)
+            else:
+                df[col] = dates.dt.date.where(dates.notna(), None)
+        elif isinstance(sql_type, String) and pd.api.types.is_float_dtype(values):
+            # Whole floats (ints with NaNs) are stored as '1990', not '1990.0'
+            if (values[present] % 1 == 0).all():
+                df[col] = values.astype('Int64').astype(str).where(present, None)
+        if isinstance(sql_type, String) and sql_type.length:
+            # VARCHAR(n) was sized from the values seen when the column was created
+            if df[col][present].astype(str).str.len().max() > sql_type.length:
+                needs_text.append(col)
+
+    for col in needs_text:
+        df[col] = df[col].astype(object).where(df[col].notna(), None).map(
+            lambda v: v if v is None else str(v))
+    return df, needs_text
+
+def create_table_if_not_exists(engine, schema_name, table_name, df):
+    """
+    Create the target table if it doesn't exist, or evolve it additively if it does.
+    
+    New tables get compact column types inferred from the DataFrame (see infer_sql_type);
+    our ETL columns (inserted_at, updated_at) are DateTime and 'scj_number' is a String primary key.
+    Columns present in the DataFrame but missing from an existing table are added with
+    ALTER TABLE ADD COLUMN, as is the 'row_hash' column used for change detection.
+    
+    Returns:
+        the (cached) reflected Table.
+    """
+    def column_type(col):
+        if col in ETL_COLUMNS:
+            return DateTime()
+        if col == KEY_COLUMN:
+            return String()
+        if col == ROW_HASH_COLUMN:
+            return String(32)
+        return infer_sql_type(df[col])
+
+    wanted = [col for col in df.columns if col != ROW_HASH_COLUMN] + [ROW_HASH_COLUMN]
+    table = get_table(engine, schema_name, table_name)
+    if table is None:
+        metadata = MetaData(schema=schema_name)
+        columns = [Column(col, column_type(col), primary_key=(col == KEY_COLUMN)) for col in wanted]
+        Table(table_name, metadata, *columns)
+        metadata.create_all(engine, checkfirst=True)
+        print(f"Created table '{schema_name}.{table_name}' with columns: "
+              + ", ".join(f"{col.name} {col.type.compile(dialect=engine.dialect)}" for col in columns))
+        return get_table(engine, schema_name, table_name, refresh=True)
+
+    missing = [col for col in wanted if col not in table.columns]
+    if missing:
+        with engine.begin() as conn:
+            for col in missing:
+                sql_type = column_type(col).compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{schema_name}"."{table_name}" '
+                                  f'ADD COLUMN IF NOT EXISTS "{col}" {sql_type}'))
+                print(f"Added column '{col}' ({sql_type}) to '{schema_name}.{table_name}'.")
+        table = get_table(engine, schema_name, table_name, refresh=True)
     print(f"Ensured table '{schema_name}.{table_name}' exists with proper schema.")
+    return table
+
+def widen_columns_to_text(engine, schema_name, table_name, columns):
+    """Retype columns whose incoming values no longer fit (e.g. 'RL' in an integer team column) to TEXT."""
+    with engine.begin() as conn:
+        for col in columns:
+            conn.execute(text(f'ALTER TABLE "{schema_name}"."{table_name}" '
+                              f'ALTER COLUMN "{col}" TYPE TEXT USING "{col}"::TEXT'))
+            print(f"Widened column '{col}' of '{schema_name}.{table_name}' to TEXT.")
+    return get_table(engine, schema_name, table_name, refresh=True)
 
-def upsert_data(engine, schema_name, table_name, df):
+def prepare_for_table(engine, schema_name, table_name, df):
     """
-    Upsert records into the table based on the primary key 'scj_number'.
+    Coerce the DataFrame to the target column types, widening columns that no longer fit.
     
-    ETL logic:
-      - For new records, both inserted_at and updated_at are set to the current timestamp.
-      - For existing records, compare all non-ETL columns.
-          - If there are differences, update the record (update updated_at only, preserve inserted_at).
-          - If there are no differences, leave the record unchanged.
+    Returns:
+        (table, coerced DataFrame)
     """
-    metadata = MetaData()
-    table = Table(table_name, metadata, autoload_with=engine, schema=schema_name)
-    records = df.to_dict(orient="records")
-    if not records:
-        print("No records to upsert.")
-        return
+    table = get_table(engine, schema_name, table_name)
+    df, needs_text = coerce_to_table_types(df, table)
+    if needs_text:
+        table = widen_columns_to_text(engine, schema_name, table_name, needs_text)
+    return table, df
+
+def _build_conflict_update(table, excluded):
+    """
+    Build the ON CONFLICT (scj_number) DO UPDATE clauses shared by both upsert paths.
     
-    stmt = insert(table).values(records)
+    Returns:
+        (update_dict, where_condition): the SET mapping and the is_distinct_from
+        change filter that skips rows whose non-ETL columns are unchanged.
+    """
     # Build update mapping for columns (exclude primary key and inserted_at)
-    update_dict = {col.name: getattr(stmt.excluded, col.name)
+    update_dict = {col.name: getattr(excluded, col.name)
                    for col in table.columns if col.name not in ['scj_number', 'inserted_at', 'updated_at']}
     # Always update updated_at when a change is detected
     update_dict['updated_at'] = datetime.now()
     
+    # A stored row hash makes change detection a single comparison, whatever the table width
+    if ROW_HASH_COLUMN in table.columns:
+        return update_dict, table.c[ROW_HASH_COLUMN].is_distinct_from(getattr(excluded, ROW_HASH_COLUMN))
+
     # Build a condition that checks if any non-ETL column is different using is_distinct_from (to handle NULLs)
     compare_conditions = []
     for col in table.columns:
         if col.name not in ['scj_number', 'inserted_at', 'updated_at']:
-            compare_conditions.append(col.is_distinct_from(getattr(stmt.excluded, col.name)))
+            compare_conditions.append(col.is_distinct_from(getattr(excluded, col.name)))
     if compare_conditions:
-        from sqlalchemy import or_
         where_condition = or_(*compare_conditions)
     else:
         where_condition = None
+    return update_dict, where_condition
+
+def bulk_merge_data(engine, schema_name, table_name, df, batch_size=50000):
+    """
+    Upsert records through a COPY-loaded temporary staging table.
+    
+    Each batch is streamed into a temp table with COPY and merged with a single
+    INSERT ... SELECT ... ON CONFLICT (scj_number) DO UPDATE using the same change
+    filter as upsert_data. Every batch commits on its own, so a failing batch does
+    not roll back the batches before it.
+    
+    Parameters:
+        engine: SQLAlchemy engine (psycopg2 or psycopg 3 driver).
+        schema_name: Schema of the target table.
+        table_name: Target table name.
+        df: DataFrame to merge.
+        batch_size: Number of rows copied and merged per transaction.
+    """
+    table = get_table(engine, schema_name, table_name)
+    if df.empty:
+        print("No records to upsert.")
+        return
+
+    # A merge may not touch the same row twice: keep the last occurrence of each key
+    deduped = df.drop_duplicates(subset='scj_number', keep='last')
+    if len(deduped) < len(df):
+        print(f"Dropped {len(df) - len(deduped)} duplicate scj_number rows (kept the last occurrence).")
+    columns = [col for col in deduped.columns if col in table.columns]
+
+    staging_name = f"tmp_{table_name}_merge"
+    staging = Table(staging_name, MetaData(), *[Column(col, table.c[col].type) for col in columns])
+    merge = insert(table).from_select(columns, staging.select())
+    update_dict, where_condition = _build_conflict_update(table, merge.excluded)
+    merge = merge.on_conflict_do_update(
+        index_elements=['scj_number'],
+        set_=update_dict,
+        where=where_condition
+    )
+
+    merged = 0
+    for start in range(0, len(deduped), batch_size):
+        batch = deduped.iloc[start:start + batch_size]
+        with engine.begin() as conn:
+            conn.execute(text(
+                f'CREATE TEMP TABLE {staging_name} '
+                f'(LIKE "{schema_name}"."{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+            ))
+            copy_dataframe(conn, staging_name, batch, columns)
+            rowcount = conn.execute(merge).rowcount
+        # SQLAlchemy's psycopg 3 dialect reports no row count (-1) for INSERT ... SELECT
+        merged = merged + rowcount if merged is not None and rowcount >= 0 else None
+        print(f"Merged batch of {len(batch)} rows ({start + len(batch)}/{len(deduped)}).")
+    if merged is None:
+        print(f"Bulk merged {len(deduped)} records.")
+    else:
+        print(f"Bulk merged {len(deduped)} records ({merged} inserted or updated).")
+
+def upsert_data(engine, schema_name, table_name, df, method='insert', batch_size=50000):
+    """
+    Upsert records into the table based on the primary key 'scj_number'.
+    
+    ETL logic:
+      - For new records, both inserted_at and updated_at are set to the current timestamp.
+      - For existing records, compare all non-ETL columns.
+          - If there are differences, update the record (update updated_at only, preserve inserted_at).
+          - If there are no differences, leave the record unchanged.
+    
+    method='insert' sends a single INSERT ... VALUES statement; method='copy'
+    delegates to bulk_merge_data, which loads `batch_size` rows per transaction via COPY.
+    
+    Each row's content hash is computed here (see compute_row_hash); rows matching
+    their stored hash are dropped before sending, and the server only updates rows
+    whose hash differs.
+    """
+    if method not in ('copy', 'insert'):
+        raise ValueError(f"Unsupported upsert method: {method}")
+    # Coerce to the column types first so the hash sees the values as they will be stored
+    with stage('coerce_types', rows_in=len(df)):
+        table, df = prepare_for_table(engine, schema_name, table_name, df)
+    if ROW_HASH_COLUMN not in df.columns:
+        with stage('row_hash', rows_in=len(df)):
+            df = df.assign(**{ROW_HASH_COLUMN: compute_row_hash(df)})
+    if not df.empty:
+        with stage('drop_unchanged', rows_in=len(df)) as drop_stage:
+            df = drop_unchanged_rows(engine, schema_name, table_name, df)
+            drop_stage.rows_out = len(df)
+    with stage('write', rows_in=len(df)):
+        if method == 'copy':
+            return bulk_merge_data(engine, schema_name, table_name, df, batch_size=batch_size)
+        return _insert_records(engine, table, df)
+
+def _insert_records(engine, table, df):
+    """Upsert `df` with a single INSERT ... VALUES ... ON CONFLICT statement."""
+    records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    if not records:
+        print("No records to upsert.")
+        return
+    
+    stmt = insert(table).values(records)
+    update_dict, where_condition = _build_conflict_update(table, stmt.excluded)
 
     stmt = stmt.on_conflict_do_update(
         index_elements=['scj_number'],
@@ -163,12 +893,20 @@ def upsert_data(engine, schema_name, table_name, df):
         conn.execute(stmt)
     print(f"Upserted {len(records)} records (inserted new or updated changed ones).")
 
-def main():
+def main(argv=None):
     # Build the file path dynamically: assuming the script is in a subfolder (e.g., "models") and the data folder is one level up.
     current_dir = Path(__file__).resolve().parent
     data_folder = current_dir.parent / "data"
-    file_path = data_folder / "raw_data.csv"
-    sheet_name = 'raw_data'
+    parser = argparse.ArgumentParser(description="Load a Saints roster into public.staging_data.")
+    parser.add_argument("--file", type=Path, default=data_folder / "raw_data.csv", help="CSV or Excel workbook to load")
+    parser.add_argument("--sheet", nargs="+", default=["raw_data"],
+                        help="Sheet(s) to read; several sheets are read concurrently and merged")
+    parser.add_argument("--all-sheets", action="store_true", help="Read every sheet of the workbook concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for multi-sheet reads")
+    args = parser.parse_args(argv)
+    file_path = args.file
+    sheet_name = args.sheet[0]
+    multi_sheet = args.all_sheets or len(args.sheet) > 1
     print(f"Using file path: {file_path}")
 
     target_columns = [
@@ -183,26 +921,52 @@ def main():
         "office"
     ]
 
-    try:
-        df = read_spreadsheet_with_fuzzy_matching(file_path, sheet_name, target_columns)
-    except (ValueError, KeyError) as e:
-        print(f"Could not read with column names: {e}")
+    schema_name = 'public'
+    table_name = 'staging_data'
+    full_table_name = f"{schema_name}.{table_name}"
+
+    # Shared pooled engine (connection settings from the DB_* environment variables)
+    engine = get_engine()
+    # Per-stage timings, peak memory and row counts (written to $SDM_METRICS_PATH)
+    report = get_run_report('saints')
+
+    # Skip files that were already loaded successfully and have not changed since
+    ledger = IngestionLedger(engine, loader='saints')
+    file_state = ledger.check(file_path, force=os.getenv('SDM_FORCE_RELOAD') == '1')
+    if not file_state.needs_load:
+        print(f"Skipping {file_path}: unchanged since its last successful load (set SDM_FORCE_RELOAD=1 to reload).")
         return
+    load_started = time.perf_counter()
+    failed_sheets = {}
 
-    # Ensure the primary key column is named exactly "scj_number"
-    best_match, score = process.extractOne("scj_number", df.columns.tolist())
-    if best_match:
-        df.rename(columns={best_match: "scj_number"}, inplace=True)
-        print(f"Renamed column '{best_match}' to 'scj_number' for primary key usage.")
+    if multi_sheet:
+        try:
+            df, failed_sheets = read_workbook_batch(engine, schema_name, table_name, file_path, target_columns,
+                                                    None if args.all_sheets else args.sheet, args.workers)
+        except ValueError as e:
+            df, failed_sheets = pd.DataFrame(), {None: str(e)}
+        if df.empty:
+            error = "; ".join(f"{sheet}: {message}" for sheet, message in failed_sheets.items()) or "no rows read"
+            print(f"Nothing to load from {file_path}: {error}")
+            ledger.record(file_state, 'failed', duration_seconds=time.perf_counter() - load_started, error=error)
+            report.write('failed')
+            return
     else:
-        print("Error: 'scj_number' column not found. Exiting.")
-        return
+        # Same column naming as a multi-sheet load, so the table schema and row hashes do not depend on the mode
+        result = read_sheet(file_path, sheet_name, target_columns, chunk_size=READ_CHUNK_SIZE)
+        if result.error:
+            print(f"Could not read sheet {sheet_name}: {result.error}")
+            ledger.record(file_state, 'failed', duration_seconds=time.perf_counter() - load_started,
+                          error=result.error)
+            report.write('failed')
+            return
+        df = result.df
 
-    # Set ETL columns:
-    current_ts = datetime.now()
-    # For new records, inserted_at will be set. For existing records, it will be preserved.
-    df['inserted_at'] = current_ts  
-    df['updated_at'] = current_ts   # updated_at will be updated only if any non-ETL fields change
+        # Set ETL columns:
+        current_ts = datetime.now()
+        # For new records, inserted_at will be set. For existing records, it will be preserved.
+        df['inserted_at'] = current_ts  
+        df['updated_at'] = current_ts   # updated_at will be updated only if any non-ETL fields change
 
     print("\n=== Data Overview ===")
     print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
@@ -211,30 +975,28 @@ def main():
     print("\n=== Data Preview ===")
     print(df.head())
 
-    # Database connection parameters (update these with from environment variables)
-    db_params = {
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT'),
-        'dbname': os.getenv('DB_NAME'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD')
-    }
-    schema_name = 'public'
-    table_name = 'staging_data'
-    full_table_name = f"{schema_name}.{table_name}"
-
-    engine = create_engine(
-        f"postgresql://{db_params['user']}:{db_params['password']}@"
-        f"{db_params['host']}:{db_params['port']}/{db_params['dbname']}"
-    )
-
-    # Ensure the target table exists with our ETL columns
-    create_table_if_not_exists(engine, schema_name, table_name, df)
+    try:
+        # Ensure the target table exists with our ETL columns
+        with stage('create_table'):
+            create_table_if_not_exists(engine, schema_name, table_name, df)
 
-    # Upsert new data:
-    # - New records will be inserted with inserted_at and updated_at set.
-    # - Existing records will be updated (if any non-ETL changes exist) and only updated_at will change.
-    upsert_data(engine, schema_name, table_name, df)
+        # Upsert new data:
+        # - New records will be inserted with inserted_at and updated_at set.
+        # - Existing records will be updated (if any non-ETL changes exist) and only updated_at will change.
+        with stage('upsert', rows_in=len(df)):
+            upsert_data(engine, schema_name, table_name, df, method='copy', batch_size=UPSERT_BATCH_SIZE)
+    except Exception as e:
+        ledger.record(file_state, 'failed', duration_seconds=time.perf_counter() - load_started, error=str(e))
+        report.write('failed')
+        raise
+    if failed_sheets:
+        # Not 'loaded', so the next run reads the file again; rows already loaded are skipped by their hash
+        ledger.record(file_state, 'partial', row_count=len(df), duration_seconds=time.perf_counter() - load_started,
+                      error="; ".join(f"{sheet}: {message}" for sheet, message in failed_sheets.items()))
+        report.write('partial')
+    else:
+        ledger.record(file_state, 'loaded', row_count=len(df), duration_seconds=time.perf_counter() - load_started)
+        report.write()
 
     print("\n=== Summary ===")
     print(f"Processed {df.shape[0]} rows with {df.shape[1]} columns")
@@ -0,0 +1,172 @@
+"""
+Non-interactive batch loader for a folder of class roster CSVs.
+
+Files are read, cleaned and diffed in a process pool; the results are applied
+to iba.raw_students by a single writer in the main process, one transaction
+per file, in file-name order.
+
+Usage:
+    python notebooks/students/batch.py data/March_1 --manifest data/March_1/manifest.json
+
+Manifest (JSON), header_row is 1-based as in the interactive prompt:
+    {
+        "defaults": {"header_row": 3, "ignore_rows": 0, "class": "Class A"},
+        "files": {
+            "march_daniel_issac_gsn.csv": {"ignore_rows": 2, "class": "Class B"}
+        }
+    }
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from main import read_roster, clean_roster, ensure_students_table, diff_roster, write_diff
+from entity_resolution import resolve_students
+from sdm_common.db import dispose_engine, get_engine
+from sdm_common.ledger import IngestionLedger
+from sdm_common.metrics import get_run_report, new_run_report, stage
+
+# Same defaults as the interactive prompts in main.py
+DEFAULT_SETTINGS = {"header_row": 3, "ignore_rows": 0, "class": "Class A"}
+
+PreparedFile = namedtuple('PreparedFile', ['file_name', 'rows', 'keys', 'cleaned', 'diff', 'seconds', 'stages'])
+
+def load_manifest(manifest_path, data_dir):
+    """
+    Resolve the settings for every CSV in `data_dir`.
+
+    Returns:
+        list of (file_path, settings) sorted by file name.
+    """
+    manifest = {}
+    if manifest_path:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    defaults = {**DEFAULT_SETTINGS, **manifest.get("defaults", {})}
+    per_file = manifest.get("files", {})
+
+    unknown = set(per_file) - {path.name for path in data_dir.glob("*.csv")}
+    for name in sorted(unknown):
+        print(f"Warning: manifest entry '{name}' has no matching file in {data_dir}")
+
+    return [(path, {**defaults, **per_file.get(path.name, {})})
+            for path in sorted(data_dir.glob("*.csv"))]
+
+def prepare_file(file_path, settings):
+    """
+    Worker: read, clean and diff one roster against the current database state.
+    Each worker process has its own pooled engine, reused for every file it prepares.
+    The stage measurements are returned to the parent, which writes the run report.
+    """
+    started = time.perf_counter()
+    report = new_run_report('students')
+    with stage('read') as read_stage:
+        df = read_roster(file_path, int(settings["header_row"]) - 1, int(settings["ignore_rows"]))
+        read_stage.rows_out = len(df)
+    with stage('clean', rows_in=len(df)) as clean_stage:
+        df = clean_roster(df, settings["class"], file_path.name)
+        clean_stage.rows_out = len(df)
+    with stage('diff', rows_in=len(df)) as diff_stage, get_engine().connect() as connection:
+        diff = diff_roster(connection, df)
+        diff_stage.rows_out = len(diff.inserts) + len(diff.updates)
+    keys = set(df["mobile_phone"].dropna()) if "mobile_phone" in df.columns else set()
+    return PreparedFile(file_path.name, len(df), keys, df, diff, time.perf_counter() - started, report.stages)
+
+def run_batch(data_dir, manifest_path=None, workers=None, force=False, resolve=True):
+    """
+    Load every new or changed roster in `data_dir`, parsing and diffing in
+    parallel and writing through one connection. Files recorded as loaded in
+    the ingestion ledger and unchanged since are skipped unless `force` is set.
+    If any file was loaded and `resolve` is set, duplicate students are then
+    re-linked once across the whole table.
+
+    Returns:
+        dict mapping file name to 'loaded', 'skipped' or the error message.
+    """
+    files = load_manifest(manifest_path, data_dir)
+    if not files:
+        print(f"No CSV files found in {data_dir}")
+        return {}
+
+    engine = get_engine()
+    report = get_run_report('students')
+    ensure_students_table(engine)
+    ledger = IngestionLedger(engine, loader='students')
+    outcomes = {}
+    pending = []
+    for path, settings in files:
+        file_state = ledger.check(path, force=force)
+        if file_state.needs_load:
+            pending.append((path, settings, file_state))
+        else:
+            outcomes[path.name] = "skipped"
+    print(f"Loading {len(pending)} of {len(files)} files from {data_dir} "
+          f"with {workers or os.cpu_count()} workers ({len(files) - len(pending)} unchanged)")
+
+    # Phones written earlier in this run; a later file touching them is re-diffed by the writer
+    touched = set()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(path, file_state, executor.submit(prepare_file, path, settings))
+                       for path, settings, file_state in pending]
+            for path, file_state, future in futures:
+                try:
+                    prepared = future.result()
+                    report.stages.extend(prepared.stages)
+                    write_started = time.perf_counter()
+                    diff = prepared.diff
+                    if prepared.keys & touched:
+                        print(f"{prepared.file_name} overlaps files already written in this run; re-diffing")
+                        with stage('rediff', rows_in=prepared.rows) as diff_stage, engine.connect() as connection:
+                            diff = diff_roster(connection, prepared.cleaned)
+                            diff_stage.rows_out = len(diff.inserts) + len(diff.updates)
+                    with stage('write', rows_in=len(diff.inserts) + len(diff.updates)), \
+                            engine.begin() as connection:
+                        write_diff(connection, diff)
+                    touched |= prepared.keys
+                    # Worker time (read, clean, diff) plus the writer's time for this file
+                    ledger.record(file_state, 'loaded', row_count=prepared.rows,
+                                  duration_seconds=prepared.seconds + time.perf_counter() - write_started)
+                    outcomes[path.name] = "loaded"
+                    print(f"Loaded {prepared.file_name}: {prepared.rows} rows, "
+                          f"{len(diff.inserts)} inserted, {len(diff.updates)} updated")
+                except Exception as e:
+                    outcomes[path.name] = str(e)
+                    ledger.record(file_state, 'failed', error=str(e))
+                    print(f"Failed to load {path.name}: {e}")
+        if resolve and "loaded" in outcomes.values():
+            try:
+                with stage('resolve') as resolve_stage:
+                    resolve_stage.rows_out = len(resolve_students(engine))
+            except Exception as e:
+                print(f"Duplicate resolution failed: {e}")
+    finally:
+        report.write('ok' if all(outcome in ("loaded", "skipped") for outcome in outcomes.values()) else 'failed')
+        dispose_engine()
+
+    failed = [name for name, outcome in outcomes.items() if outcome not in ("loaded", "skipped")]
+    skipped = [name for name, outcome in outcomes.items() if outcome == "skipped"]
+    print(f"\nBatch completed: {len(outcomes) - len(failed) - len(skipped)} loaded, "
+          f"{len(skipped)} skipped, {len(failed)} failed")
+    return outcomes
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a folder of class roster CSVs into iba.raw_students.")
+    parser.add_argument("data_dir", type=Path, help="Folder containing the roster CSV files")
+    parser.add_argument("--manifest", type=Path, help="JSON file with per-file header_row, ignore_rows and class")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to all cores)")
+    parser.add_argument("--force", action="store_true", help="Reload files even if the ledger shows them unchanged")
+    parser.add_argument("--no-resolve", dest="resolve", action="store_false",
+                        help="Skip re-linking duplicate students after the load")
+    args = parser.parse_args()
+
+    outcomes = run_batch(args.data_dir, args.manifest, args.workers, args.force, args.resolve)
+    sys.exit(1 if any(outcome not in ("loaded", "skipped") for outcome in outcomes.values()) else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from sqlalchemy import text
+
+from sdm_common.postgres import copy_dataframe
+
+UPDATE_STAGING_TABLE = 'tmp_raw_students_update'
+
+# Types of the staged update columns, matching iba.raw_students
+UPDATE_COLUMN_TYPES = {
+    'id': 'INTEGER',
+    'student_name': 'TEXT',
+    'staff': 'TEXT',
+    'networker': 'TEXT',
+    'country': 'TEXT',
+    'class': 'TEXT',
+    'source_file': 'TEXT',
+    'etl_update_dttm': 'TIMESTAMP',
+    'etl_user_id': 'TEXT',
+}
+
+def bulk_update_students(connection, df_to_update, fields):
+    """
+    Apply all changed student rows with a constant number of statements:
+    COPY the changes into a temp table, then one UPDATE ... FROM joined on id.
+
+    Parameters:
+        connection: SQLAlchemy connection inside an open transaction.
+        df_to_update: Updates frame from diff_students (NaN marks an unchanged field).
+        fields: Compared fields that may appear in df_to_update.
+
+    Returns:
+        Number of rows updated.
+    """
+    fields = [field for field in fields if field in df_to_update.columns]
+    columns = ['id'] + fields + ['etl_update_dttm', 'etl_user_id']
+    column_defs = ", ".join(f"{col} {UPDATE_COLUMN_TYPES[col]}" for col in columns)
+    connection.execute(text(f"CREATE TEMP TABLE {UPDATE_STAGING_TABLE} ({column_defs}) ON COMMIT DROP"))
+    copy_dataframe(connection, UPDATE_STAGING_TABLE, df_to_update, columns)
+
+    # NULL in the staging row means "not changed", so keep the current value
+    set_clauses = [f"{field} = COALESCE(u.{field}, r.{field})" for field in fields]
+    set_clauses += ["etl_update_dttm = u.etl_update_dttm", "etl_user_id = u.etl_user_id"]
+    result = connection.execute(text(f"""
+        UPDATE iba.raw_students AS r
+        SET {', '.join(set_clauses)}
+        FROM {UPDATE_STAGING_TABLE} AS u
+        WHERE r.id = u.id
+    """))
+    return result.rowcount
@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+import pandas as pd
+from sqlalchemy import text
+
+# Fields compared between the incoming file and iba.raw_students
+COMPARE_FIELDS = ['student_name', 'staff', 'networker', 'country', 'class', 'source_file']
+
+# Columns written for new students
+INSERT_COLUMNS = ['student_name', 'mobile_phone', 'staff', 'networker', 'country', 'class',
+                  'source_file', 'etl_insert_dttm', 'etl_update_dttm', 'etl_user_id']
+
+EXISTING_COLUMNS = ['id', 'student_name', 'mobile_phone', 'staff', 'networker', 'country', 'class', 'source_file']
+
+StudentDiff = namedtuple('StudentDiff', ['inserts', 'updates', 'unchanged', 'field_change_counts'])
+
+def normalize_for_compare(values):
+    """
+    Normalize a column for comparison in one vectorized pass:
+    None/NaN become '', everything else is stringified and stripped.
+    """
+    values = values.astype(object)
+    return values.where(values.notna(), '').astype(str).str.strip()
+
+def fetch_existing_students(connection, keys, batch_size=5000):
+    """
+    Load the existing iba.raw_students rows for the given mobile phones only,
+    querying `mobile_phone = ANY(:keys)` in batches so the cost follows the
+    size of the incoming file rather than the size of the table.
+
+    Returns:
+        DataFrame with EXISTING_COLUMNS.
+    """
+    keys = pd.Series(keys, dtype=object).dropna().astype(str)
+    keys = keys[keys != ''].unique().tolist()
+    query = text(f"""
+        SELECT {', '.join(EXISTING_COLUMNS)}
+        FROM iba.raw_students
+        WHERE mobile_phone = ANY(:keys)
+    """)
+    rows = []
+    for start in range(0, len(keys), batch_size):
+        rows.extend(connection.execute(query, {'keys': keys[start:start + batch_size]}).fetchall())
+    return pd.DataFrame(rows, columns=EXISTING_COLUMNS)
+
+def diff_students(incoming, existing, key='mobile_phone', fields=COMPARE_FIELDS,
+                  update_dttm=None, user_id='system'):
+    """
+    Split incoming student rows into inserts, updates and unchanged rows by
+    joining them against the existing records on `key`.
+
+    Parameters:
+        incoming: DataFrame of cleaned rows from the source file.
+        existing: DataFrame with 'id', `key` and the compared fields from the database.
+        key: Column used to match incoming rows to existing ones.
+        fields: Columns compared to detect changes.
+        update_dttm: Timestamp stored in etl_update_dttm on updated rows.
+        user_id: Value stored in etl_user_id on updated rows.
+
+    Returns:
+        StudentDiff(inserts, updates, unchanged, field_change_counts) where `updates`
+        holds 'id', `key`, the changed field values (NaN for unchanged fields) and the
+        ETL update columns, and field_change_counts maps each field to its number of changes.
+    """
+    # Rows without a key cannot be matched or deduplicated
+    keys = incoming[key]
+    incoming = incoming.loc[keys.notna() & (keys.astype(str) != '')].copy()
+    incoming[key] = incoming[key].astype(str)
+    # The last occurrence of a repeated key wins, as it would have when applied row by row
+    incoming = incoming.drop_duplicates(subset=key, keep='last')
+
+    fields = [field for field in fields if field in incoming.columns]
+    existing = existing[['id', key] + fields].rename(columns={field: f"{field}__existing" for field in fields})
+    existing[key] = existing[key].astype(str)
+    merged = incoming.merge(existing, on=key, how='left', validate='one_to_one')
+    is_new = merged['id'].isna()
+
+    inserts = merged.loc[is_new, incoming.columns].reindex(columns=INSERT_COLUMNS)
+
+    matched = merged.loc[~is_new]
+    changed = pd.DataFrame({
+        field: normalize_for_compare(matched[field]) != normalize_for_compare(matched[f"{field}__existing"])
+        for field in fields
+    }, index=matched.index)
+    has_changes = changed.any(axis=1) if fields else pd.Series(False, index=matched.index)
+
+    changed_rows = matched.loc[has_changes]
+    updates = pd.DataFrame({'id': changed_rows['id'].astype('int64'), key: changed_rows[key]})
+    for field in fields:
+        # Changed fields carry the incoming value (missing becomes ''), unchanged ones NaN
+        current = changed_rows[field].astype(object)
+        updates[field] = current.where(current.notna(), '').where(changed.loc[has_changes, field])
+    updates['etl_update_dttm'] = update_dttm
+    updates['etl_user_id'] = user_id
+
+    unchanged = matched.loc[~has_changes, incoming.columns]
+    field_change_counts = {field: int(changed[field].sum()) for field in fields}
+
+    return StudentDiff(
+        inserts.reset_index(drop=True),
+        updates.reset_index(drop=True),
+        unchanged.reset_index(drop=True),
+        field_change_counts
+    )
@@ -0,0 +1,341 @@
+"""
+Link iba.raw_students rows that are likely the same student.
+
+raw_students is keyed on the exact mobile_phone, so a student registered again
+with a slightly different name or phone format gets a second row. Comparing
+every pair is O(n^2); instead rows are grouped into blocks that share a cheap
+key, and only pairs inside a block are scored:
+
+    phone  - the last PHONE_SUFFIX_DIGITS digits of the number, so '+94 77 123 4567'
+             and '0771234567' share a block; a pair matches when the names are similar
+    name   - Soundex codes of the first and last name tokens (order-insensitive);
+             a pair matches when the names are near-identical and either both phones
+             are known and at most a digit apart, or one is missing and the same staff
+             member and the same networker registered both rows
+
+Blocks larger than MAX_BLOCK_SIZE (very common names) are not compared
+all-pairs: their rows are sorted by name and each is compared with the next
+WINDOW rows. Matching pairs are merged into clusters with union-find, never
+joining two different phone numbers; the cluster ID is the smallest student id
+in the cluster. The result replaces the
+contents of iba.student_links.
+
+Usage:
+    python notebooks/students/entity_resolution.py
+"""
+import re
+import sys
+import time
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
+except ImportError:  # fall back to fuzzywuzzy's per-pair scoring
+    rapid_fuzz = rapid_process = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdm_common.postgres import copy_dataframe
+
+PHONE_SUFFIX_DIGITS = 8
+# token_sort_ratio needed to link two rows that share a phone suffix
+PHONE_BLOCK_NAME_SCORE = 70
+# token_sort_ratio needed to link two rows on the name alone
+NAME_BLOCK_NAME_SCORE = 90
+# Digits two phone suffixes may differ in and still count as one number (a typo)
+PHONE_DIGIT_ERRORS = 1
+MAX_BLOCK_SIZE = 100
+WINDOW = 20
+
+LINK_TABLE = 'iba.student_links'
+LINK_COLUMNS = ['student_id', 'cluster_id', 'cluster_size', 'match_rule', 'match_score', 'resolved_at']
+
+SOUNDEX_CODES = {**dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+                 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6'}
+
+def soundex(word):
+    """American Soundex of the ASCII letters in `word` ('' if there are none)."""
+    letters = [c for c in word.lower() if 'a' <= c <= 'z']
+    if not letters:
+        return ''
+    code, previous = letters[0].upper(), SOUNDEX_CODES.get(letters[0], '')
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, '')
+        if digit and digit != previous:
+            code += digit
+        # 'h' and 'w' do not separate letters with the same code; vowels do
+        if c not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+NON_LETTERS = re.compile(r'[\W\d_]+')
+
+def normalize_names(names):
+    """Lowercase, drop digits and punctuation, collapse whitespace; missing names become ''."""
+    names = pd.Series(names, dtype=object).fillna('')
+    # Each distinct name once, with Python's re: Arrow-backed string methods treat \w as ASCII only
+    unique = names.unique()
+    normalized = [' '.join(NON_LETTERS.sub(' ', str(name).lower()).split()) for name in unique]
+    return names.map(dict(zip(unique, normalized))).astype(object)
+
+def name_key(name):
+    """Blocking key of a normalized name: Soundex of its first and last tokens, in sorted order."""
+    tokens = name.split()
+    if not tokens:
+        return None
+    codes = sorted({soundex(token) for token in (tokens[0], tokens[-1])} - {''})
+    # Names without Latin letters are blocked on their exact first and last tokens
+    return '-'.join(codes) if codes else '-'.join(sorted({tokens[0], tokens[-1]}))
+
+def phone_suffixes(phones, digits=PHONE_SUFFIX_DIGITS):
+    """Last `digits` digits of each phone (any format), missing when the number is shorter."""
+    phones = pd.Series(phones, dtype=object).fillna('').astype(str).str.replace(r'\D', '', regex=True)
+    return phones.str[-digits:].where(phones.str.len() >= digits)
+
+def block_pairs(keys, sort_values, max_block_size=MAX_BLOCK_SIZE, window=WINDOW):
+    """
+    Candidate pairs of row positions sharing a blocking key.
+
+    Blocks of equal size are expanded together with numpy, so the cost follows
+    the number of pairs rather than the number of blocks.
+
+    Parameters:
+        keys: Series of blocking keys (missing keys are not blocked).
+        sort_values: Array used to order oversized blocks for the sliding window.
+    Returns:
+        (left, right) int arrays with left < right.
+    """
+    keys = pd.Series(keys).reset_index(drop=True)
+    positions = np.flatnonzero(keys.notna().to_numpy())
+    if len(positions) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes, _ = pd.factorize(keys.iloc[positions])
+    order = np.argsort(codes, kind='stable')
+    members = positions[order]
+    counts = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    left, right = [], []
+    for size in np.unique(counts[counts >= 2]):
+        block_starts = starts[counts == size]
+        if size <= max_block_size:
+            rows = members[block_starts[:, None] + np.arange(size)]
+            i, j = np.triu_indices(size, 1)
+            left.append(rows[:, i].ravel())
+            right.append(rows[:, j].ravel())
+            continue
+        for start in block_starts:
+            rows = members[start:start + size]
+            rows = rows[np.argsort(sort_values[rows], kind='stable')]
+            for offset in range(1, min(window, size - 1) + 1):
+                left.append(rows[:-offset])
+                right.append(rows[offset:])
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    left, right = np.concatenate(left), np.concatenate(right)
+    return np.minimum(left, right), np.maximum(left, right)
+
+def pair_scores(a, b, scorer='token_sort_ratio'):
+    """
+    Similarity (0-100) of a[i] and b[i] for every i.
+
+    Uses rapidfuzz's multi-threaded cpdist when available, then rapidfuzz or
+    fuzzywuzzy one pair at a time.
+    """
+    a, b = list(a), list(b)
+    if not a:
+        return np.empty(0)
+    if rapid_process is not None and hasattr(rapid_process, 'cpdist'):
+        scores = rapid_process.cpdist(a, b, scorer=getattr(rapid_fuzz, scorer), workers=-1).astype(float)
+    else:
+        if rapid_fuzz is not None:
+            score = getattr(rapid_fuzz, scorer)
+        else:
+            from fuzzywuzzy import fuzz
+            score = getattr(fuzz, scorer)
+        scores = np.array([score(x, y) for x, y in zip(a, b)], dtype=float)
+    # An empty value is evidence of nothing, whatever the scorer says
+    scores[[not x or not y for x, y in zip(a, b)]] = 0
+    return scores
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size."""
+
+    def __init__(self, n):
+        # Plain lists: element access from Python is much faster than on numpy arrays
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+
+    def roots(self):
+        return np.array([self.find(x) for x in range(len(self.parent))], dtype=np.int64)
+
+def digit_errors(a, b):
+    """Positions at which two equal-length digit strings differ (len(a) if either is empty)."""
+    if not a or not b:
+        return len(a or b)
+    return sum(x != y for x, y in zip(a, b))
+
+def resolve_duplicates(students):
+    """
+    Cluster likely duplicate students.
+
+    Phone-block matches are applied first. Name-block matches are then applied
+    strongest first, skipping any that would put two different phone numbers
+    (more than PHONE_DIGIT_ERRORS digits apart) into one cluster, so a row
+    without a phone cannot chain two different people together.
+
+    Parameters:
+        students: DataFrame with 'id', 'student_name' and 'mobile_phone', and
+            optionally 'staff' and 'networker'.
+    Returns:
+        DataFrame with LINK_COLUMNS, one row per student.
+    """
+    n = len(students)
+    ids = students['id'].to_numpy()
+    names = normalize_names(students['student_name']).reset_index(drop=True)
+    suffixes = phone_suffixes(students['mobile_phone']).reset_index(drop=True)
+    name_values = names.to_numpy(dtype=object)
+    suffix_values = suffixes.fillna('').to_numpy(dtype=object)
+    # Names repeat a lot; each distinct one is keyed once
+    unique_names = names.unique()
+    name_keys = names.map(dict(zip(unique_names, map(name_key, unique_names))))
+
+    # Phone blocks: same number (by suffix), similar enough name
+    phone_left, phone_right = block_pairs(suffixes, name_values)
+    phone_scores = pair_scores(name_values[phone_left], name_values[phone_right])
+    phone_match = phone_scores >= PHONE_BLOCK_NAME_SCORE
+
+    # Name blocks: pairs not already scored in a phone block
+    name_left, name_right = block_pairs(name_keys, name_values)
+    fresh = ~np.isin(name_left * n + name_right, phone_left * n + phone_right)
+    name_left, name_right = name_left[fresh], name_right[fresh]
+    name_scores = pair_scores(name_values[name_left], name_values[name_right])
+    name_match = name_scores >= NAME_BLOCK_NAME_SCORE
+    left_phones, right_phones = suffix_values[name_left], suffix_values[name_right]
+    both_phones = (left_phones != '') & (right_phones != '')
+    # Both numbers known: they must be the same number give or take a typo
+    check = np.flatnonzero(both_phones & name_match)
+    name_match[check] = [digit_errors(a, b) <= PHONE_DIGIT_ERRORS
+                         for a, b in zip(left_phones[check], right_phones[check])]
+    # A number is missing: the same staff member and the same networker must have
+    # registered both. One shared staff member is common among namesakes (a staff
+    # member registers many students), so it is not enough on its own
+    corroborated = np.full(len(name_left), all(column in students.columns for column in ('staff', 'networker')))
+    for column in ('staff', 'networker'):
+        if column in students.columns:
+            values = normalize_names(students[column]).to_numpy(dtype=object)
+            corroborated &= (values[name_left] == values[name_right]) & (values[name_left] != '')
+    name_match &= both_phones | corroborated
+
+    clusters = UnionFind(n)
+    cluster_phone = list(suffix_values)
+    rule, score = [None] * n, [np.nan] * n
+    applied = conflicts = 0
+    edges = [('phone', phone_left[phone_match], phone_right[phone_match], phone_scores[phone_match])]
+    order = np.argsort(-name_scores[name_match], kind='stable')
+    edges.append(('name', name_left[name_match][order], name_right[name_match][order], name_scores[name_match][order]))
+    for edge_rule, lefts, rights, scores in edges:
+        for left, right, edge_score in zip(lefts.tolist(), rights.tolist(), scores.tolist()):
+            x, y = clusters.find(left), clusters.find(right)
+            if x != y:
+                if (edge_rule == 'name' and cluster_phone[x] and cluster_phone[y]
+                        and digit_errors(cluster_phone[x], cluster_phone[y]) > PHONE_DIGIT_ERRORS):
+                    conflicts += 1
+                    continue
+                clusters.union(x, y)
+                cluster_phone[clusters.find(x)] = cluster_phone[x] or cluster_phone[y]
+                applied += 1
+            # Strongest match that pulled each row into its cluster
+            for position in (left, right):
+                if rule[position] is None or edge_score > score[position]:
+                    rule[position], score[position] = edge_rule, edge_score
+
+    print(f"Entity resolution: {n} students, {len(phone_left)} phone-block and {len(name_left)} "
+          f"name-block pairs scored, {applied} links applied, {conflicts} skipped for conflicting phones")
+
+    links = pd.DataFrame({'student_id': ids, 'root': clusters.roots()})
+    links['cluster_id'] = links.groupby('root')['student_id'].transform('min')
+    links['cluster_size'] = links.groupby('root')['student_id'].transform('size')
+    links['match_rule'] = rule
+    links['match_score'] = score
+    links['resolved_at'] = datetime.datetime.utcnow().isoformat()
+    return links[LINK_COLUMNS]
+
+RESOLUTION_COLUMNS = ['id', 'student_name', 'mobile_phone', 'staff', 'networker']
+
+def fetch_students(connection):
+    """The columns resolution looks at, for every row of iba.raw_students."""
+    rows = connection.execute(text(f"SELECT {', '.join(RESOLUTION_COLUMNS)} FROM iba.raw_students")).fetchall()
+    return pd.DataFrame(rows, columns=RESOLUTION_COLUMNS)
+
+def ensure_links_table(connection):
+    """Create iba.student_links and its cluster index if they do not exist yet."""
+    connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {LINK_TABLE} (
+            student_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER NOT NULL,
+            cluster_size INTEGER NOT NULL,
+            match_rule TEXT,
+            match_score REAL,
+            resolved_at TIMESTAMP
+        )
+    """))
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS student_links_cluster_id_idx ON {LINK_TABLE} (cluster_id)"))
+
+def resolve_students(engine):
+    """
+    Re-cluster all of iba.raw_students and replace iba.student_links in one transaction.
+
+    Returns:
+        The links DataFrame.
+    """
+    with engine.connect() as connection:
+        students = fetch_students(connection)
+    links = resolve_duplicates(students)
+    with engine.begin() as connection:
+        ensure_links_table(connection)
+        connection.execute(text(f"DELETE FROM {LINK_TABLE}"))
+        copy_dataframe(connection, LINK_TABLE, links, LINK_COLUMNS)
+    duplicates = links[links['cluster_size'] > 1]
+    print(f"{len(duplicates)} students fall into {duplicates['cluster_id'].nunique()} duplicate clusters")
+    return links
+
+def main():
+    from sdm_common.db import dispose_engine, get_engine
+    from sdm_common.metrics import get_run_report, stage
+
+    report = get_run_report('students')
+    status = 'failed'
+    try:
+        with stage('resolve') as resolve_stage:
+            links = resolve_students(get_engine())
+            resolve_stage.rows_out = len(links)
+        status = 'ok'
+    finally:
+        report.write(status)
+        dispose_engine()
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    main()
+    print(f"Entity resolution finished in {time.perf_counter() - started:.1f}s")
@@ -2,50 +2,25 @@ import pandas as pd
 import re
 import datetime
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 import os
+import sys
+import time
 
-# PostgreSQL connection details ge it from sys env var
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_HOST = os.getenv('DB_HOST')
-DB_PORT = '6543'
-DB_NAME = os.getenv('DB_NAME')
-
-# Create SQLAlchemy engine
-engine = create_engine(f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-print("Database connection established ")
-current_dir = Path(__file__).resolve().parent.parent.parent.parent
-data_folder = current_dir / "data" / "March_1"
-file_path = data_folder / 'march_daniel_issac_gsn.csv'
-print(f"Using file path: {file_path}")
-
-file_name = file_path.name
-print(f"File name: {file_name}")
-
-# Ask user how many rows to ignore from the end
-ignore_rows = int(input("Enter the number of rows to ignore from the end: ") or 0)
-header_row = int(input("Enter the row number where the header is located (starting from 1): ") or 3) - 1
-
-# Ask user to select class from a predefined list
-class_options = ["Class A", "Class B", "Class C", "Other"]
-print("Select the class name:")
-for i, option in enumerate(class_options, 1):
-    print(f"{i}. {option}")
-class_choice = int(input("Enter the number corresponding to your choice: ") or 1)
-class_name = class_options[class_choice - 1] if 1 <= class_choice <= len(class_options) else "Other"
-
-# Read the CSV file with specified header row
-df = pd.read_csv(file_path, header=header_row)
-
-# Drop the last 'ignore_rows' rows if specified
-if ignore_rows > 0:
-    df = df.iloc[:-ignore_rows]
-
-# Display all columns in the dataframe
-print("Columns in the CSV file:")
-print(df.columns.tolist())
+# Make the shared sdm_common package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from diff_engine import COMPARE_FIELDS, INSERT_COLUMNS, diff_students, fetch_existing_students
+from bulk_write import bulk_update_students
+from entity_resolution import resolve_students
+from sdm_common.columns import ColumnResolver, regex_score_matrix
+from sdm_common.db import dispose_engine, get_engine
+from sdm_common.dtypes import low_memory_dtypes
+from sdm_common.ledger import IngestionLedger
+from sdm_common.metrics import get_run_report, stage
+from sdm_common.phone import classify_countries, normalize_phones
+
+CLASS_OPTIONS = ["Class A", "Class B", "Class C", "Other"]
 
 # Define patterns to search for specific columns
 patterns = {
@@ -55,85 +30,122 @@ patterns = {
     "networker": re.compile(r'networker', re.IGNORECASE)
 }
 
-# Find matching columns
-matched_columns = {}
-for key, pattern in patterns.items():
-    for column in df.columns:
-        if pattern.search(column):
-            matched_columns[key] = column
-            break
-
-print("Matched Columns:")
-print(matched_columns)
-
-# Keep only matched columns
-df = df[[col for col in matched_columns.values() if col in df.columns]]
-
-# Print original columns before renaming
-print("Original columns before renaming:")
-print(df.columns.tolist())
-
-# Rename columns to match database schema
-column_mapping = {matched_columns.get(key, ''): key for key in patterns.keys() if matched_columns.get(key, '') in df.columns}
-df = df.rename(columns=column_mapping)
-
-# Print columns after renaming
-print("Columns after renaming:")
-print(df.columns.tolist())
-
-# After finding the staff column, clean up any numbered prefixes
-if "staff" in df.columns:
-    df["staff"] = df["staff"].astype(str).str.replace(r'^\d+\.\s*', '', regex=True).str.strip()
-
-# Normalize mobile numbers and determine country if a matching column exists
-if "mobile_phone" in df.columns:
-    # Convert to string and clean up non-numeric characters
-    df["mobile_phone"] = df["mobile_phone"].astype(str).str.replace(r'\D', '', regex=True)
-    
-    # Replace empty strings and 'nan' with None/NaN
-    df.loc[df["mobile_phone"].isin(["", "nan"]), "mobile_phone"] = None
-    
-    # Determine country only for valid phone numbers
-    def get_country(phone):
-        if pd.isna(phone) or phone is None or phone == "":
-            return None
-        if len(str(phone)) == 10:
-            return "India"
-        elif len(str(phone)) == 9 and str(phone).startswith("7"):
-            return "Sri Lanka"
-        elif str(phone).startswith("94") and len(str(phone)) == 11:
-            return "Sri Lanka"
-        else:
-            return "Others"
-    
-    df["country"] = df["mobile_phone"].apply(get_country)
-
-# Add class name and ETL metadata columns
-df["class"] = class_name
-df["source_file"] = file_name  # Add source file name column
-df["etl_insert_dttm"] = datetime.datetime.utcnow().isoformat()
-df["etl_update_dttm"] = None  # Will be updated for records that are changed
-df["etl_user_id"] = "system"  # Change as needed
-
-try:
-    # Print the data types and first few rows of the dataframe for debugging
-    print("\nDataFrame dtypes:")
-    print(df.dtypes)
-    print("\nFirst few rows of DataFrame:")
-    print(df.head())
-    
-    # Create a connection to check if the table exists and get existing records
+# Regex patterns resolved through the shared engine; matches must score 100
+column_resolver = ColumnResolver(regex_score_matrix, name='students-regex', min_score=100)
+
+# Targets parsed as categoricals / Arrow strings instead of object columns
+CATEGORY_TARGETS = ('staff', 'networker')
+STRING_TARGETS = ('student_name',)
+
+def prompt_file_settings():
+    """
+    Ask for the per-file settings interactively.
+
+    Returns:
+        (header_row, ignore_rows, class_name) with header_row 0-indexed.
+    """
+    # Ask user how many rows to ignore from the end
+    ignore_rows = int(input("Enter the number of rows to ignore from the end: ") or 0)
+    header_row = int(input("Enter the row number where the header is located (starting from 1): ") or 3) - 1
+
+    # Ask user to select class from a predefined list
+    print("Select the class name:")
+    for i, option in enumerate(CLASS_OPTIONS, 1):
+        print(f"{i}. {option}")
+    class_choice = int(input("Enter the number corresponding to your choice: ") or 1)
+    class_name = CLASS_OPTIONS[class_choice - 1] if 1 <= class_choice <= len(CLASS_OPTIONS) else "Other"
+    return header_row, ignore_rows, class_name
+
+def read_roster(file_path, header_row, ignore_rows=0):
+    """
+    Read a class roster CSV with its header on `header_row` (0-indexed), dropping trailing rows.
+
+    Only the columns matching `patterns` are parsed: the header row is read and
+    resolved first, then the matched columns are read with compact dtypes. The
+    target -> column mapping is kept in df.attrs['matched_columns'].
+    """
+    # Read the header row only
+    header = pd.read_csv(file_path, header=header_row, nrows=0).columns.tolist()
+
+    # Display all columns in the file
+    print("Columns in the CSV file:")
+    print(header)
+
+    # Find matching columns (memoized per header layout, one column per target)
+    matched_columns = column_resolver.resolve(header, patterns)
+    usecols = sorted(header.index(col) for col in matched_columns.values())
+    df = pd.read_csv(file_path, header=header_row, usecols=usecols,
+                     dtype=low_memory_dtypes(matched_columns, CATEGORY_TARGETS, STRING_TARGETS))
+
+    # Drop the last 'ignore_rows' rows if specified
+    if ignore_rows > 0:
+        df = df.iloc[:-ignore_rows]
+
+    df.attrs['matched_columns'] = matched_columns
+    return df
+
+def clean_roster(df, class_name, file_name):
+    """
+    Map roster columns onto the iba.raw_students schema, normalize phones,
+    derive the country and add the class, source file and ETL columns.
+    """
+    # Columns matched while reading, or resolved here (memoized per header layout, one column per target)
+    matched_columns = df.attrs.get('matched_columns')
+    if matched_columns is None:
+        matched_columns = column_resolver.resolve(df.columns.tolist(), patterns)
+
+    print("Matched Columns:")
+    print(matched_columns)
+
+    # Keep only matched columns
+    df = df[[col for col in matched_columns.values() if col in df.columns]]
+
+    # Print original columns before renaming
+    print("Original columns before renaming:")
+    print(df.columns.tolist())
+
+    # Rename columns to match database schema
+    column_mapping = {matched_columns.get(key, ''): key for key in patterns.keys() if matched_columns.get(key, '') in df.columns}
+    df = df.rename(columns=column_mapping)
+
+    # Print columns after renaming
+    print("Columns after renaming:")
+    print(df.columns.tolist())
+
+    # After finding the staff column, clean up any numbered prefixes
+    if "staff" in df.columns:
+        staff = df["staff"].astype(str).str.replace(r'^\d+\.\s*', '', regex=True).str.strip()
+        df["staff"] = staff.astype("category") if isinstance(df["staff"].dtype, pd.CategoricalDtype) else staff
+
+    # Normalize mobile numbers and determine country if a matching column exists
+    if "mobile_phone" in df.columns:
+        # Keep digits only; numbers with no digits become None
+        df["mobile_phone"] = normalize_phones(df["mobile_phone"])
+
+        # Determine country only for valid phone numbers (rules live in sdm_common.phone)
+        df["country"] = classify_countries(df["mobile_phone"])
+
+    # Add class name and ETL metadata columns
+    df["class"] = class_name
+    df["source_file"] = file_name  # Add source file name column
+    df["etl_insert_dttm"] = datetime.datetime.utcnow().isoformat()
+    df["etl_update_dttm"] = None  # Will be updated for records that are changed
+    df["etl_user_id"] = "system"  # Change as needed
+    return df
+
+def ensure_students_table(engine):
+    """Create iba.raw_students if it does not exist yet."""
     with engine.connect() as connection:
         # Check if the table exists
         table_exists = connection.execute(text(
             "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_schema = 'iba' AND table_name = 'raw_students')"
         )).scalar()
-        
+
         if not table_exists:
             # Create the table if it doesn't exist - make mobile_phone UNIQUE but allow NULL values
             connection.execute(text("""
                 CREATE SCHEMA IF NOT EXISTS iba;
-                
+
                 CREATE TABLE IF NOT EXISTS iba.raw_students (
                     id SERIAL PRIMARY KEY,
                     student_name TEXT,
@@ -150,159 +162,129 @@ try:
                 )
             """))
             connection.commit()
-        
-        # Get existing records to check for updates and avoid duplicates
-        existing_records = {}
-        result = connection.execute(text("""
-            SELECT id, student_name, mobile_phone, staff, networker, country, class, source_file 
-            FROM iba.raw_students 
-            WHERE mobile_phone IS NOT NULL
-        """))
-        
-        for row in result:
-            # Use mobile_phone as key for lookup
-            if row[2]:  # mobile_phone is not None
-                existing_records[row[2]] = {
-                    'id': row[0],
-                    'student_name': row[1],
-                    'mobile_phone': row[2],
-                    'staff': row[3],
-                    'networker': row[4],
-                    'country': row[5],
-                    'class': row[6],
-                    'source_file': row[7]
-                }
-    
+
+def diff_roster(connection, df):
+    """Diff a cleaned roster against the existing rows for its phone numbers."""
+    # Get existing records for the incoming phones only to check for updates and avoid duplicates
+    existing_records = fetch_existing_students(connection, df.get("mobile_phone", []))
+
     # Print for debugging
     print(f"Found {len(existing_records)} existing records in database")
-    
-    # Prepare dataframes for insert and update operations
-    records_to_insert = []
-    records_to_update = []
-    
-    # Process each record in the DataFrame
-    for _, row in df.iterrows():
-        # Skip records with no mobile_phone
-        if pd.isna(row.get('mobile_phone')) or row.get('mobile_phone') is None or row.get('mobile_phone') == '':
-            continue
-        
-        mobile = str(row['mobile_phone'])
-        
-        # Check if this record exists in the database
-        if mobile in existing_records:
-            existing = existing_records[mobile]
-            changes = {}
-            
-            # Check for changes in each field (only collect actual changes)
-            for field in ['student_name', 'staff', 'networker', 'country', 'class', 'source_file']:
-                if field in row:
-                    # Handle None/NaN vs empty string equivalence
-                    existing_value = existing[field] if existing[field] is not None else ''
-                    current_value = row[field] if not pd.isna(row[field]) and row[field] is not None else ''
-                    
-                    # Only mark as changed if values are actually different
-                    if str(existing_value).strip() != str(current_value).strip():
-                        changes[field] = current_value
-            
-            # Only add to update list if there are actual changes
-            if changes:
-                changes['id'] = existing['id']
-                changes['mobile_phone'] = mobile  # Include mobile_phone for reference
-                changes['etl_update_dttm'] = datetime.datetime.utcnow().isoformat()
-                changes['etl_user_id'] = 'system'
-                records_to_update.append(changes)
-        else:
-            # New record, add to insert list
-            record = row.to_dict()
-            # Ensure all required columns exist
-            for col in ['student_name', 'mobile_phone', 'staff', 'networker', 'country', 'class', 
-                        'source_file', 'etl_insert_dttm', 'etl_update_dttm', 'etl_user_id']:
-                if col not in record:
-                    record[col] = None
-            records_to_insert.append(record)
-    
-    # Create a dataframe for insertions
-    if records_to_insert:
-        df_to_insert = pd.DataFrame(records_to_insert)
-        print(f"{len(df_to_insert)} new records will be inserted")
+
+    # Split incoming rows into inserts, updates and unchanged rows in one columnar pass
+    diff = diff_students(df, existing_records, update_dttm=datetime.datetime.utcnow().isoformat())
+    print(f"{len(diff.unchanged)} records are unchanged")
+
+    if not diff.inserts.empty:
+        print(f"{len(diff.inserts)} new records will be inserted")
     else:
-        df_to_insert = pd.DataFrame()
         print("No new records to insert")
-    
-    # Create a dataframe for updates
-    if records_to_update:
-        df_to_update = pd.DataFrame(records_to_update)
-        print(f"{len(df_to_update)} existing records will be updated")
+
+    if not diff.updates.empty:
+        print(f"{len(diff.updates)} existing records will be updated")
         print("Sample of records to be updated:")
-        print(df_to_update.head())
+        print(diff.updates.head())
     else:
-        df_to_update = pd.DataFrame()
         print("No records to update")
-    
-    # Perform database operations
-    with engine.begin() as connection:
-        # Insert new records
-        if not df_to_insert.empty:
-            # Only keep the columns that exist in the database table
-            required_columns = ['student_name', 'mobile_phone', 'staff', 'networker', 
-                                'country', 'class', 'source_file', 'etl_insert_dttm', 
-                                'etl_update_dttm', 'etl_user_id']
-            
-            # Make sure we only keep columns that actually exist in the DataFrame
-            available_columns = [col for col in required_columns if col in df_to_insert.columns]
-            df_to_insert = df_to_insert[available_columns]
-            
-            df_to_insert.to_sql('raw_students', connection, schema='iba', if_exists='append', index=False)
-            print(f"{len(df_to_insert)} new records inserted successfully")
-        
-        # Update existing records
-        if not df_to_update.empty:
-            # Generate and execute update statements
-            update_count = 0
-            fields_updated = {field: 0 for field in ['student_name', 'staff', 'networker', 'country', 'class', 'source_file']}
-            
-            for _, row in df_to_update.iterrows():
-                update_fields = []
-                params = {'id': row['id']}
-                
-                # Build the SET clause for each field that needs updating
-                for field in ['student_name', 'staff', 'networker', 'country', 'class', 'source_file']:
-                    if field in row and not pd.isna(row[field]):
-                        update_fields.append(f"{field} = :{field}")
-                        params[field] = row[field]
-                        fields_updated[field] += 1
-                
-                # Add mandatory update metadata
-                update_fields.append("etl_update_dttm = :etl_update_dttm")
-                update_fields.append("etl_user_id = :etl_user_id")
-                params['etl_update_dttm'] = row['etl_update_dttm']
-                params['etl_user_id'] = row['etl_user_id']
-                
-                # Execute the update statement
-                if update_fields:
-                    update_stmt = text(f"""
-                        UPDATE iba.raw_students 
-                        SET {', '.join(update_fields)} 
-                        WHERE id = :id
-                    """)
-                    
-                    connection.execute(update_stmt, params)
-                    update_count += 1
-            
-            print(f"{update_count} records updated successfully")
-            
-            # Print breakdown of which fields were updated
-            print("Field update breakdown:")
-            for field, count in fields_updated.items():
-                if count > 0:
-                    print(f"  - {field}: {count} updates")
-    
-    print("\nETL operation completed successfully")
-    
-except SQLAlchemyError as e:
-    print(f"Database error: {e}")
-except Exception as e:
-    print(f"An error occurred: {e}")
-finally:
-    # Close the connection pool
-    engine.dispose()
\ No newline at end of file
+    return diff
+
+def write_diff(connection, diff):
+    """Insert new students and apply updates inside the caller's transaction."""
+    df_to_insert = diff.inserts
+    df_to_update = diff.updates
+
+    # Insert new records
+    if not df_to_insert.empty:
+        # Make sure we only keep columns that actually exist in the DataFrame
+        available_columns = [col for col in INSERT_COLUMNS if col in df_to_insert.columns]
+        df_to_insert = df_to_insert[available_columns]
+
+        df_to_insert.to_sql('raw_students', connection, schema='iba', if_exists='append', index=False)
+        print(f"{len(df_to_insert)} new records inserted successfully")
+
+    # Update existing records: stage the changes and apply them in one UPDATE ... FROM
+    if not df_to_update.empty:
+        update_count = bulk_update_students(connection, df_to_update, COMPARE_FIELDS)
+        print(f"{update_count} records updated successfully")
+
+        # Print breakdown of which fields were updated
+        print("Field update breakdown:")
+        for field, count in diff.field_change_counts.items():
+            if count > 0:
+                print(f"  - {field}: {count} updates")
+
+def main():
+    # Shared pooled engine (connection settings from the DB_* environment variables)
+    engine = get_engine()
+    # Per-stage timings, peak memory and row counts (written to $SDM_METRICS_PATH)
+    report = get_run_report('students')
+    current_dir = Path(__file__).resolve().parent.parent.parent.parent
+    data_folder = current_dir / "data" / "March_1"
+    file_path = data_folder / 'march_daniel_issac_gsn.csv'
+    print(f"Using file path: {file_path}")
+
+    file_name = file_path.name
+    print(f"File name: {file_name}")
+
+    # Skip files that were already loaded successfully and have not changed since
+    ledger = IngestionLedger(engine, loader='students')
+    file_state = ledger.check(file_path, force=os.getenv('SDM_FORCE_RELOAD') == '1')
+    if not file_state.needs_load:
+        print(f"Skipping {file_name}: unchanged since its last successful load (set SDM_FORCE_RELOAD=1 to reload).")
+        dispose_engine()
+        return
+
+    header_row, ignore_rows, class_name = prompt_file_settings()
+    load_started = time.perf_counter()
+    with stage('read') as read_stage:
+        df = read_roster(file_path, header_row, ignore_rows)
+        read_stage.rows_out = len(df)
+    with stage('clean', rows_in=len(df)) as clean_stage:
+        df = clean_roster(df, class_name, file_name)
+        clean_stage.rows_out = len(df)
+
+    status = 'failed'
+    try:
+        # Print the data types and first few rows of the dataframe for debugging
+        print("\nDataFrame dtypes:")
+        print(df.dtypes)
+        print("\nFirst few rows of DataFrame:")
+        print(df.head())
+
+        ensure_students_table(engine)
+        with stage('diff', rows_in=len(df)) as diff_stage, engine.connect() as connection:
+            diff = diff_roster(connection, df)
+            diff_stage.rows_out = len(diff.inserts) + len(diff.updates)
+
+        # Perform database operations
+        with stage('write', rows_in=len(diff.inserts) + len(diff.updates)), engine.begin() as connection:
+            write_diff(connection, diff)
+
+        ledger.record(file_state, 'loaded', row_count=len(df), duration_seconds=time.perf_counter() - load_started)
+        status = 'ok'
+        print("\nETL operation completed successfully")
+
+        # Re-linking duplicates reads every student, so it is opt-in here; batch.py and
+        # entity_resolution.py run it once per batch. A failure leaves the load in place.
+        if os.getenv('SDM_RESOLVE_DUPLICATES') == '1':
+            try:
+                with stage('resolve') as resolve_stage:
+                    resolve_stage.rows_out = len(resolve_students(engine))
+            except Exception as e:
+                print(f"Duplicate resolution failed: {e}")
+        else:
+            print("Skipping duplicate resolution (set SDM_RESOLVE_DUPLICATES=1, or run entity_resolution.py).")
+
+    except SQLAlchemyError as e:
+        print(f"Database error: {e}")
+        ledger.record(file_state, 'failed', duration_seconds=time.perf_counter() - load_started, error=str(e))
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        ledger.record(file_state, 'failed', duration_seconds=time.perf_counter() - load_started, error=str(e))
+    finally:
+        report.write(status)
+        # Close the connection pool
+        dispose_engine()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the SDM loaders (notebooks/Saints, notebooks/students).
+
+The loaders are run as plain scripts, so each one puts the repository root
+on sys.path before importing from this package.
+"""
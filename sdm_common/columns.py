@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process, utils as rapid_utils
+except ImportError:  # fall back to fuzzywuzzy's per-pair scoring
+    rapid_fuzz = rapid_process = rapid_utils = None
+
+CACHE_DIR = Path(os.getenv('SDM_CACHE_DIR', Path(__file__).resolve().parent.parent / 'notebooks' / '.cache'))
+DEFAULT_CACHE_PATH = CACHE_DIR / 'column_mappings.json'
+
+def normalize_header(text):
+    """Lowercase and collapse whitespace so cosmetic header edits share a fingerprint."""
+    return ' '.join(str(text).lower().split())
+
+def header_fingerprint(columns, targets, scorer_name):
+    """Fingerprint of a header layout for a given set of targets and scorer."""
+    payload = json.dumps([scorer_name, list(map(str, targets)), [normalize_header(col) for col in columns]],
+                         ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def fuzzy_score_matrix(targets, columns):
+    """
+    Score every target against every column (WRatio, 0-100) in one pass.
+
+    Returns:
+        numpy array of shape (len(targets), len(columns)).
+    """
+    if rapid_process is not None:
+        return rapid_process.cdist(targets, columns, scorer=rapid_fuzz.WRatio,
+                                   processor=rapid_utils.default_process, dtype=np.int32)
+    from fuzzywuzzy import fuzz
+    return np.array([[fuzz.WRatio(target, column) for column in columns] for target in targets])
+
+def regex_score_matrix(patterns, columns):
+    """
+    Score 100 where a target's compiled pattern matches the column name, else 0.
+    `patterns` is an ordered mapping of target -> compiled regex.
+    """
+    return np.array([[100 if pattern.search(str(column)) else 0 for column in columns]
+                     for pattern in patterns.values()])
+
+def assign_columns(scores, min_score=0):
+    """
+    Assign each target at most one column and each column at most one target,
+    taking the highest scores first.
+
+    Ties are broken in favour of columns that fewer targets match (so 'Name' goes
+    to student_name before 'Staff Name' does), then by target and column order.
+
+    Returns:
+        dict of target index -> (column index, score).
+    """
+    scores = np.asarray(scores)
+    if scores.size == 0:
+        return {}
+    eligible = scores >= min_score
+    competitors = eligible.sum(axis=0)
+    targets, columns = np.nonzero(eligible)
+    order = np.lexsort((columns, targets, competitors[columns], -scores[targets, columns]))
+
+    assignment, used_columns = {}, set()
+    for i in order:
+        target, column = int(targets[i]), int(columns[i])
+        if target in assignment or column in used_columns:
+            continue
+        assignment[target] = (column, int(scores[target, column]))
+        used_columns.add(column)
+    return assignment
+
+class ColumnResolver:
+    """
+    Map target names onto a file's columns, memoized by header fingerprint.
+
+    A layout seen before resolves from the on-disk cache without scoring;
+    a new layout is scored once (all targets x all columns), assigned
+    one-to-one and stored.
+    """
+
+    def __init__(self, scorer=fuzzy_score_matrix, name='fuzzy', min_score=0, cache_path=DEFAULT_CACHE_PATH):
+        self.scorer = scorer
+        self.name = name
+        self.min_score = min_score
+        self.cache_path = Path(cache_path)
+        self._cache = None
+
+    def _load(self):
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path.exists():
+                try:
+                    with open(self.cache_path, encoding='utf-8') as f:
+                        self._cache = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Could not read column mapping cache {self.cache_path}: {e}. Starting empty.")
+        return self._cache
+
+    def _save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def resolve(self, columns, targets):
+        """
+        Resolve `targets` (a list, or a mapping for regex scorers) against `columns`.
+
+        Returns:
+            dict of target -> column name for the targets that could be matched.
+        """
+        columns = list(columns)
+        target_names = list(targets)
+        fingerprint = header_fingerprint(columns, [f"{t}={targets[t].pattern}" if isinstance(targets, dict) else t
+                                                   for t in target_names], self.name)
+        cache = self._load()
+        if fingerprint in cache:
+            print(f"Resolved columns from cached layout {fingerprint[:12]}")
+            return {target: columns[position] for target, position in cache[fingerprint].items()}
+
+        scores = self.scorer(targets, columns)
+        assignment = assign_columns(scores, self.min_score)
+        mapping = {}
+        for target_index, target in enumerate(target_names):
+            if target_index not in assignment:
+                print(f"Warning: no column matched target '{target}'")
+                continue
+            position, score = assignment[target_index]
+            mapping[target] = position
+            print(f"Matched target '{target}' to column '{columns[position]}' with score {score}")
+
+        cache[fingerprint] = mapping
+        self._save()
+        return {target: columns[position] for target, position in mapping.items()}
@@ -0,0 +1,93 @@
+"""
+Shared, lazily created SQLAlchemy engine for the loaders.
+
+Nothing here touches the network at import time: the engine is built on the
+first get_engine() call and its connections are opened on first use, then
+reused for the read, diff and write phases and for every file the process loads.
+
+Connection settings come from DB_USER, DB_PASSWORD, DB_HOST, DB_PORT and DB_NAME.
+SDM_DB_DRIVER picks the SQLAlchemy dialect: 'postgresql' (psycopg2, the default)
+or 'postgresql+psycopg' (psycopg 3, which needs SQLAlchemy 2).
+DB_PORT defaults to 6543, the transaction pooler. Behind a transaction pooler a
+server connection only belongs to us for the length of one transaction, so the
+loaders keep no session state between transactions (temp tables are created
+ON COMMIT DROP) and server-side prepared statements are turned off for drivers
+that would otherwise create them.
+"""
+import os
+from urllib.parse import quote_plus
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+
+DEFAULT_PORT = '6543'
+
+# Client-side pool; the pooler multiplexes these onto its own server connections
+POOL_SIZE = int(os.getenv('SDM_DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.getenv('SDM_DB_MAX_OVERFLOW', 5))
+# The pooler closes idle client connections, so recycle ours before it does
+POOL_RECYCLE_SECONDS = int(os.getenv('SDM_DB_POOL_RECYCLE', 300))
+
+_engine = None
+_engine_pid = None
+# Engines inherited through fork. They are kept referenced, never disposed: closing
+# their connections from the child would terminate the parent's server sessions.
+_inherited_engines = []
+
+def database_url():
+    """Build the connection URL from the DB_* environment variables."""
+    driver = os.getenv('SDM_DB_DRIVER', 'postgresql')
+    return (f"{driver}://{quote_plus(os.getenv('DB_USER', ''))}:{quote_plus(os.getenv('DB_PASSWORD', ''))}@"
+            f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT') or DEFAULT_PORT}/{os.getenv('DB_NAME')}")
+
+def _connect_args(url):
+    # psycopg 3 prepares statements server-side after a few executions; those do not
+    # survive a transaction pooler handing us a different server connection.
+    # psycopg2 only uses client-side parameter binding, so it needs nothing here.
+    if make_url(url).get_dialect().driver == 'psycopg':
+        return {'prepare_threshold': None}
+    return {}
+
+def create_pooled_engine(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW):
+    """
+    Create a new pooled engine with the loaders' connection settings.
+
+    Parameters:
+        pool_size: Connections kept open in the client-side pool.
+        max_overflow: Extra connections allowed under load.
+    Returns:
+        sqlalchemy Engine; no connection is opened until first use.
+    """
+    url = database_url()
+    return create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        connect_args=_connect_args(url),
+    )
+
+def get_engine():
+    """
+    Return the process-wide engine, creating it on first use.
+
+    A process started with fork (e.g. a ProcessPoolExecutor worker) gets its own
+    engine instead of sharing the parent's pooled sockets.
+    """
+    global _engine, _engine_pid
+    if _engine is None or _engine_pid != os.getpid():
+        if _engine is not None:
+            _inherited_engines.append(_engine)
+        _engine = create_pooled_engine()
+        _engine_pid = os.getpid()
+    return _engine
+
+def dispose_engine():
+    """Close the pooled connections of this process's engine, if one was created."""
+    global _engine, _engine_pid
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    _engine = None
+    _engine_pid = None
@@ -0,0 +1,48 @@
+import importlib.util
+
+import pandas as pd
+
+# Arrow-backed strings when pyarrow is installed, pandas' Python-backed strings otherwise
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else 'string'
+
+def low_memory_dtypes(matched_columns, category_targets=(), string_targets=()):
+    """
+    Choose compact dtypes for matched source columns.
+
+    Parameters:
+        matched_columns: dict of target -> source column name.
+        category_targets: Targets with few distinct values (department, team, ...), stored as categoricals.
+        string_targets: Free-text targets (names), stored as Arrow-backed strings.
+
+    Returns:
+        dict of source column name -> dtype for the targets that were matched.
+    """
+    dtypes = {}
+    for target, column in matched_columns.items():
+        if target in category_targets:
+            dtypes[column] = 'category'
+        elif target in string_targets:
+            dtypes[column] = STRING_DTYPE
+    return dtypes
+
+def parse_dtypes(dtypes):
+    """
+    The dtypes to hand the parser for `dtypes`.
+
+    Categoricals are parsed as strings and converted once the frame is complete
+    (see apply_dtypes): chunks parsed straight to 'category' each get their own
+    categories and concatenate back to object.
+    """
+    return {column: STRING_DTYPE if dtype == 'category' else dtype for column, dtype in dtypes.items()}
+
+def apply_dtypes(df, dtypes):
+    """Convert the columns of `df` named in `dtypes` in place and return `df`."""
+    for column, dtype in dtypes.items():
+        if column in df.columns and df[column].dtype != dtype:
+            values = df[column]
+            if dtype == 'category' or not pd.api.types.is_object_dtype(values):
+                df[column] = values.astype(dtype)
+            else:
+                # Cells from Excel arrive as Python objects; stringify non-null ones first
+                df[column] = values.where(values.isna(), values.astype(str)).astype(dtype)
+    return df
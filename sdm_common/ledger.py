@@ -0,0 +1,110 @@
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from collections import namedtuple
+
+from sqlalchemy import text
+
+FileState = namedtuple('FileState', ['path', 'size', 'mtime', 'checksum', 'needs_load'])
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class IngestionLedger:
+    """
+    Record which source files a loader has already ingested.
+
+    Each (loader, file_path) has one row holding the file's size, mtime and
+    SHA-256 at its last load, plus row count, duration and status. A file whose
+    size and mtime match a successful load is skipped with a single primary-key
+    lookup; if only the mtime changed, the checksum decides.
+    """
+
+    def __init__(self, engine, loader, schema_name='public', table_name='ingestion_ledger'):
+        self.engine = engine
+        self.loader = loader
+        self.table = f'"{schema_name}"."{table_name}"'
+        self._ensured = False
+
+    def ensure_table(self):
+        if self._ensured:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    loader TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_size BIGINT,
+                    file_mtime DOUBLE PRECISION,
+                    checksum TEXT,
+                    status TEXT,
+                    row_count INTEGER,
+                    duration_seconds DOUBLE PRECISION,
+                    error TEXT,
+                    loaded_at TIMESTAMP,
+                    PRIMARY KEY (loader, file_path)
+                )
+            """))
+        self._ensured = True
+
+    def check(self, path, force=False):
+        """
+        Decide whether `path` has to be (re)loaded.
+
+        Returns:
+            FileState; needs_load is False when the file matches its last successful load.
+        """
+        self.ensure_table()
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self.engine.connect() as conn:
+            entry = conn.execute(text(
+                f"SELECT file_size, file_mtime, checksum, status FROM {self.table} "
+                f"WHERE loader = :loader AND file_path = :file_path"
+            ), {'loader': self.loader, 'file_path': str(path)}).fetchone()
+
+        loaded = entry is not None and entry[3] == 'loaded' and not force
+        if loaded and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            return FileState(path, stat.st_size, stat.st_mtime, entry[2], False)
+
+        checksum = file_checksum(path)
+        if loaded and entry[2] == checksum:
+            # Touched but not modified: remember the new mtime so the next check is O(1) again
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"UPDATE {self.table} SET file_size = :file_size, file_mtime = :file_mtime "
+                    f"WHERE loader = :loader AND file_path = :file_path"
+                ), {'file_size': stat.st_size, 'file_mtime': stat.st_mtime,
+                    'loader': self.loader, 'file_path': str(path)})
+            return FileState(path, stat.st_size, stat.st_mtime, checksum, False)
+        return FileState(path, stat.st_size, stat.st_mtime, checksum, True)
+
+    def record(self, state, status, row_count=None, duration_seconds=None, error=None):
+        """Upsert the outcome of loading the file described by `state`."""
+        self.ensure_table()
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                INSERT INTO {self.table} (loader, file_path, file_size, file_mtime, checksum, status,
+                                          row_count, duration_seconds, error, loaded_at)
+                VALUES (:loader, :file_path, :file_size, :file_mtime, :checksum, :status,
+                        :row_count, :duration_seconds, :error, :loaded_at)
+                ON CONFLICT (loader, file_path) DO UPDATE SET
+                    file_size = EXCLUDED.file_size,
+                    file_mtime = EXCLUDED.file_mtime,
+                    checksum = EXCLUDED.checksum,
+                    status = EXCLUDED.status,
+                    row_count = EXCLUDED.row_count,
+                    duration_seconds = EXCLUDED.duration_seconds,
+                    error = EXCLUDED.error,
+                    loaded_at = EXCLUDED.loaded_at
+            """), {
+                'loader': self.loader, 'file_path': str(state.path), 'file_size': state.size,
+                'file_mtime': state.mtime, 'checksum': state.checksum, 'status': status,
+                'row_count': row_count, 'duration_seconds': duration_seconds,
+                'error': error, 'loaded_at': datetime.now()
+            })
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import uuid
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no peak-memory reading
+    resource = None
+
+from sdm_common.columns import CACHE_DIR
+
+# JSON lines are appended to this file; a '.prom' path is written as a Prometheus textfile instead
+DEFAULT_METRICS_PATH = Path(os.getenv('SDM_METRICS_PATH', CACHE_DIR / 'metrics.jsonl'))
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process since the last reset (VmHWM on Linux)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is the lifetime peak, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+def _reset_peak_rss():
+    """Reset VmHWM to the current RSS so the next reading covers one stage only (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+class StageRecord:
+    """Measurements of one stage; set rows_in / rows_out inside the `with` block."""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.peak_rss_bytes = None
+        self.child_peak = 0
+
+    def as_dict(self):
+        return {'stage': self.name, 'seconds': round(self.seconds, 6), 'peak_rss_bytes': self.peak_rss_bytes,
+                'rows_in': self.rows_in, 'rows_out': self.rows_out}
+
+class RunReport:
+    """
+    Wall time, peak memory and row counts per stage of one loader run.
+
+    Stages nest: a stage's peak memory includes the peaks of the stages inside it.
+    write() appends one JSON line per stage to `path`, or, for a '.prom' path,
+    replaces it with a Prometheus textfile (for node_exporter's textfile collector).
+    """
+
+    def __init__(self, loader, path=DEFAULT_METRICS_PATH):
+        self.loader = loader
+        self.path = Path(path)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.stages = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = StageRecord(name, rows_in)
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            # Keep the parent's peak so far before the reset below discards it
+            parent.child_peak = max(parent.child_peak, _peak_rss_bytes() or 0)
+        self._stack.append(record)
+        _reset_peak_rss()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - started
+            record.peak_rss_bytes = max(_peak_rss_bytes() or 0, record.child_peak) or None
+            self._stack.pop()
+            if parent is not None:
+                parent.child_peak = max(parent.child_peak, record.peak_rss_bytes or 0)
+            self.stages.append(record)
+
+    def write(self, status='ok'):
+        """Write the stages recorded so far and return the path written."""
+        if not self.stages:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix == '.prom':
+            self._write_prometheus(status)
+        else:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in self.stages:
+                    f.write(json.dumps({'run_id': self.run_id, 'loader': self.loader, 'status': status,
+                                        'started_at': self.started_at.isoformat(), **record.as_dict()}) + '\n')
+        print(f"Wrote metrics for {len(self.stages)} stages to {self.path}")
+        return self.path
+
+    def _write_prometheus(self, status):
+        # Repeated stages (one per file or batch) are summed; peaks take the maximum
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(record.name, {'seconds': 0.0, 'peak': 0, 'in': None, 'out': None})
+            total['seconds'] += record.seconds
+            total['peak'] = max(total['peak'], record.peak_rss_bytes or 0)
+            for key, value in (('in', record.rows_in), ('out', record.rows_out)):
+                if value is not None:
+                    total[key] = (total[key] or 0) + value
+
+        def family(metric, help_text, samples):
+            return [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge'] + [
+                f'{metric}{{{labels}}} {value}' for labels, value in samples]
+
+        stage_labels = {name: f'loader="{self.loader}",stage="{name}"' for name in totals}
+        lines = family('sdm_stage_seconds', 'Wall time of an ETL stage in the last run.',
+                       [(stage_labels[name], f"{total['seconds']:.6f}") for name, total in totals.items()])
+        lines += family('sdm_stage_peak_rss_bytes', 'Peak resident memory during an ETL stage in the last run.',
+                        [(stage_labels[name], total['peak']) for name, total in totals.items()])
+        lines += family('sdm_stage_rows', 'Rows entering (direction="in") or leaving (direction="out") an ETL stage.',
+                        [(f'{stage_labels[name]},direction="{direction}"', total[direction])
+                         for name, total in totals.items() for direction in ('in', 'out')
+                         if total[direction] is not None])
+        lines += family('sdm_run_success', 'Whether the last run completed (1) or failed (0).',
+                        [(f'loader="{self.loader}"', 1 if status == 'ok' else 0)])
+        lines += family('sdm_run_timestamp_seconds', 'Start time of the last run.',
+                        [(f'loader="{self.loader}"', f'{self.started_at.timestamp():.0f}')])
+        tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.path)
+
+_run_report = None
+
+def get_run_report(loader='sdm'):
+    """Return the process-wide run report, creating it on first use."""
+    global _run_report
+    if _run_report is None:
+        _run_report = RunReport(loader)
+    return _run_report
+
+def new_run_report(loader):
+    """Replace the process-wide run report with an empty one (e.g. per file in a worker process)."""
+    global _run_report
+    _run_report = RunReport(loader)
+    return _run_report
+
+def stage(name, rows_in=None):
+    """Time a stage of the current run: `with stage('read_rows') as s: ...; s.rows_out = len(df)`."""
+    return get_run_report().stage(name, rows_in)
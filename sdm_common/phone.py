@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# Country rules checked in order against the digits-only number; the first match wins.
+# Each rule is (country, required prefix, required length); an empty prefix matches any number.
+COUNTRY_RULES = [
+    ('India', '', 10),
+    ('Sri Lanka', '7', 9),
+    ('Sri Lanka', '94', 11),
+]
+DEFAULT_COUNTRY = 'Others'
+
+def normalize_phones(values):
+    """
+    Strip every non-digit from a column of phone numbers.
+    
+    Numeric columns (e.g. CSVs where blanks turned the column into float64) are
+    converted to integers first so '9876543210.0' does not gain a trailing zero.
+    
+    Returns:
+        pandas Series of digit strings ('string' dtype), missing where no digits remain.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_float_dtype(values):
+        values = values.round().astype('Int64')
+    digits = values.astype('string').str.replace(r'\D', '', regex=True)
+    return digits.mask(digits == '')
+
+def classify_countries(phones, rules=COUNTRY_RULES, default=DEFAULT_COUNTRY):
+    """
+    Classify normalized phone numbers into countries in one vectorized pass.
+    
+    Parameters:
+        phones: Series of digit strings (output of normalize_phones).
+        rules: Ordered (country, prefix, length) rules.
+        default: Country used when a number matches no rule.
+        
+    Returns:
+        pandas Series of country names, None for missing numbers.
+    """
+    # A no-op for normalize_phones output; object columns are converted once here
+    phones = pd.Series(phones).astype('string')
+    lengths = phones.str.len()
+    conditions = [
+        ((lengths == length) & phones.str.startswith(prefix)).fillna(False).to_numpy(dtype=bool)
+        for _, prefix, length in rules
+    ]
+    conditions.append(phones.isna().to_numpy())
+    # Select integer codes, then map them to labels with a single take on an object array
+    labels = np.array([country for country, _, _ in rules] + [None, default], dtype=object)
+    codes = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    return pd.Series(labels[codes], index=phones.index, dtype=object)
@@ -0,0 +1,37 @@
+import io
+
+# Characters handed to psycopg 3's COPY writer at a time
+COPY_BLOCK_SIZE = 1 << 20
+
+def copy_dataframe(conn, table_name, df, columns=None):
+    """
+    Stream a DataFrame into `table_name` with PostgreSQL COPY over the
+    connection's underlying DBAPI cursor (same transaction as `conn`). Works with
+    psycopg2 (copy_expert) and psycopg 3 (cursor.copy), see SDM_DB_DRIVER.
+    
+    Parameters:
+        conn: SQLAlchemy connection inside an open transaction.
+        table_name: Target table, already quoted/qualified if needed.
+        df: DataFrame to copy. NaN/None are sent as NULL, '' stays an empty string.
+        columns: Columns to copy, in order (defaults to all DataFrame columns).
+    """
+    columns = list(columns) if columns is not None else df.columns.tolist()
+    buffer = io.StringIO()
+    df.to_csv(buffer, columns=columns, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    statement = f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    cursor = conn.connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(statement, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(statement) as copy:
+                while True:
+                    block = buffer.read(COPY_BLOCK_SIZE)
+                    if not block:
+                        break
+                    copy.write(block)
+    finally:
+        cursor.close()
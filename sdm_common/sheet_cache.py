@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from sdm_common.columns import CACHE_DIR
+from sdm_common.ledger import file_checksum
+from sdm_common.metrics import stage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # without pyarrow the loaders parse the source file on every read
+    pa = pq = None
+
+DEFAULT_SHEET_CACHE_DIR = CACHE_DIR / 'sheets'
+DEFAULT_MAX_BYTES = int(float(os.getenv('SDM_SHEET_CACHE_MB', 2048)) * 1024 * 1024)
+
+# Parquet metadata key holding the sheet's full header row
+HEADER_METADATA_KEY = b'sdm_header'
+
+def stringify_mixed_columns(df):
+    """
+    Make a parsed sheet writable to Parquet: column names become strings and
+    object columns holding mixed types (e.g. ints and text in one column) have
+    their non-null cells stringified.
+
+    Readers apply this whether or not the cache is enabled, so a sheet read from
+    the cache has exactly the values of a sheet parsed from the source.
+    """
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_object_dtype(values) and pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+            df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+def _stat(path):
+    # Another process may evict a file between listing and stat()
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+class SheetCache:
+    """
+    Local Parquet copies of the columns read from source sheets, keyed by file
+    content, sheet name and the selection of columns read.
+
+    The cache stores what the loader's own reader produced (streamed, pruned to
+    the matched columns, stopped at the first empty row), so a cached read
+    returns the same values as an uncached one. Each file also records the
+    sheet's full header row, which later reads take from the Parquet metadata
+    instead of opening the source. A cache hit refreshes the file's mtime, and
+    once the directory grows past `max_bytes` the least recently used files are
+    deleted.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_SHEET_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # (path, size, mtime) -> checksum, so a file is hashed once per process
+        self._checksums = {}
+
+    @property
+    def enabled(self):
+        return pq is not None and os.getenv('SDM_SHEET_CACHE', '1') != '0'
+
+    def _checksum(self, file_path):
+        stat = file_path.stat()
+        key = (str(file_path.resolve()), stat.st_size, stat.st_mtime)
+        if key not in self._checksums:
+            self._checksums[key] = file_checksum(file_path)
+        return self._checksums[key]
+
+    def _prefix(self, file_path, sheet_name=None):
+        sheet = re.sub(r'[^\w.-]+', '_', str(sheet_name)) if sheet_name is not None else '_first'
+        if file_path.suffix.lower() == '.csv':
+            sheet = '_csv'
+        return f"{self._checksum(file_path)[:32]}-{sheet}"
+
+    def cache_path(self, file_path, sheet_name=None, columns=None, variant=''):
+        """
+        Parquet path for `columns` (all when None) of a sheet of `file_path` (the
+        first sheet when sheet_name is None). `variant` distinguishes reads whose
+        parsing options differ, e.g. the dtypes given to the CSV parser.
+        """
+        selection = hashlib.md5(json.dumps([columns, variant], default=str).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"{self._prefix(file_path, sheet_name)}-{selection}.parquet"
+
+    def cached_header(self, file_path, sheet_name=None):
+        """
+        Full header row of a sheet recorded by an earlier read, without opening the source.
+
+        Returns:
+            list of column names, or None if no read of this sheet is cached.
+        """
+        for path in self.cache_dir.glob(f"{self._prefix(file_path, sheet_name)}-*.parquet"):
+            try:
+                metadata = pq.read_schema(path).metadata or {}
+            except (FileNotFoundError, pa.ArrowInvalid):
+                continue
+            if HEADER_METADATA_KEY in metadata:
+                return json.loads(metadata[HEADER_METADATA_KEY])
+        return None
+
+    def load(self, file_path, sheet_name, header, columns, read, variant=''):
+        """
+        Return `columns` of a sheet, from the cache or by calling `read()` and caching its result.
+
+        Parameters:
+            file_path: Path of the source file.
+            sheet_name: Sheet the columns come from (None for the first sheet or a CSV).
+            header: The sheet's full header row, stored for cached_header.
+            columns: Column names `read` returns (None for all).
+            read: Callable that parses the source and returns the DataFrame to cache.
+            variant: Parsing options that change the values read (see cache_path).
+        Returns:
+            pandas DataFrame.
+        """
+        path = self.cache_path(file_path, sheet_name, columns, variant)
+        if path.exists():
+            try:
+                df = pd.read_parquet(path)
+                os.utime(path)
+                print(f"Reading {file_path.name} from sheet cache {path.name}")
+                return df
+            except FileNotFoundError:
+                pass  # evicted by another process since exists()
+
+        df = stringify_mixed_columns(read())
+        with stage('cache_write', rows_in=len(df)):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[HEADER_METADATA_KEY] = json.dumps(list(header)).encode('utf-8')
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+            os.replace(tmp_path, path)
+        print(f"Cached {len(df.columns)} columns of {file_path.name} (sheet {sheet_name or 'first'}) as {path.name}")
+        self.evict(keep=path)
+        return df
+
+    def evict(self, keep=None):
+        """Delete the least recently used Parquet files until the cache fits in max_bytes."""
+        files = [(path, stat) for path in self.cache_dir.glob('*.parquet')
+                 for stat in [_stat(path)] if stat is not None]
+        files.sort(key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= stat.st_size
+            path.unlink(missing_ok=True)
+            print(f"Evicted {path.name} from the sheet cache")
@@ -0,0 +1,20 @@
+{% snapshot staging_data_snapshot %}
+{{
+  config({
+    'target_schema': 'snapshots',
+    'unique_key': 'scj_number',
+    'strategy': 'check',
+    'check_cols': ['row_hash'],
+    'post_hook': [
+      "CREATE UNIQUE INDEX IF NOT EXISTS staging_data_snapshot_scd_id_idx ON {{ this }} (dbt_scd_id)",
+      "CREATE INDEX IF NOT EXISTS staging_data_snapshot_current_idx ON {{ this }} (scj_number) WHERE dbt_valid_to IS NULL",
+      "CREATE INDEX IF NOT EXISTS staging_data_snapshot_history_idx ON {{ this }} (scj_number, dbt_valid_from)",
+      "CREATE INDEX IF NOT EXISTS staging_data_snapshot_validity_idx ON {{ this }} USING gist (tsrange(dbt_valid_from, dbt_valid_to))"
+    ]
+  })
+}}
+-- The loader stores an MD5 of each row's content in row_hash (compute_row_hash in
+-- notebooks/Saints/my_transformation.py), so one column comparison detects any change
+SELECT *
+FROM {{ source('public', 'staging_data') }}
+{% endsnapshot %}
@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The loaders and the bot are scripts that import their neighbours by module name
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / 'notebooks' / 'Saints', ROOT / 'notebooks' / 'students', ROOT / 'models' / 'ai_slack_bot'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Tables the database tests create live here; the schema is dropped afterwards
+TEST_SCHEMA = 'sdm_test'
+LOCAL_HOSTS = (None, 'localhost', '127.0.0.1', '::1')
+
+
+@pytest.fixture
+def postgres_engine():
+    """Engine for a local scratch PostgreSQL from SDM_TEST_DATABASE_URL; the test is skipped without one."""
+    url = os.getenv('SDM_TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('set SDM_TEST_DATABASE_URL to a local scratch PostgreSQL database')
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine.url import make_url
+
+    if make_url(url).host not in LOCAL_HOSTS:
+        pytest.skip('SDM_TEST_DATABASE_URL must point at a local database')
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA {TEST_SCHEMA}'))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE'))
+    engine.dispose()
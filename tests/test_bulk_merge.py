@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+from conftest import TEST_SCHEMA
+from my_transformation import ROW_HASH_COLUMN, bulk_merge_data, compute_row_hash, create_table_if_not_exists
+
+
+def batch(rows, ts):
+    df = pd.DataFrame(rows, columns=['scj_number', 'name', 'team']).assign(inserted_at=ts, updated_at=ts)
+    return df.assign(**{ROW_HASH_COLUMN: compute_row_hash(df)})
+
+
+def stored(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(f'SELECT scj_number, name, team, updated_at FROM {TEST_SCHEMA}.roster '
+                                 f'ORDER BY scj_number')).fetchall()
+
+
+def test_merge_keeps_the_last_duplicate_and_updates_only_changed_rows(postgres_engine, capsys):
+    first = batch([['1', 'Kim', 'A'], ['2', 'Lee', 'B'], ['1', 'Kim Minsu', 'A']], datetime(2026, 1, 1))
+    create_table_if_not_exists(postgres_engine, TEST_SCHEMA, 'roster', first)
+    # One row per batch: every batch copies into its own temp table and commits on its own
+    bulk_merge_data(postgres_engine, TEST_SCHEMA, 'roster', first, batch_size=1)
+    rows = stored(postgres_engine)
+    assert [row[:3] for row in rows] == [('1', 'Kim Minsu', 'A'), ('2', 'Lee', 'B')]
+    assert 'Dropped 1 duplicate scj_number rows' in capsys.readouterr().out
+
+    second = batch([['1', 'Kim Minsu', 'A'], ['2', 'Lee', 'C'], ['3', 'Park', 'A']], datetime(2026, 2, 1))
+    bulk_merge_data(postgres_engine, TEST_SCHEMA, 'roster', second)
+    after = stored(postgres_engine)
+    assert [row[:3] for row in after] == [('1', 'Kim Minsu', 'A'), ('2', 'Lee', 'C'), ('3', 'Park', 'A')]
+    # The unchanged row keeps its timestamp
+    assert after[0][3] == rows[0][3]
+    assert after[1][3] != rows[1][3]
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from bulk_write import bulk_update_students
+from diff_engine import COMPARE_FIELDS, diff_students
+
+EXISTING = pd.DataFrame([
+    [1, '0771111111', 'Kim Minsu', 'Park', 'Lee', 'LK', 'A', 'jan.xlsx'],
+    [2, '0772222222', 'Lee Jiwoo', 'Choi', 'Han', 'LK', 'B', 'jan.xlsx'],
+    [3, '0773333333', 'Park Hana', 'Choi', 'Han', 'LK', 'B', 'jan.xlsx'],
+], columns=['id', 'mobile_phone'] + COMPARE_FIELDS)
+
+
+@pytest.fixture
+def raw_students(postgres_engine):
+    """A connection in a transaction holding iba.raw_students with EXISTING; rolled back afterwards."""
+    with postgres_engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS iba"))
+            if conn.execute(text("SELECT to_regclass('iba.raw_students')")).scalar() is not None:
+                pytest.skip('iba.raw_students already exists in this database')
+            conn.execute(text("""
+                CREATE TABLE iba.raw_students (
+                    id INTEGER PRIMARY KEY, mobile_phone TEXT, student_name TEXT, staff TEXT, networker TEXT,
+                    country TEXT, class TEXT, source_file TEXT, etl_update_dttm TIMESTAMP, etl_user_id TEXT
+                )
+            """))
+            for row in EXISTING.to_dict(orient='records'):
+                conn.execute(text("""
+                    INSERT INTO iba.raw_students (id, mobile_phone, student_name, staff, networker, country,
+                                                  class, source_file)
+                    VALUES (:id, :mobile_phone, :student_name, :staff, :networker, :country, :class, :source_file)
+                """), row)
+            yield conn
+        finally:
+            transaction.rollback()
+
+
+def test_only_changed_fields_are_overwritten(raw_students):
+    incoming = EXISTING.drop(columns='id').copy()
+    incoming.loc[0, 'staff'] = 'Jung'
+    # A value removed at the source is written as '', not kept by COALESCE
+    incoming.loc[1, 'class'] = None
+    incoming['source_file'] = 'feb.xlsx'
+    incoming = incoming.iloc[:2]
+    diff = diff_students(incoming, EXISTING, update_dttm='2026-02-01T00:00:00', user_id='test')
+
+    assert bulk_update_students(raw_students, diff.updates, COMPARE_FIELDS) == 2
+    rows = raw_students.execute(text(
+        "SELECT id, student_name, staff, class, source_file, etl_user_id FROM iba.raw_students ORDER BY id"
+    )).fetchall()
+    assert [tuple(row) for row in rows] == [
+        (1, 'Kim Minsu', 'Jung', 'A', 'feb.xlsx', 'test'),
+        (2, 'Lee Jiwoo', 'Choi', '', 'feb.xlsx', 'test'),
+        (3, 'Park Hana', 'Choi', 'B', 'jan.xlsx', None),
+    ]
@@ -0,0 +1,47 @@
+import re
+
+from sdm_common.columns import ColumnResolver, assign_columns, header_fingerprint, regex_score_matrix
+
+
+def test_each_column_goes_to_one_target_highest_score_first():
+    scores = [[90, 80, 0],
+              [95, 10, 0],
+              [0, 0, 40]]
+    # Target 1 takes column 0, so target 0 falls back to its next best column
+    assert assign_columns(scores) == {1: (0, 95), 0: (1, 80), 2: (2, 40)}
+    assert assign_columns(scores, min_score=50) == {1: (0, 95), 0: (1, 80)}
+    assert assign_columns([]) == {}
+
+
+def test_ties_go_to_the_column_fewer_targets_match():
+    patterns = {'student_name': re.compile(r'(?i)name'), 'staff': re.compile(r'(?i)staff')}
+    columns = ['Staff Name', 'Name']
+    scores = regex_score_matrix(patterns, columns)
+    # Both columns score 100 for student_name; 'Name' has no other taker
+    assert assign_columns(scores, min_score=1) == {0: (1, 100), 1: (0, 100)}
+
+
+def test_a_layout_is_scored_once_and_then_read_from_the_cache(tmp_path):
+    calls = []
+
+    def scorer(targets, columns):
+        calls.append(list(columns))
+        return [[100 if target in column.lower() else 0 for column in columns] for target in targets]
+
+    path = tmp_path / 'mappings.json'
+    first = ColumnResolver(scorer, name='test', min_score=1, cache_path=path)
+    assert first.resolve(['Name', 'Phone', 'Notes'], ['name', 'phone', 'team']) == {'name': 'Name', 'phone': 'Phone'}
+    # A new process, and headers differing only in case and spacing
+    second = ColumnResolver(scorer, name='test', min_score=1, cache_path=path)
+    assert second.resolve(['NAME ', 'phone', 'Notes'], ['name', 'phone', 'team']) == {'name': 'NAME ', 'phone': 'phone'}
+    assert len(calls) == 1
+    # Another scorer or target list is another layout
+    assert header_fingerprint(['Name'], ['name'], 'test') != header_fingerprint(['Name'], ['name'], 'fuzzy')
+    assert header_fingerprint(['Name'], ['name'], 'test') != header_fingerprint(['Name'], ['name', 'team'], 'test')
+
+
+def test_an_unreadable_cache_starts_empty(tmp_path):
+    path = tmp_path / 'mappings.json'
+    path.write_text('{not json')
+    resolver = ColumnResolver(lambda targets, columns: [[100]], name='test', cache_path=path)
+    assert resolver.resolve(['Name'], ['name']) == {'name': 'Name'}
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from diff_engine import COMPARE_FIELDS, diff_students
+
+
+def incoming(rows):
+    return pd.DataFrame(rows, columns=['student_name', 'mobile_phone', 'staff', 'networker', 'country',
+                                       'class', 'source_file'])
+
+
+def existing(rows):
+    return pd.DataFrame(rows, columns=['id', 'student_name', 'mobile_phone', 'staff', 'networker', 'country',
+                                       'class', 'source_file'])
+
+
+def test_splits_inserts_updates_and_unchanged():
+    new = incoming([
+        ['Kim', '010-1', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],    # unchanged
+        ['Choi', '010-2', 'Park', 'Lee', 'KR', 'Class B', 'a.csv'],   # class changed
+        ['Han', '010-3', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],    # new
+    ])
+    old = existing([
+        [1, 'Kim', '010-1', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],
+        [2, 'Choi', '010-2', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],
+    ])
+    diff = diff_students(new, old, update_dttm='2026-01-01')
+
+    assert diff.inserts['mobile_phone'].tolist() == ['010-3']
+    assert diff.unchanged['mobile_phone'].tolist() == ['010-1']
+    assert diff.updates['id'].tolist() == [2]
+    assert diff.updates.loc[0, 'class'] == 'Class B'
+    # Unchanged fields are not sent in the update
+    assert pd.isna(diff.updates.loc[0, 'student_name'])
+    assert diff.field_change_counts['class'] == 1
+    assert sum(diff.field_change_counts.values()) == 1
+    assert set(diff.field_change_counts) == set(COMPARE_FIELDS)
+
+
+def test_missing_values_compare_equal_to_empty_strings():
+    new = incoming([['Kim', '010-1', None, 'Lee', 'KR', 'Class A', 'a.csv']])
+    old = existing([[1, 'Kim', '010-1', '', 'Lee', 'KR', 'Class A', 'a.csv']])
+    diff = diff_students(new, old)
+    assert diff.updates.empty
+    assert len(diff.unchanged) == 1
+
+
+def test_rows_without_a_key_are_dropped_and_the_last_duplicate_wins():
+    new = incoming([
+        ['Kim', None, 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],
+        ['Lee', '', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],
+        ['Han', '010-3', 'Park', 'Lee', 'KR', 'Class A', 'a.csv'],
+        ['Han', '010-3', 'Park', 'Lee', 'KR', 'Class C', 'a.csv'],
+    ])
+    diff = diff_students(new, existing([]))
+    assert diff.inserts['mobile_phone'].tolist() == ['010-3']
+    assert diff.inserts['class'].tolist() == ['Class C']
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from entity_resolution import LINK_COLUMNS, digit_errors, resolve_duplicates, soundex
+
+
+def students(rows):
+    return pd.DataFrame(rows, columns=['id', 'student_name', 'mobile_phone', 'staff', 'networker'])
+
+
+def clusters(links):
+    return sorted(sorted(group) for group in links.groupby('cluster_id')['student_id'].apply(list))
+
+
+def test_same_phone_and_similar_name_are_linked():
+    links = resolve_duplicates(students([
+        [1, 'Kim Minsu', '010-1234-5678', 'Park', 'Lee'],
+        [2, 'Minsu Kim', '+82 10 1234 5678', 'Choi', 'Han'],
+        [3, 'Lee Jiwoo', '010-9999-0000', 'Park', 'Lee'],
+    ]))
+    assert list(links.columns) == LINK_COLUMNS
+    assert clusters(links) == [[1, 2], [3]]
+    assert links.set_index('student_id').loc[2, 'match_rule'] == 'phone'
+
+
+def test_same_name_with_different_phones_is_not_linked():
+    links = resolve_duplicates(students([
+        [1, 'Kim Minsu', '010-1234-5678', 'Park', 'Lee'],
+        [2, 'Kim Minsu', '010-8765-4321', 'Park', 'Lee'],
+    ]))
+    assert clusters(links) == [[1], [2]]
+
+
+def test_missing_phone_needs_the_same_staff_and_networker():
+    links = resolve_duplicates(students([
+        [1, 'Kim Minsu', '010-1234-5678', 'Park', 'Lee'],
+        [2, 'Kim Minsu', None, 'Park', 'Lee'],
+        [3, 'Kim Minsu', None, 'Choi', 'Jung'],
+    ]))
+    assert clusters(links) == [[1, 2], [3]]
+
+
+def test_namesakes_sharing_only_a_staff_member_stay_separate():
+    # A common name registered by one busy staff member through different networkers
+    links = resolve_duplicates(students([
+        [1, 'Kim Minsu', '010-1234-5678', 'Park', 'Lee'],
+        [2, 'Kim Minsu', None, 'Park', 'Han'],
+        [3, 'Kim Minsu', None, 'Park', None],
+    ]))
+    assert clusters(links) == [[1], [2], [3]]
+
+
+def test_missing_phone_without_registration_columns_is_not_linked():
+    links = resolve_duplicates(pd.DataFrame({'id': [1, 2], 'student_name': ['Kim Minsu', 'Kim Minsu'],
+                                             'mobile_phone': ['010-1234-5678', None]}))
+    assert clusters(links) == [[1], [2]]
+
+
+def test_a_row_without_a_phone_does_not_chain_two_people():
+    links = resolve_duplicates(students([
+        [1, 'Kim Minsu', '010-1234-5678', 'Park', 'Lee'],
+        [2, 'Kim Minsu', None, 'Park', 'Lee'],
+        [3, 'Kim Minsu', '010-8765-4321', 'Park', 'Lee'],
+    ]))
+    assert [1, 2, 3] not in clusters(links)
+    assert [1] in clusters(links) or [3] in clusters(links)
+
+
+def test_korean_names_are_kept():
+    links = resolve_duplicates(students([
+        [1, '김민수', '010-1234-5678', None, None],
+        [2, '김민수', '010-1234-5678', None, None],
+        [3, '이지우', '010-1234-5679', None, None],
+    ]))
+    assert clusters(links) == [[1, 2], [3]]
+
+
+def test_helpers():
+    assert soundex('Robert') == soundex('Rupert') == 'R163'
+    assert digit_errors('12345678', '12345679') == 1
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from sdm_common.ledger import IngestionLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    # SQLite understands the same CREATE TABLE and ON CONFLICT upsert; its default schema is "main"
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    yield IngestionLedger(engine, 'saints', schema_name='main')
+    engine.dispose()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'roster.csv'
+    path.write_text('scj_number,name\n1,Kim\n')
+    return path
+
+
+def test_a_loaded_file_is_skipped_until_it_changes(ledger, source):
+    state = ledger.check(source)
+    assert state.needs_load
+    ledger.record(state, 'loaded', row_count=1)
+    assert not ledger.check(source).needs_load
+
+    source.write_text('scj_number,name\n1,Kim\n2,Lee\n')
+    assert ledger.check(source).needs_load
+
+
+def test_a_touched_file_is_decided_by_its_checksum(ledger, source):
+    ledger.record(ledger.check(source), 'loaded', row_count=1)
+    stat = source.stat()
+    os.utime(source, (stat.st_atime, stat.st_mtime + 60))
+
+    state = ledger.check(source)
+    assert not state.needs_load
+    # The new mtime is remembered, so the next check needs no checksum
+    with ledger.engine.connect() as conn:
+        mtime = conn.execute(text('SELECT file_mtime FROM main.ingestion_ledger')).scalar()
+    assert mtime == source.stat().st_mtime
+
+
+def test_force_and_unfinished_loads_read_the_file_again(ledger, source):
+    state = ledger.check(source)
+    ledger.record(state, 'loaded', row_count=1)
+    assert ledger.check(source, force=True).needs_load
+
+    for status in ('failed', 'partial'):
+        ledger.record(state, status, error='boom')
+        assert ledger.check(source).needs_load
+    with ledger.engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*), MAX(status) FROM main.ingestion_ledger')).fetchone() == (1, 'partial')
@@ -0,0 +1,70 @@
+import time
+import threading
+
+import lookups
+from lookups import WarehouseLookups
+
+
+class FakeWarehouse(WarehouseLookups):
+    """Answers from canned rows instead of the database, counting each statement run."""
+
+    def __init__(self, delay=0.0, **kwargs):
+        super().__init__(engine=object(), **kwargs)
+        self.delay = delay
+        self.build = '2026-01-01'
+        self.ran = []
+
+    def _fetch(self, name, params):
+        time.sleep(self.delay)
+        self.ran.append(name)
+        if name == 'latest_build':
+            return [(self.build,)]
+        return [(len(self.ran),)]
+
+
+def test_answers_are_cached_until_the_ttl_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(lookups.time, 'monotonic', lambda: now[0])
+    warehouse = FakeWarehouse(ttl=60, build_check_interval=1000)
+    first = warehouse.query('count_students', **{'class': 'A'})
+    assert warehouse.query('count_students', **{'class': 'A'}) == first
+    assert warehouse.stats['hits'] == 1
+
+    now[0] += 61
+    assert warehouse.query('count_students', **{'class': 'A'}) != first
+    assert warehouse.ran.count('count_students') == 2
+
+
+def test_a_new_dbt_build_clears_the_cache():
+    warehouse = FakeWarehouse(build_check_interval=0)
+    first = warehouse.query('count_students', **{'class': 'A'})
+    assert warehouse.query('count_students', **{'class': 'A'}) == first
+
+    warehouse.build = '2026-01-02'
+    assert warehouse.query('count_students', **{'class': 'A'}) != first
+    assert warehouse.stats['invalidations'] == 1
+
+
+def test_cache_keeps_the_most_recent_entries():
+    warehouse = FakeWarehouse(max_entries=2, build_check_interval=1000)
+    for name in ['A', 'B', 'A', 'C']:
+        warehouse.query('count_students', **{'class': name})
+    assert [key[1][0][1] for key in warehouse.cache] == ['A', 'C']
+
+
+def test_concurrent_askers_share_one_query():
+    warehouse = FakeWarehouse(delay=0.05, build_check_interval=1000)
+    threads = [threading.Thread(target=warehouse.query, args=('count_saints',),
+                                kwargs={'region': 'North', 'department': None, 'team': None})
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert warehouse.ran.count('count_saints') == 1
+    assert warehouse.stats['hits'] == 7
+    # Locks do not accumulate per question
+    warehouse.delay = 0
+    for i in range(500):
+        warehouse.query('saint_team', id=str(i))
+    assert len(warehouse._key_locks) == lookups.LOCK_STRIPES
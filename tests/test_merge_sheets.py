@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+import my_transformation
+from header_translation import HeaderTranslationCache
+from my_transformation import SheetResult, merge_sheets, read_sheet
+
+TARGETS = ['scj_number', 'name', 'new cell grp']
+
+
+def result(position, rows):
+    return SheetResult(position, f'sheet{position}', pd.DataFrame(rows, columns=['scj_number', 'name']), 0.0, [], None)
+
+
+def test_merge_keeps_workbook_order_and_the_later_sheets_row():
+    # Results arrive in completion order, not workbook order
+    results = [result(1, [['2', 'Lee (moved)'], ['3', 'Park']]),
+               result(0, [['1', 'Kim'], ['2', 'Lee'], [None, 'No key']])]
+    merged = merge_sheets(results)
+    # Rows without a key are kept, not deduplicated against each other
+    assert merged['scj_number'].fillna('').tolist() == ['1', '', '2', '3']
+    assert merged['name'].tolist() == ['Kim', 'No key', 'Lee (moved)', 'Park']
+
+
+def test_merge_of_no_sheets_is_empty():
+    assert merge_sheets([]).empty
+
+
+@pytest.fixture
+def uncached(tmp_path, monkeypatch):
+    monkeypatch.setenv('SDM_SHEET_CACHE', '0')
+    translations = HeaderTranslationCache(cache_path=tmp_path / 'translations.json', translator_factory=lambda: None)
+    monkeypatch.setattr(my_transformation, 'get_translation_cache', lambda: translations)
+
+
+def test_read_sheet_names_columns_after_their_targets(tmp_path, uncached):
+    path = tmp_path / 'roster.csv'
+    pd.DataFrame({'SCJ Number': ['0001'], 'Name': ['Kim'], 'New Cell Grp': ['N1']}).to_csv(path, index=False)
+    sheet = read_sheet(path, None, TARGETS)
+    assert sheet.error is None
+    assert sorted(sheet.df.columns) == ['name', 'new_cell_grp', 'scj_number']
+
+
+def test_read_sheet_without_a_key_column_reports_an_error(tmp_path, uncached):
+    path = tmp_path / 'roster.csv'
+    pd.DataFrame({'Name': ['Kim'], 'Office': ['Seoul']}).to_csv(path, index=False)
+    sheet = read_sheet(path, None, TARGETS)
+    assert sheet.df is None and 'scj_number' in sheet.error
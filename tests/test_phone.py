@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from sdm_common.phone import COUNTRY_RULES, classify_countries, normalize_phones
+
+
+def legacy_normalize(values):
+    # The former cleaning in students/main.py
+    phones = pd.Series(values, dtype=object).astype(str).str.replace(r'\D', '', regex=True)
+    return phones.where(~phones.isin(['', 'nan']), None)
+
+
+def legacy_get_country(phone):
+    # The former per-row function in students/main.py
+    if pd.isna(phone) or phone is None or phone == "":
+        return None
+    if len(str(phone)) == 10:
+        return "India"
+    elif len(str(phone)) == 9 and str(phone).startswith("7"):
+        return "Sri Lanka"
+    elif str(phone).startswith("94") and len(str(phone)) == 11:
+        return "Sri Lanka"
+    else:
+        return "Others"
+
+
+def as_list(series):
+    return [None if pd.isna(value) else value for value in series]
+
+
+def synthetic_phones(count, seed=0):
+    rng = random.Random(seed)
+    phones = []
+    for _ in range(count):
+        digits = rng.choice(['', '7', '94', '9', '0']) + ''.join(rng.choice('0123456789')
+                                                                 for _ in range(rng.randint(0, 12)))
+        phones.append(rng.choice([digits, f"+{digits}", f"({digits[:3]}) {digits[3:]}", None, 'n/a']))
+    return phones
+
+
+def test_vectorized_classification_matches_the_legacy_apply():
+    phones = normalize_phones(synthetic_phones(20000))
+    expected = phones.astype(object).apply(legacy_get_country)
+    assert as_list(classify_countries(phones)) == as_list(expected)
+
+
+def test_normalization_matches_the_legacy_cleaning_for_text():
+    phones = synthetic_phones(5000, seed=1)
+    assert as_list(normalize_phones(pd.Series(phones, dtype=object))) == as_list(legacy_normalize(phones))
+
+
+def test_numeric_columns_do_not_gain_a_trailing_zero():
+    # A CSV column with blanks is parsed as float64
+    phones = pd.Series([9876543210.0, np.nan, 771234567.0])
+    assert as_list(normalize_phones(phones)) == ['9876543210', None, '771234567']
+    assert legacy_normalize(phones)[0] == '98765432100'
+
+
+def test_rules_are_checked_in_order():
+    phones = normalize_phones(pd.Series(['7712345678', '771234567', '94771234567', '12345']))
+    assert as_list(classify_countries(phones)) == ['India', 'Sri Lanka', 'Sri Lanka', 'Others']
+    # Putting the Sri Lankan prefix first claims 10-digit numbers starting with 7 too
+    rules = [('Sri Lanka', '7', 10)] + COUNTRY_RULES
+    assert as_list(classify_countries(phones, rules, default='Elsewhere')) == [
+        'Sri Lanka', 'Sri Lanka', 'Sri Lanka', 'Elsewhere']
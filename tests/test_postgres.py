@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+import sdm_common.postgres
+from sdm_common.postgres import copy_dataframe
+
+
+class Psycopg2Cursor:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def copy_expert(self, statement, buffer):
+        self.sent.append((statement, buffer.read()))
+
+    def close(self):
+        pass
+
+
+class Psycopg3Cursor:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def copy(self, statement):
+        sent = self.sent
+        sent.append((statement, ''))
+
+        class Copy:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def write(self, block):
+                sent[-1] = (sent[-1][0], sent[-1][1] + block)
+
+        return Copy()
+
+    def close(self):
+        pass
+
+
+def connection(cursor_class, sent):
+    return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor_class(sent)))
+
+
+def test_both_drivers_send_the_same_copy(monkeypatch):
+    # Small blocks, so the psycopg 3 writer is fed several times
+    monkeypatch.setattr(sdm_common.postgres, 'COPY_BLOCK_SIZE', 4)
+    df = pd.DataFrame({'scj_number': ['1', '2'], 'name': ['Kim', None], 'note': ['', 'x']})
+    sent2, sent3 = [], []
+    copy_dataframe(connection(Psycopg2Cursor, sent2), 'staging', df, ['scj_number', 'name', 'note'])
+    copy_dataframe(connection(Psycopg3Cursor, sent3), 'staging', df, ['scj_number', 'name', 'note'])
+    assert sent2 == sent3
+    statement, data = sent2[0]
+    assert statement == 'COPY staging ("scj_number", "name", "note") FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    assert data == '1,Kim,\n2,\\N,x\n'
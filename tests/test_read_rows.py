@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from my_transformation import read_until_first_empty_row
+
+ROWS = [['0001', 'Kim', 'A'], ['0002', 'Lee', None], ['0003', 'Park', 'B'],
+        [None, None, None], ['junk', 'after', 'gap'], ['0004', 'Choi', 'C']]
+
+
+def write(tmp_path, suffix, rows=ROWS):
+    path = tmp_path / f'roster.{suffix}'
+    df = pd.DataFrame(rows, columns=['scj_number', 'name', 'team'])
+    df.to_csv(path, index=False) if suffix == 'csv' else df.to_excel(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'xlsx'])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 100])
+def test_stops_at_the_first_empty_row_whatever_the_chunk_size(tmp_path, suffix, chunk_size):
+    df = read_until_first_empty_row(write(tmp_path, suffix), chunk_size=chunk_size, dtype={'scj_number': str})
+    assert df['scj_number'].tolist() == ['0001', '0002', '0003']
+    assert df.index.tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'xlsx'])
+def test_a_row_counts_as_empty_only_in_the_columns_read(tmp_path, suffix):
+    rows = [['0001', 'Kim', 'A'], [None, None, 'B'], ['0002', 'Lee', 'C']]
+    path = write(tmp_path, suffix, rows)
+    assert len(read_until_first_empty_row(path, chunk_size=2)) == 3
+    # Without the team column the second row is empty
+    assert len(read_until_first_empty_row(path, chunk_size=2, usecols=[0, 1])) == 1
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'xlsx'])
+def test_reads_everything_without_an_empty_row(tmp_path, suffix):
+    df = read_until_first_empty_row(write(tmp_path, suffix, ROWS[:3]), chunk_size=2)
+    assert len(df) == 3
+
+
+def test_header_only_sheet_gives_no_rows(tmp_path):
+    path = write(tmp_path, 'xlsx', [])
+    df = read_until_first_empty_row(path, chunk_size=2)
+    assert df.empty and df.columns.tolist() == ['scj_number', 'name', 'team']
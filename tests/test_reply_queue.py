@@ -0,0 +1,86 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+from slack_sdk.errors import SlackApiError
+
+from reply_queue import ReplyQueue, _retry_after
+
+INTERVAL = 0.05
+
+
+def api_error(status_code, headers=None):
+    return SlackApiError('error', SimpleNamespace(status_code=status_code, headers=headers or {}))
+
+
+class FakeClient:
+    """Records (channel, text, monotonic time) per post; `errors` maps a text to the errors its posts raise first."""
+
+    def __init__(self, errors=None):
+        self.errors = {text: list(raised) for text, raised in (errors or {}).items()}
+        self.posts = []
+        self.sent = []
+
+    async def chat_postMessage(self, channel, thread_ts, text):
+        self.posts.append((channel, text, time.monotonic()))
+        if self.errors.get(text):
+            raise self.errors[text].pop(0)
+        self.sent.append((channel, text, time.monotonic()))
+
+
+def run(client, replies, **options):
+    async def main():
+        queue = ReplyQueue(client, channel_interval=INTERVAL, **options).start()
+        for channel, text in replies:
+            queue.submit(channel, text)
+        await queue.close()
+        return queue
+    return asyncio.run(main())
+
+
+def test_retry_after_header_is_case_insensitive():
+    assert _retry_after(api_error(429, {'retry-after': '3'}), 1.0) == 3.0
+    assert _retry_after(api_error(429, {'Retry-After': 'soon'}), 1.0) == 1.0
+    assert _retry_after(api_error(429), 1.0) == 1.0
+
+
+def test_replies_to_a_channel_are_spaced_and_ordered_without_holding_up_others():
+    client = FakeClient()
+    queue = run(client, [('A', 'a1'), ('A', 'a2'), ('A', 'a3'), ('B', 'b1')], workers=4)
+    sent_a = [(text, at) for channel, text, at in client.sent if channel == 'A']
+    assert [text for text, _ in sent_a] == ['a1', 'a2', 'a3']
+    assert all(later - earlier >= INTERVAL * 0.9 for (_, earlier), (_, later) in zip(sent_a, sent_a[1:]))
+    # B has its own slots, so it goes out before A's second reply
+    assert [text for _, text, _ in client.sent].index('b1') < 2
+    assert queue.stats['sent'] == 4 and len(queue.latencies) == 4
+
+
+def test_a_429_keeps_its_place_and_pushes_the_channel_back():
+    client = FakeClient({'a1': [api_error(429, {'Retry-After': '0.2'})]})
+    queue = run(client, [('A', 'a1'), ('A', 'a2'), ('A', 'a3'), ('B', 'b1')], workers=4)
+    assert [text for channel, text, _ in client.sent if channel == 'A'] == ['a1', 'a2', 'a3']
+    first_post = client.posts[0][2]
+    retried = next(at for _, text, at in client.sent if text == 'a1')
+    second = next(at for _, text, at in client.sent if text == 'a2')
+    assert retried - first_post >= 0.2 * 0.9
+    assert second - retried >= INTERVAL * 0.9
+    # The other channel is not rate limited
+    assert next(at for _, text, at in client.sent if text == 'b1') < retried
+    assert queue.stats['rate_limited'] == 1 and queue.stats['retried'] == 1 and queue.stats['sent'] == 4
+
+
+def test_client_errors_fail_and_server_errors_give_up_after_max_retries():
+    client = FakeClient({'bad': [api_error(400)], 'down': [api_error(503)] * 3})
+    queue = run(client, [('A', 'bad'), ('B', 'down')], max_retries=1)
+    assert [text for _, text, _ in client.posts].count('bad') == 1
+    assert [text for _, text, _ in client.posts].count('down') == 2
+    assert queue.stats['failed'] == 2 and queue.stats['sent'] == 0
+
+
+def test_a_full_queue_drops_the_reply():
+    async def main():
+        queue = ReplyQueue(FakeClient(), max_queue=1)
+        return queue, queue.submit('A', 'first'), queue.submit('A', 'second')
+    queue, first, second = asyncio.run(main())
+    assert first and not second
+    assert queue.stats['dropped'] == 1
@@ -0,0 +1,103 @@
+import re
+import random
+import threading
+
+import pytest
+
+from router import IntentRouter, Rule, keyword_pattern, load_rule_file, required_literals
+from responses import RESPONSE_PATTERNS
+
+ALPHABET = ['a', 'h', 'i', 'e', 'l', 'o', 'y', 'I', 'İ', 'ı', 'ſ', 's', 'K', 'k', ' ', '?', '1', '\n']
+
+
+def legacy_route(rules, text):
+    # The former get_response: re.search with each pattern string in order
+    for rule in rules:
+        if re.search(rule.pattern, text):
+            return rule.response
+    return None
+
+
+def test_router_answers_like_the_legacy_loop():
+    rules = [Rule(f"builtin_{i}", pattern, response, 0) for i, (pattern, response) in enumerate(RESPONSE_PATTERNS)]
+    rules += [Rule('istanbul', r'(?i)İstanbul', 'city', 0), Rule('sk', r'(?i)\bsk\b', 'sk', 0),
+              Rule('words', keyword_pattern(['yes', 'yo']), 'words', 0), Rule('anchored', r'^a\d', 'anchored', 0),
+              Rule('lines', r'o\n\n?a', 'lines', 0), Rule('spaces', r'(?i)hey  +k', 'spaces', 0),
+              Rule('plus', r'(?:ha)+s?(?=\?)', 'plus', 0), Rule('class', r'[ks]e{2,}', 'class', 0),
+              Rule('case', r'Ky', 'case', 0), Rule('named', r'(?P<g>lo|ol)\b', 'named', 0)]
+    router = IntentRouter(rules, cache_size=0)
+    rng = random.Random(0)
+    texts = ['istanbul', 'ISTANBUL', 'hi there', 'thank you', 'ſk', 'a1', 'oh', 'help!']
+    texts += [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12))) for _ in range(20000)]
+    for text in texts:
+        assert router.route(text) == legacy_route(rules, text), text
+
+
+def test_required_literals():
+    assert required_literals(keyword_pattern(['roster', 'team'])) == (('roster', 'team'), True)
+    assert required_literals(r'(?i)hello|hi|hey') == (('hello', 'hey', 'hi'), True)
+    assert required_literals(r'who\s+leads (?:cell|team)s?\?') == (('leads ',), False)
+    assert required_literals(r'ab+c*d') == (('ab',), False)
+    assert required_literals(r'x(?:long|longer)') == (('long', 'longer'), False)
+    # Optional parts and unread syntax give no literal, so the rule is always checked
+    assert required_literals(r'(?:cell)?\d+') is None
+    assert required_literals(r'(a)\1') is None
+    assert required_literals(r'(?x) a b') is None
+
+
+def test_higher_priority_wins_then_definition_order():
+    router = IntentRouter([Rule('low', 'help', 'low', 0), Rule('first', 'help', 'first', 5),
+                           Rule('second', 'help', 'second', 5)])
+    assert router.route('help me') == 'first'
+    assert router.route('nothing') is None
+
+
+def test_cache_is_bounded_lru():
+    router = IntentRouter([Rule('a', 'a', 'A', 0)], cache_size=2)
+    for text in ['a', 'b', 'a', 'c']:
+        router.route(text)
+    assert list(router.cache) == ['a', 'c']
+    assert (router.hits, router.misses) == (1, 3)
+
+
+def test_concurrent_routing_keeps_the_cache_consistent():
+    router = IntentRouter([Rule('n', r'\d', 'number', 0)], cache_size=50)
+    errors = []
+
+    def work():
+        try:
+            for i in range(5000):
+                assert router.route(f"m{i % 200}") == 'number'
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(router.cache) == 50
+    assert router.hits + router.misses == 40000
+
+
+def test_rule_files_reload_and_bad_files_keep_previous_rules(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text('[{"keywords": ["roster"], "response": "v1"}]')
+    router = IntentRouter(rule_files=[path], reload_interval=0)
+    assert router.route('roster please') == 'v1'
+
+    path.write_text('[{"keywords": ["roster"], "response": "v2", "priority": 1}]')
+    router._mtimes[path] = None
+    assert router.route('roster please') == 'v2'
+
+    path.write_text('[{"pattern": "(", "response": "broken"}]')
+    router._mtimes[path] = None
+    assert router.route('roster please') == 'v2'
+
+
+def test_rule_file_entries_need_a_response_and_a_pattern(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text('[{"keywords": ["roster"]}]')
+    with pytest.raises(ValueError):
+        load_rule_file(path)
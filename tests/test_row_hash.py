@@ -0,0 +1,33 @@
+import pandas as pd
+
+from my_transformation import compute_row_hash
+
+
+def frame(**columns):
+    return pd.DataFrame({'scj_number': ['1', '2'], **columns})
+
+
+def test_hash_ignores_column_order_key_and_etl_columns():
+    a = frame(name=['Kim', 'Lee'], team=['A', 'B'], updated_at=[1, 2])
+    b = frame(team=['A', 'B'], name=['Kim', 'Lee'], updated_at=[3, 4])
+    b['scj_number'] = ['9', '8']
+    assert compute_row_hash(a).tolist() == compute_row_hash(b).tolist()
+
+
+def test_hash_changes_with_content():
+    before = compute_row_hash(frame(name=['Kim', 'Lee'], team=['A', 'B']))
+    after = compute_row_hash(frame(name=['Kim', 'Lee'], team=['A', 'C']))
+    assert before[0] == after[0]
+    assert before[1] != after[1]
+
+
+def test_null_and_empty_string_hash_differently():
+    hashes = compute_row_hash(frame(name=[None, '']))
+    assert hashes[0] != hashes[1]
+
+
+def test_values_cannot_shift_between_columns():
+    a = compute_row_hash(frame(a=['x', 'x'], b=['y', 'y']))
+    b = compute_row_hash(frame(a=['xy', 'xy'], b=['', '']))
+    assert a[0] != b[0]
+    assert len(a[0]) == 32
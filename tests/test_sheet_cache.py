@@ -0,0 +1,118 @@
+import os
+import datetime
+
+import pandas as pd
+import pytest
+
+import my_transformation
+from header_translation import HeaderTranslationCache
+from my_transformation import compute_row_hash, read_spreadsheet_with_fuzzy_matching
+from sdm_common.sheet_cache import SheetCache
+
+pytest.importorskip('pyarrow')
+
+TARGETS = ['scj_number', 'name', 'phone', 'team']
+
+
+@pytest.fixture
+def translations(tmp_path):
+    # English headers never reach the translator
+    return HeaderTranslationCache(cache_path=tmp_path / 'translations.json', translator_factory=lambda: None)
+
+
+@pytest.fixture
+def sheet():
+    return pd.DataFrame({
+        'scj_number': ['0001', '0002', '0003'],
+        'name': ['Kim', 'Lee', 'Park'],
+        'phone': ['010-1234-5678', '010-2222-3333', None],
+        'team': [1, 'RL', 3],
+        'unused': ['x', 'y', 'z'],
+    })
+
+
+def read(path, translations, cache, chunk_size):
+    return read_spreadsheet_with_fuzzy_matching(path, None, TARGETS, translation_cache=translations,
+                                                chunk_size=chunk_size, sheet_cache=cache).reset_index(drop=True)
+
+
+def values(df):
+    return df.astype(object).where(df.notna(), None)
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'xlsx'])
+@pytest.mark.parametrize('chunk_size', [None, 2])
+def test_cached_reads_match_uncached_reads(tmp_path, monkeypatch, translations, sheet, suffix, chunk_size):
+    path = tmp_path / f'roster.{suffix}'
+    sheet.to_csv(path, index=False) if suffix == 'csv' else sheet.to_excel(path, index=False)
+    cache = SheetCache(tmp_path / 'sheets')
+
+    monkeypatch.setenv('SDM_SHEET_CACHE', '0')
+    plain = read(path, translations, cache, chunk_size)
+    monkeypatch.setenv('SDM_SHEET_CACHE', '1')
+    cold = read(path, translations, cache, chunk_size)
+    warm = read(path, translations, cache, chunk_size)
+
+    for other in (cold, warm):
+        # Same values, and so the same row hashes; string columns may come back from
+        # Parquet as Arrow strings (missing values NaN) rather than objects (None)
+        pd.testing.assert_frame_equal(values(plain), values(other))
+        assert compute_row_hash(plain).tolist() == compute_row_hash(other).tolist()
+    if suffix == 'xlsx':
+        assert plain['scj_number'].tolist() == ['0001', '0002', '0003']
+
+
+def test_cache_holds_only_the_columns_read_and_the_full_header(tmp_path, translations, sheet):
+    path = tmp_path / 'roster.csv'
+    sheet.to_csv(path, index=False)
+    cache = SheetCache(tmp_path / 'sheets')
+    read(path, translations, cache, 2)
+
+    [cached] = list((tmp_path / 'sheets').glob('*.parquet'))
+    assert 'unused' not in pd.read_parquet(cached).columns
+    assert cache.cached_header(path) == list(sheet.columns)
+
+
+def test_eviction_keeps_the_newest_file(tmp_path):
+    cache = SheetCache(tmp_path, max_bytes=0)
+    for i in range(3):
+        path = tmp_path / f'{i}.parquet'
+        pd.DataFrame({'a': [i]}).to_parquet(path)
+        os.utime(path, (i, i))
+    cache.evict(keep=tmp_path / '2.parquet')
+    assert [p.name for p in tmp_path.glob('*.parquet')] == ['2.parquet']
+
+
+def test_eviction_tolerates_files_deleted_meanwhile(tmp_path, monkeypatch):
+    cache = SheetCache(tmp_path, max_bytes=0)
+    pd.DataFrame({'a': [1]}).to_parquet(tmp_path / 'gone.parquet')
+    listed = list(tmp_path.glob('*.parquet'))
+    (tmp_path / 'gone.parquet').unlink()
+    monkeypatch.setattr(type(tmp_path), 'glob', lambda self, pattern: iter(listed))
+    cache.evict()
+
+
+def test_excel_engines_read_the_same_values(tmp_path, monkeypatch):
+    pytest.importorskip('python_calamine')
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    # Starts in column B, with a date, a whole number, a blank header and an empty row
+    sheet.append([None, 'scj_number', 'birth', 'count', None])
+    sheet.append([None, '0001', datetime.date(1990, 5, 1), 3, 1.5])
+    sheet.append([None, '0002', datetime.datetime(1991, 6, 2, 7, 30), 4.0, None])
+    sheet.append([])
+    sheet.append([None, '0003', None, 5, None])
+    path = tmp_path / 'roster.xlsx'
+    workbook.save(path)
+
+    frames = []
+    for engine in ('openpyxl', 'calamine'):
+        monkeypatch.setattr(my_transformation, 'EXCEL_ENGINE', engine)
+        assert my_transformation.excel_engine() == engine
+        assert my_transformation.read_spreadsheet_header(path) == ['Unnamed: 0', 'scj_number', 'birth', 'count',
+                                                                   'Unnamed: 4']
+        frames.append(my_transformation.read_until_first_empty_row(path, chunk_size=2))
+    pd.testing.assert_frame_equal(frames[0], frames[1])
+    assert frames[0]['scj_number'].tolist() == ['0001', '0002']
@@ -0,0 +1,51 @@
+import datetime
+
+import pandas as pd
+from sqlalchemy import (BigInteger, Column, Date, DateTime, Float, Integer, MetaData, SmallInteger, String,
+                        Table)
+
+from my_transformation import coerce_to_table_types, infer_sql_type
+
+
+def test_infers_compact_types():
+    assert isinstance(infer_sql_type(pd.Series([1, 2, 300])), SmallInteger)
+    assert isinstance(infer_sql_type(pd.Series([1, 40000])), Integer)
+    assert isinstance(infer_sql_type(pd.Series([1, 2 ** 40])), BigInteger)
+    assert isinstance(infer_sql_type(pd.Series([1.5, 2.0])), Float)
+    assert isinstance(infer_sql_type(pd.Series(['2020-01-31', '2021.02.03'])), Date)
+    assert isinstance(infer_sql_type(pd.to_datetime(pd.Series(['2020-01-01 10:30']))), DateTime)
+    assert isinstance(infer_sql_type(pd.Series(['12', '345'])), SmallInteger)
+
+
+def test_leading_zero_digits_stay_text():
+    sql_type = infer_sql_type(pd.Series(['0101234567', '0109876543']))
+    assert isinstance(sql_type, String)
+
+
+def test_low_cardinality_text_is_bounded_and_free_text_is_not():
+    assert infer_sql_type(pd.Series(['North', 'South'] * 10)).length == 16
+    assert infer_sql_type(pd.Series([f"note {i}" for i in range(100)])).length is None
+
+
+def table(*columns):
+    return Table('staging_data', MetaData(), Column('scj_number', String, primary_key=True), *columns)
+
+
+def test_coerces_values_that_fit():
+    df = pd.DataFrame({'scj_number': ['1', '2'], 'team': ['3', None], 'birth': ['1990-01-02', None],
+                       'code': [1990.0, None]})
+    coerced, needs_text = coerce_to_table_types(
+        df, table(Column('team', SmallInteger), Column('birth', Date), Column('code', String)))
+    assert needs_text == []
+    assert coerced['team'].tolist()[0] == 3
+    assert coerced['birth'].tolist()[0] == datetime.date(1990, 1, 2)
+    assert coerced['code'].tolist()[0] == '1990'
+
+
+def test_values_that_no_longer_fit_are_sent_to_widening():
+    df = pd.DataFrame({'scj_number': ['1', '2'], 'team': ['RL', '3'], 'count': [40000, 1],
+                       'name': ['a' * 17, 'b'], 'birth': ['soon', None]})
+    coerced, needs_text = coerce_to_table_types(df, table(
+        Column('team', Integer), Column('count', SmallInteger), Column('name', String(16)), Column('birth', Date)))
+    assert sorted(needs_text) == ['birth', 'count', 'name', 'team']
+    assert coerced['count'].tolist() == ['40000', '1']